@@ -1,35 +1,131 @@
 import os
+import threading
+from typing import TYPE_CHECKING, Optional
 
 import pygame
 
+if TYPE_CHECKING:
+    import numpy as np
 
-class AudioPlayer:
-    def __init__(self) -> None:
+MIXER_BUFFER = 256  # 샘플 프레임: 44.1kHz 에서 약 5.8ms (타격음 지연을 줄이려고 기본값보다 작게)
+STRETCH_CHANNEL = 0  # 느린 연습 재생용 예약 채널
+
+_mixer_thread: Optional[threading.Thread] = None
+_mixer_lock = threading.Lock()
+_reserved = 0
+
+
+def _init_mixer() -> None:
+    with _mixer_lock:
+        if pygame.mixer.get_init():
+            return
         try:
-            pygame.mixer.init()
+            pygame.mixer.init(buffer=MIXER_BUFFER)
         except pygame.error:
             os.environ["SDL_AUDIODRIVER"] = "dummy"
-            pygame.mixer.init()
+            pygame.mixer.init(buffer=MIXER_BUFFER)
+
+
+def start_mixer() -> None:
+    """Open the audio device in the background (it can take a few hundred ms) while the menu draws."""
+    global _mixer_thread
+    if _mixer_thread is None and not pygame.mixer.get_init():
+        _mixer_thread = threading.Thread(target=_init_mixer, name="mixer-init", daemon=True)
+        _mixer_thread.start()
+
+
+def ensure_mixer() -> None:
+    """Block until the mixer is usable (joins the background init or runs it here)."""
+    if _mixer_thread is not None:
+        _mixer_thread.join()
+    if not pygame.mixer.get_init():
+        _init_mixer()
+
+
+def reserve_channels(count: int) -> None:
+    """Keep mixer channels ``0..count-1`` out of ``Sound.play``'s automatic channel pick."""
+    global _reserved
+    if count > _reserved:
+        if pygame.mixer.get_num_channels() < count:
+            pygame.mixer.set_num_channels(count)
+        pygame.mixer.set_reserved(count)
+        _reserved = count
+
+
+class AudioPlayer:
+    """Plays the song file through ``mixer.music``, or stretched PCM on a reserved channel."""
+
+    def __init__(self) -> None:
+        start_mixer()
         self.play_at_ms: int = 0
         self.started: bool = False
+        self.pcm: Optional["np.ndarray"] = None  # 느린 재생용으로 늘린 PCM (없으면 원본 파일)
+        self.sound: Optional[pygame.mixer.Sound] = None
+        self.channel: Optional[pygame.mixer.Channel] = None
 
-    def queue(self, path: str, start_delay: float) -> None:
+    def queue(self, path: str, start_delay: float, pcm: Optional["np.ndarray"] = None) -> None:
+        ensure_mixer()
         self.started = False
         self.play_at_ms = pygame.time.get_ticks() + int(start_delay * 1000)
+        self.pcm = pcm
         try:
-            pygame.mixer.music.stop()
-            pygame.mixer.music.load(path)
+            self._stop_all()
+            if pcm is None:
+                pygame.mixer.music.load(path)
         except Exception as exc:
             print(f"[warn] audio load failed for {path}: {exc}")
 
+    def _play_from(self, position: float) -> None:
+        if self.pcm is None:
+            pygame.mixer.music.play(start=position)
+            return
+        if self.channel is None:
+            reserve_channels(STRETCH_CHANNEL + 1)
+            self.channel = pygame.mixer.Channel(STRETCH_CHANNEL)
+        freq = pygame.mixer.get_init()[0]
+        self.sound = pygame.sndarray.make_sound(self.pcm[int(position * freq) :])
+        self.channel.play(self.sound)
+
     def tick(self) -> None:
         if not self.started and pygame.time.get_ticks() >= self.play_at_ms:
             try:
-                pygame.mixer.music.play()
+                self._play_from(0.0)
             except Exception as exc:
                 print(f"[warn] audio play failed: {exc}")
             self.started = True
 
-    def stop(self) -> None:
+    def seek(self, position: float) -> None:
+        """Play the loaded song from ``position`` seconds right away (practice mode)."""
+        self.started = True
+        try:
+            self._play_from(max(0.0, position))
+        except pygame.error as exc:
+            # 일부 포맷(WAV 등)은 시작 위치 지정을 지원하지 않는다: 처음부터라도 재생
+            print(f"[warn] audio seek to {position:.2f}s failed: {exc}")
+            try:
+                pygame.mixer.music.play()
+            except pygame.error:
+                pass
+
+    def pause(self) -> None:
+        if pygame.mixer.get_init():
+            pygame.mixer.music.pause()
+            if self.channel is not None:
+                self.channel.pause()
+
+    def unpause(self) -> None:
+        if pygame.mixer.get_init():
+            pygame.mixer.music.unpause()
+            if self.channel is not None:
+                self.channel.unpause()
+
+    def _stop_all(self) -> None:
         pygame.mixer.music.stop()
+        if self.channel is not None:
+            self.channel.stop()
+        self.sound = None
+
+    def stop(self) -> None:
+        if pygame.mixer.get_init():
+            self._stop_all()
         self.started = False
@@ -0,0 +1,65 @@
+"""Chart post-processing throughput on synthetic marathon-length onset lists.
+
+    python3 benchmarks/bench_chart.py [--sizes 10000 50000 200000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Callable, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chart import _filter_density, map_onsets_to_lanes, quantize_onsets  # noqa: E402
+
+
+def synthetic_onsets(count: int, seed: int = 0) -> np.ndarray:
+    """Onsets at ~14/s (a dense mix), i.e. about an hour of audio per 50k onsets."""
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.exponential(1.0 / 14.0, count))
+
+
+def synthetic_bands(count: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed + 1)
+    leads = rng.integers(0, 4, count)
+    masks = rng.integers(0, 16, count) | (1 << leads)
+    return np.stack((leads, masks), axis=1)
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--difficulty", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    print(f"{'onsets':>8} {'quantize':>10} {'density':>10} {'lanes':>10} {'lanes+bands':>12} {'notes':>8}")
+    for size in args.sizes:
+        times = synthetic_onsets(size)
+        bands = synthetic_bands(size)
+        q = quantize_onsets(times, 150.0)
+        t_quant = best_of(lambda: quantize_onsets(times, 150.0), args.repeat)
+        t_density = best_of(lambda: _filter_density(q, args.difficulty, bands), args.repeat)
+        t_lanes = best_of(lambda: map_onsets_to_lanes(q, 1, args.difficulty), args.repeat)
+        t_bands = best_of(lambda: map_onsets_to_lanes(q, 1, args.difficulty, bands), args.repeat)
+        notes = len(map_onsets_to_lanes(q, 1, args.difficulty, bands))
+        print(
+            f"{size:>8} {t_quant * 1000:>8.2f}ms {t_density * 1000:>8.2f}ms "
+            f"{t_lanes * 1000:>8.2f}ms {t_bands * 1000:>10.2f}ms {notes:>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,56 @@
+"""Onset analysis wall time by worker count on a long synthetic click track.
+
+    python3 benchmarks/bench_parallel_onsets.py [--minutes 30] [--workers 1 2 4 8]
+
+Checks that every parallel run gives exactly the single-process flux and onsets.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chart import OnsetDetector  # noqa: E402
+from synthetic import write_song  # noqa: E402
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=30.0)
+    parser.add_argument("--density", type=float, default=8.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "long.wav")
+        write_song(path, args.minutes * 60.0, args.density)
+        detector = OnsetDetector()
+        data, freq = detector._load_signal(path)  # 디코딩은 측정에서 뺀다
+
+    print(f"{args.minutes:g} min, {os.cpu_count()} cores")
+    print(f"{'workers':>8} {'time':>9} {'speedup':>8}  same")
+    reference = None
+    base_time = 0.0
+    for workers in args.workers:
+        detector = OnsetDetector()
+        detector.workers = workers
+        detector.parallel_min_seconds = 0.0
+        start = time.perf_counter()
+        analysis = detector._analyze_signal(data, freq)
+        elapsed = time.perf_counter() - start
+        if reference is None:
+            reference, base_time = analysis, elapsed
+        same = np.array_equal(analysis.flux, reference.flux) and analysis.onsets == reference.onsets
+        print(f"{workers:>8} {elapsed:>8.2f}s {base_time / elapsed:>7.2f}x  {'yes' if same else 'NO'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,75 @@
+"""Cold start: process launch to the first menu frame, in fresh interpreters.
+
+    python3 benchmarks/bench_startup.py [--runs 5] [--fresh]
+
+Each run is a new subprocess with the dummy SDL drivers, so module imports, font lookup
+and the song index are paid for every time. ``--fresh`` deletes font_cache.json and
+library.json before the first run to show the one-time scan cost.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import pygame
+from game import Game
+t1 = time.perf_counter()
+game = Game()
+t2 = time.perf_counter()
+game._draw_menu()
+pygame.display.flip()
+t3 = time.perf_counter()
+print(json.dumps({
+    "import": t1 - t0, "init": t2 - t1, "first_frame": t3 - t2, "total": t3 - t0,
+    "chart_loaded": "chart" in sys.modules,
+}))
+"""
+
+
+def run_once() -> Dict[str, float]:
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["wall"] = time.perf_counter() - start  # 인터프리터 기동 포함
+    return result
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--fresh", action="store_true", help="drop the font cache and song index first")
+    args = parser.parse_args(argv)
+
+    if args.fresh:
+        for name in ("font_cache.json", "library.json"):
+            path = os.path.join(ROOT, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    runs = [run_once() for _ in range(args.runs)]
+    print(f"{'run':>4} {'import':>9} {'init':>9} {'frame':>9} {'total':>9} {'wall':>9}  chart")
+    for i, r in enumerate(runs):
+        print(
+            f"{i:>4} {r['import'] * 1000:>7.1f}ms {r['init'] * 1000:>7.1f}ms {r['first_frame'] * 1000:>7.1f}ms "
+            f"{r['total'] * 1000:>7.1f}ms {r['wall'] * 1000:>7.1f}ms  {'yes' if r['chart_loaded'] else 'no'}"
+        )
+    warm = runs[1:] or runs
+    print(f"median (runs after the first): total {statistics.median(r['total'] for r in warm) * 1000:.1f}ms, "
+          f"wall {statistics.median(r['wall'] for r in warm) * 1000:.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
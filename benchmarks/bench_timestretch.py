@@ -0,0 +1,37 @@
+"""WSOLA time-stretch throughput on a synthetic click track.
+
+    python3 benchmarks/bench_timestretch.py [--length 60] [--rates 0.5 0.7 0.9]
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import SAMPLE_RATE, click_track, synthetic_chart  # noqa: E402
+from timestretch import wsola  # noqa: E402
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--length", type=float, default=60.0, help="seconds of audio")
+    parser.add_argument("--rates", type=float, nargs="+", default=[0.5, 0.7, 0.9])
+    args = parser.parse_args(argv)
+
+    signal = click_track(synthetic_chart(args.length, 8.0), args.length) * 20000
+    pcm = np.stack((signal, signal), axis=1)
+    print(f"{'rate':>6} {'time':>9} {'realtime':>9} {'out len':>9}")
+    for rate in args.rates:
+        start = time.perf_counter()
+        out = wsola(pcm, rate)
+        elapsed = time.perf_counter() - start
+        print(f"{rate:>6.2f} {elapsed:>8.2f}s {args.length / elapsed:>8.1f}x {len(out) / SAMPLE_RATE:>8.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,141 @@
+"""Tuning re-scorer throughput, and a check that it scores exactly like ``replay.rescore``.
+
+    python3 benchmarks/bench_tuning.py [--replays 200] [--length 60] [--seed 0]
+
+Replays are recorded the way ``Game`` records them: fixed ``1 / SIM_HZ`` miss-sweep steps,
+presses on a frame grid judged after the steps up to their frame. Each one is re-scored by
+``replay.rescore`` and by ``tuning.rescore_log``: sudden-death replays under the rules they
+were recorded with (their inputs stop at the KO), full-song replays also under rule sets
+that only change HP (so the recorded sweeps stay valid). Any difference exits with 1.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import CompiledChart, Track, compile_chart  # noqa: E402
+from replay import Replay, ReplayRecorder, rescore  # noqa: E402
+from rules import DEFAULT_RULES, SIM_HZ, JudgeRules  # noqa: E402
+from synthetic import synthetic_chart  # noqa: E402
+from tuning import InputLog, rescore_log  # noqa: E402
+
+Press = Tuple[float, int, int]  # (시각, 플레이어, 레인)
+
+
+def synthetic_presses(chart: CompiledChart, rng: np.random.Generator) -> List[Press]:
+    """Two players of random skill: jittered hits, skipped notes and stray presses on a frame grid."""
+    presses: List[Press] = []
+    fps = rng.choice([60.0, 144.0, 240.0, 1000.0])
+    for player in (0, 1):
+        sigma = rng.uniform(0.02, 0.15)
+        skip = rng.uniform(0.0, 0.3)
+        for lane, t in chart:
+            if rng.random() < skip:
+                continue
+            presses.append((t + rng.normal(0.0, sigma), player, lane))
+        for t in rng.uniform(0.0, chart.end_time + 1.0, int(len(chart) * rng.uniform(0.0, 0.2))):
+            presses.append((float(t), player, int(rng.integers(0, 4))))
+    # 입력은 프레임 시각에 처리된다: 같은 프레임의 입력은 같은 시각
+    presses = [(float(np.ceil(t * fps) / fps), p, lane) for t, p, lane in presses if t > 0]
+    order = rng.permutation(len(presses))  # 같은 프레임 안의 키 순서는 무작위
+    return sorted((presses[i] for i in order), key=lambda x: x[0])
+
+
+def record(chart: CompiledChart, presses: Sequence[Press], rules: JudgeRules, mode: str) -> Replay:
+    """Play ``presses`` like ``Game._key_down`` / ``_sim_step`` and return the recorded replay."""
+    tracks = (Track("Player 1", 0, 0, {}, (0, 0, 0)), Track("Player 2", 0, 0, {}, (0, 0, 0)))
+    for track in tracks:
+        track.set_rules(rules)
+        track.load_chart(chart)
+    recorder = ReplayRecorder()
+    recorder.start("bench", chart, mode)
+    steps = 0
+
+    def advance(now: float) -> bool:
+        nonlocal steps
+        target = int(now * SIM_HZ)
+        while steps < target:
+            steps += 1
+            t = steps / SIM_HZ
+            for idx, track in enumerate(tracks):
+                missed = track.update_misses(t)
+                if missed:
+                    recorder.sweep(idx, t)
+                if missed and not track.is_down:
+                    rules.apply_health(track, tracks[1 - idx], "Miss", missed)
+            if mode == "sudden" and any(track.is_down for track in tracks):
+                return True
+        return False
+
+    for t, player, lane in presses:
+        if advance(t):
+            break
+        track = tracks[player]
+        if track.is_down:
+            continue
+        recorder.press(player, lane, t)
+        label = track.handle_lane(lane, t)
+        if label:
+            rules.apply_health(track, tracks[1 - player], label)
+    else:
+        advance(chart.end_time + rules.drop_after + 0.1)
+    return recorder.finish()
+
+
+def rule_sets() -> List[JudgeRules]:
+    # 기록한 규칙이 먼저. 판정창/drop 시간이 같아야 기록된 스윕이 그대로 유효하다: HP 만 바꾼다
+    return [
+        DEFAULT_RULES,
+        DEFAULT_RULES.with_health(Miss=-4.0),
+        DEFAULT_RULES.with_health(Miss=-9.0, Bad=-4.5, Perfect=0.7),
+    ]
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--replays", type=int, default=200)
+    parser.add_argument("--length", type=float, default=60.0, help="chart length (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    configs = rule_sets()
+    mismatches: List[str] = []
+    matches = kos = 0
+    t_rescore = t_tuning = 0.0
+    for n in range(args.replays):
+        chart = compile_chart(synthetic_chart(args.length, rng.uniform(2.0, 10.0), seed=args.seed * 100_000 + n))
+        mode = "sudden" if n % 2 == 0 else "endurance"
+        replay = record(chart, synthetic_presses(chart, rng), DEFAULT_RULES, mode)
+        rules_used = configs if mode == "endurance" else configs[:1]
+        log = InputLog.from_replay(replay)
+
+        start = time.perf_counter()
+        expected = [rescore(replay, chart, rules=rules) for rules in rules_used]
+        t_rescore += time.perf_counter() - start
+        start = time.perf_counter()
+        got = rescore_log(log, chart, rules_used)
+        t_tuning += time.perf_counter() - start
+
+        matches += len(rules_used)
+        for rules, exp, res in zip(rules_used, expected, got):
+            kos += exp.ko_time is not None
+            want = (exp.scores, exp.health, exp.ko_time is not None, exp.winner)
+            have = (res.scores, res.health, res.ko, res.winner)
+            if want != have:
+                mismatches.append(f"replay {n} ({mode}, {rules.health}): rescore {want} != tuning {have}")
+
+    for line in mismatches:
+        print(f"[fail] {line}")
+    print(f"{matches} matches ({kos} KO): replay.rescore {t_rescore * 1000:.0f} ms, tuning.rescore_log {t_tuning * 1000:.0f} ms")
+    print(f"{'FAILED' if mismatches else 'ok'}: {len(mismatches)} of {matches} results differ")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,107 @@
+"""Judgement must not depend on frame timing: the same song driven at steady 60 Hz frames
+and at uneven frames has to end in the same state.
+
+    python3 benchmarks/check_determinism.py [--seeds 5]
+
+Runs under the dummy SDL drivers and drives ``Game`` the way ``Game.run`` does each frame:
+key presses go through ``_key_down`` at the frame's song time, then ``_advance_sim``.
+Exits with status 1 when any case differs.
+"""
+import argparse
+import os
+import random
+import sys
+from typing import Dict, List, Sequence, Tuple
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pygame  # noqa: E402
+
+from models import Song  # noqa: E402
+from synthetic import synthetic_chart  # noqa: E402
+
+Presses = Dict[float, List[int]]  # 프레임 시각 → 그 프레임에 들어온 키
+
+
+def play(game, chart: List[Tuple[int, float]], frames: Sequence[float], presses: Presses) -> Tuple:
+    """Final (scores, HPs, downed players, recorded events) after playing ``chart`` on ``frames``."""
+    game.state = "menu"
+    game._start_song(Song("determinism", "", bpm=120.0, start_delay=0.0, chart=chart, length_hint=1.0))
+    game.just_started = False
+    for now in frames:
+        for key in presses.get(now, ()):
+            game._key_down(key, now)
+        if game.state != "play":
+            break
+        game._advance_sim(now)
+        if game.state != "play":
+            break
+    replay = game.recorder.finish()
+    return (
+        tuple(t.score for t in game.tracks),
+        tuple(round(t.health, 6) for t in game.tracks),
+        tuple(t.is_down for t in game.tracks),
+        tuple(replay.events()),
+    )
+
+
+def steady(end: float, extra: Sequence[float] = ()) -> List[float]:
+    return sorted(set([i / 60.0 for i in range(int(end * 60) + 1)] + list(extra)))
+
+
+def uneven(end: float, seed: int, extra: Sequence[float] = ()) -> List[float]:
+    rng = random.Random(seed)
+    frames, t = [], 0.0
+    while t < end:
+        frames.append(t)
+        t += rng.uniform(0.005, 0.15)
+    return sorted(set(frames + list(extra)))
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seeds", type=int, default=5, help="uneven frame sequences per case")
+    args = parser.parse_args(argv)
+
+    from game import Game
+
+    game = Game()
+    game.keysounds.enabled = False
+    # 끝까지 가는 모드로: KO 화면은 키 입력을 기다린다 (다운은 is_down 으로 비교)
+    game.selected_mode_idx = [code for code, _ in game.game_modes].index("endurance")
+    failures = []
+
+    # 1) 입력 없이 미스만: HP, 다운 여부와 미스 처리 시각이 같아야 한다
+    chart = synthetic_chart(20.0, 8.0, min_gap=0.0)
+    expected = play(game, chart, steady(21.0), {})
+    for seed in range(args.seeds):
+        got = play(game, chart, uneven(21.0, seed), {})
+        if got != expected:
+            failures.append(f"misses, seed {seed}: {got[:3]} != {expected[:3]}")
+
+    # 2) 긴 프레임 직후의 입력: 이미 지나간 노트가 아니라 다음 노트를 쳐야 한다
+    chart = [(0, 1.0), (0, 1.5)]
+    presses = {1.45: [pygame.K_q]}
+    expected = play(game, chart, steady(2.0, [1.45]), presses)
+    slow = [t for t in steady(2.0) if t < 1.2] + [1.2, 1.45] + [t for t in steady(2.0) if t > 1.45]
+    cases = [("slow frame at 1.2s", slow)]
+    cases += [(f"seed {seed}", uneven(2.0, seed, [1.45])) for seed in range(args.seeds)]
+    for name, frames in cases:
+        got = play(game, chart, frames, presses)
+        if got != expected:
+            failures.append(f"press after {name}: {got[:3]} != {expected[:3]}")
+
+    for failure in failures:
+        print(f"[fail] {failure}")
+    print(f"{'FAILED' if failures else 'ok'}: 2 cases, {args.seeds} uneven frame sequences each")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,341 @@
+"""Headless benchmark suite with JSON results and a regression check against a baseline.
+
+    python3 benchmarks/suite.py [--only startup start_song generate draw track onsets keysounds results] [--quick]
+                                [--out benchmarks/last_run.json] [--baseline benchmarks/baseline.json]
+                                [--save-baseline] [--tolerance 0.25]
+
+Runs under the dummy SDL drivers. Every metric is stored as {value, unit, better}; a metric
+is a regression when it is worse than the baseline by more than ``--tolerance`` (relative),
+and the exit status is 1 if any metric regressed. Baselines are machine-specific: record one
+with ``--save-baseline`` on the machine that runs the comparison.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # 곡 경로와 library.json 은 저장소 루트 기준
+
+import pygame  # noqa: E402
+
+from bench_startup import run_once  # noqa: E402
+from models import Song, Track  # noqa: E402
+from synthetic import evaluate_detector, synthetic_chart  # noqa: E402
+
+BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+RESULT_PATH = os.path.join("benchmarks", "last_run.json")
+DRAW_DENSITIES = (2.0, 8.0, 16.0, 32.0)  # 초당 노트 수 (트랙당)
+DRAW_FRAMES = 600
+ONSET_DENSITIES = (2.0, 8.0, 20.0)  # 클릭 트랙 밀도 (초당 onset)
+KEYSOUND_NPS = 24.0  # 플레이어당 초당 타격 수 (두 명 동시)
+RESULT_MATCHES = 10000  # 기록 DB 에 미리 채워 두는 경기 수
+
+Metrics = Dict[str, Dict[str, object]]
+
+
+def metric(metrics: Metrics, name: str, value: float, unit: str, better: str = "lower") -> None:
+    metrics[name] = {"value": round(value, 6), "unit": unit, "better": better}
+
+
+def timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+# ---- sections ----
+def bench_startup(metrics: Metrics, quick: bool) -> None:
+    runs = [run_once() for _ in range(2 if quick else 5)]
+    warm = runs[1:]  # 첫 실행은 디스크 캐시/폰트 캐시 생성이 섞인다
+    metric(metrics, "startup.first_menu_frame", statistics.median(r["total"] for r in warm) * 1000, "ms")
+    metric(metrics, "startup.import", statistics.median(r["import"] for r in warm) * 1000, "ms")
+    metric(metrics, "startup.process_wall", statistics.median(r["wall"] for r in warm) * 1000, "ms")
+
+
+def bench_start_song(metrics: Metrics, quick: bool) -> None:
+    from game import Game
+
+    game = Game()
+    repeat = 3 if quick else 7
+    for idx in range(len(game.library)):
+        song = game.library.song(idx)
+        if not os.path.exists(song.path):
+            continue
+        samples = []
+        # 차트 없는 곡은 첫 시작이 분석 대기를 포함하므로 첫 값만 따로 기록한다
+        cold = not song.chart
+        for _ in range(1 if cold else repeat):
+            samples.append(timed(lambda: game._start_song(song)))
+            game._back_to_menu()
+        name = f"start_song.{song.name}" + (".cold" if cold else "")
+        metric(metrics, name, statistics.median(samples) * 1000, "ms")
+        if cold:
+            game.chart_load = None
+            from game import chart_job
+
+            chart_job(song).wait()  # 백그라운드 분석이 다음 측정과 겹치지 않게
+
+
+def bench_generate(metrics: Metrics, quick: bool) -> None:
+    from chart import OnsetChartGenerator, OnsetDetector, ProceduralChartGenerator
+    from library import SongLibrary
+
+    library = SongLibrary.open()
+    for idx in range(len(library)):
+        base = library.song(idx)
+        if not os.path.exists(base.path):
+            continue
+        song = replace(base, chart=None)
+        generator = OnsetChartGenerator(OnsetDetector(), ProceduralChartGenerator())
+        tracemalloc.start()
+        start = time.perf_counter()
+        chart, source = generator.generate(song)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        metric(metrics, f"generate.{song.name}.time", elapsed * 1000, "ms")
+        metric(metrics, f"generate.{song.name}.peak_mem", peak / 2**20, "MiB")
+        metric(metrics, f"generate.{song.name}.notes", len(chart), "notes", better="info")
+        metrics[f"generate.{song.name}.notes"]["source"] = source
+
+
+def bench_draw(metrics: Metrics, quick: bool) -> None:
+    from game import Game
+
+    game = Game()
+    game.state = "play"
+    game.current_song = Song("bench", "", bpm=120.0, start_delay=0.0)
+    length = 20.0 if quick else 60.0
+    for density in DRAW_DENSITIES:
+        chart = synthetic_chart(length, density, min_gap=0.0)
+        for track in game.tracks:
+            track.load_chart(chart)
+        game._prepare_play_graphics()
+        frames = [0.0] * (DRAW_FRAMES // 4 if quick else DRAW_FRAMES)
+        count = len(frames)
+        game._draw_play(1.0, 1.0)  # 첫 프레임의 텍스트 캐시 채우기는 빼고 센다
+        gc.disable()
+        tracked = gc.get_count()[0]
+        for i in range(count):
+            now = 1.0 + (length - 2.0) * i / count  # 곡 전체에 고르게 퍼진 프레임
+            start = time.perf_counter()
+            game._draw_play(now, now)
+            frames[i] = time.perf_counter() - start
+        tracked = gc.get_count()[0] - tracked
+        gc.enable()
+        frames.sort()
+        metric(metrics, f"draw_play.{density:g}nps.mean", statistics.fmean(frames) * 1000, "ms")
+        metric(metrics, f"draw_play.{density:g}nps.p95", frames[int(len(frames) * 0.95)] * 1000, "ms")
+        metric(metrics, f"draw_play.{density:g}nps.tracked_objects", tracked / count, "objects/frame")
+
+
+def bench_track(metrics: Metrics, quick: bool) -> None:
+    keys = {pygame.K_q: 0, pygame.K_w: 1, pygame.K_e: 2, pygame.K_r: 3}
+    lane_keys = {lane: key for key, lane in keys.items()}
+    length = 600.0 if quick else 3600.0
+    chart = synthetic_chart(length, 16.0, min_gap=0.0)
+    presses = [(lane_keys[lane], t + 0.01) for lane, t in chart]
+
+    track = Track("bench", 0, 400, keys, (255, 255, 255))
+    track.load_chart(chart)
+    elapsed = timed(lambda: [track.handle_key(key, t) for key, t in presses])
+    metric(metrics, "track.handle_key", len(presses) / elapsed, "presses/s", better="higher")
+
+    # 아무것도 안 누른 트랙: 60 Hz 로 훑으면서 전부 미스 처리
+    track = Track("bench", 0, 400, keys, (255, 255, 255))
+    track.load_chart(chart)
+    frames = [i / 60.0 for i in range(int((length + 1.0) * 60))]
+    elapsed = timed(lambda: [track.update_misses(t) for t in frames])
+    metric(metrics, "track.update_misses", len(frames) / elapsed, "frames/s", better="higher")
+    metric(metrics, "track.update_misses.notes", len(chart) / elapsed, "notes/s", better="higher")
+
+
+def bench_onsets(metrics: Metrics, quick: bool) -> None:
+    """OnsetDetector accuracy and speed on click tracks with known onsets."""
+    length = 30.0 if quick else 120.0
+    with tempfile.TemporaryDirectory() as workdir:
+        for density in ONSET_DENSITIES:
+            path = os.path.join(workdir, f"click_{density:g}.wav")
+            start = time.perf_counter()
+            score = evaluate_detector(length, density, 0, 0.05, path)
+            elapsed = time.perf_counter() - start
+            name = f"onsets.{density:g}nps"
+            metric(metrics, f"{name}.precision", score.precision, "ratio", better="higher")
+            metric(metrics, f"{name}.recall", score.recall, "ratio", better="higher")
+            metric(metrics, f"{name}.band_accuracy", score.band_accuracy, "ratio", better="higher")
+            metric(metrics, f"{name}.mean_error", score.mean_error * 1000, "ms")
+            metric(metrics, f"{name}.time", elapsed * 1000, "ms")
+
+
+def bench_keysounds(metrics: Metrics, quick: bool) -> None:
+    """Hit-sound triggers in real time for two players at KEYSOUND_NPS each, with chords."""
+    from keysounds import KeySounds
+
+    sounds = KeySounds()
+    sounds.prepare()
+    length = 3.0 if quick else 10.0
+    labels = ("Perfect", "Great", "Good", "Bad", "Miss")
+    hits = sorted(
+        (t, player, labels[i % len(labels)])
+        for player in (0, 1)
+        for i, (_, t) in enumerate(synthetic_chart(length, KEYSOUND_NPS, seed=player, start=0.0, min_gap=0.0))
+    )
+    start = time.perf_counter()
+    for t, player, label in hits:
+        while time.perf_counter() - start < t:
+            pass
+        sounds.play(label, player)
+    report = sounds.report()
+    metric(metrics, "keysounds.trigger_p50", report.trigger_p50_ms, "ms")
+    metric(metrics, "keysounds.trigger_p95", report.trigger_p95_ms, "ms")
+    metric(metrics, "keysounds.output_latency", report.trigger_p95_ms + report.buffer_ms, "ms")
+    metric(metrics, "keysounds.hits_per_s", report.triggers / length, "hits/s", better="info")
+    metric(metrics, "keysounds.stolen", report.stolen, "voices", better="info")
+
+
+def bench_results(metrics: Metrics, quick: bool) -> None:
+    """Match history: cost of ``record`` on the game thread, batched write rate, menu queries."""
+    from results import MatchResult, PlayerResult, ResultStore
+
+    count = RESULT_MATCHES // 10 if quick else RESULT_MATCHES
+    judgements = {"Perfect": 300, "Great": 80, "Good": 20, "Bad": 5, "Miss": 12}
+    matches = [
+        MatchResult(
+            f"song{i % 50}",
+            "0" * 16,
+            "sudden",
+            (PlayerResult(i * 37 % 100000, 40.0, judgements), PlayerResult(i * 53 % 100000, 0.0, judgements)),
+            ko_time=60.0,
+            winner=0,
+        )
+        for i in range(count)
+    ]
+    with tempfile.TemporaryDirectory() as workdir:
+        store = ResultStore(os.path.join(workdir, "results.db"))
+        record = []
+        start = time.perf_counter()
+        for match in matches:
+            t = time.perf_counter()
+            store.record(match)
+            record.append(time.perf_counter() - t)
+        store.close(timeout=60.0)
+        elapsed = time.perf_counter() - start
+        record.sort()
+        metric(metrics, "results.record_p99", record[int(len(record) * 0.99)] * 1e6, "us")
+        metric(metrics, "results.write", count / elapsed, "matches/s", better="higher")
+
+        # 메뉴가 보는 질의: 캐시 없이 (새 기록이 쓰인 직후의 첫 프레임)
+        store = ResultStore(os.path.join(workdir, "results.db"))
+        best = []
+        for i in range(200):
+            store.version += 1
+            best.append(timed(lambda: (store.best(f"song{i % 50}"), store.leaderboard(5))))
+        store.close()
+        best.sort()
+        metric(metrics, "results.menu_query_p95", best[int(len(best) * 0.95)] * 1000, "ms")
+
+
+SECTIONS: Dict[str, Callable[[Metrics, bool], None]] = {
+    "startup": bench_startup,
+    "start_song": bench_start_song,
+    "generate": bench_generate,
+    "draw": bench_draw,
+    "track": bench_track,
+    "onsets": bench_onsets,
+    "keysounds": bench_keysounds,
+    "results": bench_results,
+}
+
+
+# ---- baseline ----
+def compare(metrics: Metrics, baseline: Metrics, tolerance: float) -> List[str]:
+    regressions = []
+    print(f"\n{'metric':<48} {'baseline':>12} {'now':>12} {'change':>8}")
+    for name, entry in metrics.items():
+        old = baseline.get(name)
+        if old is None or entry["better"] not in ("lower", "higher") or not old["value"]:
+            continue
+        change = (entry["value"] - old["value"]) / old["value"]
+        worse = change if entry["better"] == "lower" else -change
+        flag = "  REGRESSION" if worse > tolerance else ""
+        print(f"{name:<48} {old['value']:>12.3f} {entry['value']:>12.3f} {change:>+7.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def load_metrics(path: str) -> Optional[Metrics]:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)["metrics"]
+    except (OSError, ValueError, KeyError) as exc:
+        print(f"[warn] baseline unreadable at {path}: {exc}")
+        return None
+
+
+def save_metrics(path: str, metrics: Metrics) -> None:
+    data = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": platform.platform(),
+        },
+        "metrics": metrics,
+    }
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, ensure_ascii=False, indent=1)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=sorted(SECTIONS), help="run only these sections")
+    parser.add_argument("--quick", action="store_true", help="fewer repeats and shorter synthetic charts")
+    parser.add_argument("--out", default=RESULT_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    args = parser.parse_args(argv)
+
+    metrics: Metrics = {}
+    for name in args.only or SECTIONS:
+        start = time.perf_counter()
+        SECTIONS[name](metrics, args.quick)
+        print(f"[{name}] done in {time.perf_counter() - start:.1f}s")
+    for name, entry in metrics.items():
+        print(f"{name:<48} {entry['value']:>12.3f} {entry['unit']}")
+
+    save_metrics(args.out, metrics)
+    if args.save_baseline:
+        save_metrics(args.baseline, metrics)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+    baseline = load_metrics(args.baseline)
+    if baseline is None:
+        return 0
+    regressions = compare(metrics, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,265 @@
+import socket
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+from models import Track
+
+DEFAULT_BROADCAST = ("127.0.0.1", 40500)
+
+PKT_DELTA = 1
+PKT_KEYFRAME = 2
+PKT_EVENT = 3
+
+EVENT_START = 0
+EVENT_KO = 1
+EVENT_GAME_OVER = 2
+EVENT_MENU = 3
+
+BROADCAST_HZ = 50  # 스냅샷 빈도: 시뮬레이션 스텝에서 고정 간격으로 보낸다 (렌더링 프레임과 무관)
+KEYFRAME_EVERY = BROADCAST_HZ  # 스냅샷 50개(1초)마다 키프레임: 늦게 접속한 뷰어도 1초 안에 전체 상태를 받는다
+EVENT_REPEAT = 3  # UDP 유실 대비 이벤트는 여러 번 보낸다
+EVENT_REPEAT_INTERVAL = 0.05  # 반복 사이 간격 (초): 한꺼번에 잃지 않게 벌려 둔다
+
+LABELS = ("Ready", "Perfect", "Great", "Good", "Bad", "Miss", "KO")
+_LABEL_IDX = {label: i for i, label in enumerate(LABELS)}
+
+_HEADER = struct.Struct("<BIf")  # type, snapshot seq, song time
+_EVENT = struct.Struct("<BHBb")  # type, event seq, kind, winner(-1 = none/draw)
+# 트랙 필드: (이름, 포맷) — 바뀐 필드만 비트마스크와 함께 보낸다
+_FIELDS: Tuple[Tuple[str, struct.Struct], ...] = (
+    ("score", struct.Struct("<I")),
+    ("combo", struct.Struct("<H")),
+    ("health", struct.Struct("<f")),
+    ("label", struct.Struct("<B")),
+    ("label_time", struct.Struct("<f")),
+    ("cursor", struct.Struct("<I")),
+    ("lane_cursors", struct.Struct("<4H")),
+    ("down", struct.Struct("<?")),
+)
+
+
+@dataclass
+class TrackState:
+    score: int = 0
+    combo: int = 0
+    health: float = 100.0
+    label: int = 0
+    label_time: float = 0.0
+    cursor: int = 0
+    lane_cursors: Tuple[int, int, int, int] = (0, 0, 0, 0)
+    down: bool = False
+
+    @classmethod
+    def of(cls, track: Track) -> "TrackState":
+        state = cls()
+        state.update(track)
+        return state
+
+    def update(self, track: Track) -> bool:
+        """Copy ``track``'s state in place; True when anything changed.
+
+        Unchanged fields are only compared, so a tick where nothing happened allocates nothing.
+        """
+        combo = min(track.combo, 0xFFFF)
+        label = _LABEL_IDX.get(track.last_label, 0)
+        changed = (
+            self.score != track.score
+            or self.combo != combo
+            or self.health != track.health
+            or self.label != label
+            or self.label_time != track.last_label_time
+            or self.cursor != track.cursor
+            or self.down != track.is_down
+        )
+        if changed:
+            self.score = track.score
+            self.combo = combo
+            self.health = track.health
+            self.label = label
+            self.label_time = track.last_label_time
+            self.cursor = track.cursor
+            self.down = track.is_down
+        lanes = track.lane_cursor
+        cursors = self.lane_cursors
+        if cursors[0] != lanes[0] or cursors[1] != lanes[1] or cursors[2] != lanes[2] or cursors[3] != lanes[3]:
+            self.lane_cursors = tuple(min(c, 0xFFFF) for c in lanes)
+            changed = True
+        return changed
+
+    def copy_from(self, other: "TrackState") -> None:
+        for name, _ in _FIELDS:
+            setattr(self, name, getattr(other, name))
+
+
+@dataclass
+class MatchEvent:
+    kind: int
+    winner: Optional[int] = None
+    song_id: str = ""
+    chart_hash: str = ""
+    mode: str = ""
+
+
+def _encode_track(state: TrackState, prev: Optional[TrackState]) -> bytes:
+    mask = 0
+    body: List[bytes] = []
+    for bit, (name, fmt) in enumerate(_FIELDS):
+        value = getattr(state, name)
+        if prev is not None and getattr(prev, name) == value:
+            continue
+        mask |= 1 << bit
+        body.append(fmt.pack(*value) if isinstance(value, tuple) else fmt.pack(value))
+    return bytes([mask]) + b"".join(body)
+
+
+def _decode_track(data: bytes, pos: int, state: TrackState) -> int:
+    mask = data[pos]
+    pos += 1
+    for bit, (name, fmt) in enumerate(_FIELDS):
+        if not mask & (1 << bit):
+            continue
+        values = fmt.unpack_from(data, pos)
+        pos += fmt.size
+        setattr(state, name, values if len(values) > 1 else values[0])
+    return pos
+
+
+def _encode_event(seq: int, event: MatchEvent) -> bytes:
+    winner = -1 if event.winner is None else event.winner
+    extra = b""
+    if event.kind == EVENT_START:
+        parts = [event.song_id.encode("utf-8"), event.chart_hash.encode("ascii"), event.mode.encode("utf-8")]
+        extra = b"".join(struct.pack("<H", len(p)) + p for p in parts)
+    return _EVENT.pack(PKT_EVENT, seq, event.kind, winner) + extra
+
+
+def _decode_event(data: bytes) -> Tuple[int, MatchEvent]:
+    _, seq, kind, winner = _EVENT.unpack_from(data)
+    event = MatchEvent(kind, None if winner < 0 else winner)
+    if kind == EVENT_START:
+        pos = _EVENT.size
+        parts = []
+        for _ in range(3):
+            (size,) = struct.unpack_from("<H", data, pos)
+            pos += 2
+            parts.append(data[pos : pos + size].decode("utf-8"))
+            pos += size
+        event.song_id, event.chart_hash, event.mode = parts
+    return seq, event
+
+
+class MatchBroadcaster:
+    """Publishes delta-encoded per-tick match snapshots over UDP; never blocks the game loop."""
+
+    def __init__(self, address: Tuple[str, int] = DEFAULT_BROADCAST) -> None:
+        self.address = address
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self.sock.setblocking(False)
+        self.tick = 0
+        self.seq = 0
+        # 틱마다 새로 만들지 않고 고쳐 쓴다: 현재 상태와 마지막으로 보낸 상태
+        self.states = [TrackState(), TrackState()]
+        self.sent = [TrackState(), TrackState()]
+        self.need_keyframe = True  # 곡 시작/메뉴 이후 첫 스냅샷은 키프레임
+        self.event_seq = 0
+        self.pending_events: List[Tuple[int, float, bytes]] = []  # (남은 횟수, 다음 전송 시각, 패킷)
+        self.bytes_sent = 0
+        self.dropped = 0
+
+    def _send(self, data: bytes) -> None:
+        try:
+            self.sock.sendto(data, self.address)
+            self.bytes_sent += len(data)
+        except (BlockingIOError, InterruptedError):
+            self.dropped += 1  # 버퍼가 가득 차면 이번 틱은 버린다 (다음 키프레임이 복구)
+        except OSError:
+            self.dropped += 1
+
+    def event(self, event: MatchEvent) -> None:
+        """Send a match event now; ``flush`` repeats it EVENT_REPEAT - 1 more times."""
+        self.event_seq = (self.event_seq + 1) & 0xFFFF
+        packet = _encode_event(self.event_seq, event)
+        self._send(packet)
+        self.pending_events.append((EVENT_REPEAT - 1, time.perf_counter() + EVENT_REPEAT_INTERVAL, packet))
+        if event.kind in (EVENT_START, EVENT_MENU):
+            self.need_keyframe = True
+
+    def flush(self) -> None:
+        """Send event repeats that are due; call every frame in every state.
+
+        KO, result and menu events are sent just as snapshots stop, so their repeats can't
+        ride on ``publish``.
+        """
+        if not self.pending_events:
+            return
+        now = time.perf_counter()
+        remaining = []
+        for repeat, due, packet in self.pending_events:
+            if now >= due:
+                self._send(packet)
+                repeat -= 1
+                due = now + EVENT_REPEAT_INTERVAL
+            if repeat > 0:
+                remaining.append((repeat, due, packet))
+        self.pending_events = remaining
+
+    def publish(self, tracks: Sequence[Track], now: float) -> None:
+        """One snapshot tick; call at BROADCAST_HZ of song time (the game does it from its fixed step)."""
+        self.tick += 1
+        keyframe = self.tick % KEYFRAME_EVERY == 0 or self.need_keyframe
+        states = self.states
+        changed = False
+        for state, track in zip(states, tracks):
+            if state.update(track):
+                changed = True
+        if not keyframe and not changed:
+            return  # 변화 없음: 아무것도 보내지 않는다
+        kind = PKT_KEYFRAME if keyframe else PKT_DELTA
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        parts = [_HEADER.pack(kind, self.seq, now)]
+        for state, sent in zip(states, self.sent):
+            parts.append(_encode_track(state, None if keyframe else sent))
+            sent.copy_from(state)
+        self._send(b"".join(parts))
+        self.need_keyframe = False
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+@dataclass
+class MatchView:
+    """Receiver-side reconstruction of the broadcast state."""
+
+    seq: int = 0
+    now: float = 0.0
+    tracks: List[TrackState] = field(default_factory=lambda: [TrackState(), TrackState()])
+    synced: bool = False  # 마지막 키프레임 이후 델타가 빠짐없이 이어졌는지
+    last_event_seq: int = -1
+    events: List[MatchEvent] = field(default_factory=list)
+
+    def apply(self, data: bytes) -> None:
+        kind = data[0]
+        if kind == PKT_EVENT:
+            seq, event = _decode_event(data)
+            # 반복 전송과 순서가 뒤바뀐 패킷: 마지막으로 받은 것보다 새 이벤트만 받는다 (16비트 순환 비교)
+            if self.last_event_seq < 0 or 0 < (seq - self.last_event_seq) & 0xFFFF < 0x8000:
+                self.last_event_seq = seq
+                self.events.append(event)
+            return
+        _, seq, now = _HEADER.unpack_from(data)
+        if kind == PKT_DELTA and (not self.synced or seq != (self.seq + 1) & 0xFFFFFFFF):
+            # 델타가 하나라도 빠지면 다음 키프레임까지 기다린다
+            self.synced = False
+            return
+        pos = _HEADER.size
+        if kind == PKT_KEYFRAME:
+            self.tracks = [TrackState(), TrackState()]
+            self.synced = True
+        for state in self.tracks:
+            pos = _decode_track(data, pos, state)
+        self.seq = seq
+        self.now = now
@@ -0,0 +1,186 @@
+"""Per-device latency calibration: tap along to clicks, then to silent flashes.
+
+Tapping to audible clicks measures audio output + input latency; tapping to flashes on
+screen measures input (and display) latency alone. The difference is the audio latency.
+Profiles are stored per audio device in LATENCY_PATH and applied to every song on top of
+its own offsets.
+"""
+import json
+import os
+import platform
+import statistics
+import time
+from bisect import bisect_left
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pygame
+
+LATENCY_PATH = "latency.json"
+CALIBRATION_BPM = 100.0
+CALIBRATION_BEATS = 20  # 단계별 클릭 수
+WARMUP_BEATS = 4  # 박자를 잡는 동안의 앞쪽 탭은 버린다
+LEAD_IN = 1.5  # 첫 클릭 전 여유 (초)
+FLASH_TIME = 0.08  # 시각 단계에서 원이 켜져 있는 시간 (초)
+MIN_TAPS = 8  # 이보다 적게 남으면 결과를 믿지 않는다
+OUTLIER_MADS = 3.0  # 중앙값에서 MAD(정규화)의 이 배수보다 먼 탭은 버린다
+MIN_SPREAD = 0.015  # MAD 가 아주 작아도 이만큼은 허용 (초)
+
+
+@dataclass
+class LatencyProfile:
+    """Measured latencies of one audio device (seconds)."""
+
+    device: str = ""
+    audio_latency: float = 0.0  # 소리가 실제로 들리기까지 늦는 시간
+    input_latency: float = 0.0  # 눌러서 게임이 알기까지 (화면 지연 포함)
+    jitter: float = 0.0  # 남은 탭 오프셋의 표준편차
+    taps: int = 0
+    updated: str = ""
+
+    @property
+    def input_offset(self) -> float:
+        """How much later than the music a press arrives; subtracted from press times."""
+        return self.audio_latency + self.input_latency
+
+    def summary(self) -> str:
+        return f"audio {self.audio_latency * 1000:+.0f}ms, input {self.input_latency * 1000:+.0f}ms"
+
+
+def device_id() -> str:
+    """This machine plus its default audio output (call after the mixer is up)."""
+    name = "default"
+    try:
+        from pygame._sdl2 import audio as sdl_audio
+
+        names = sdl_audio.get_audio_device_names(False)
+        if names:
+            name = names[0]
+    except Exception:
+        pass
+    return f"{platform.node()}:{name}"
+
+
+def load_profiles(path: str = LATENCY_PATH) -> Dict[str, LatencyProfile]:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as fh:
+            raw = json.load(fh)
+        return {device: LatencyProfile(**entry) for device, entry in raw.get("profiles", {}).items()}
+    except (OSError, ValueError, TypeError) as exc:
+        print(f"[warn] latency profiles unreadable at {path}: {exc}")
+        return {}
+
+
+def load_profile(device: str, path: str = LATENCY_PATH) -> LatencyProfile:
+    """Stored profile of ``device``, or a zero profile when it was never calibrated."""
+    return load_profiles(path).get(device, LatencyProfile(device))
+
+
+def save_profile(profile: LatencyProfile, path: str = LATENCY_PATH) -> None:
+    profiles = load_profiles(path)
+    profiles[profile.device] = profile
+    data = {"version": 1, "profiles": {device: asdict(p) for device, p in profiles.items()}}
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+    except OSError as exc:
+        print(f"[warn] latency profile save failed for {path}: {exc}")
+
+
+def robust_offset(taps: Sequence[float], beats: Sequence[float]) -> Optional[Tuple[float, float, int]]:
+    """(median offset, jitter, taps kept) of taps against their nearest beats.
+
+    Taps further than half a beat from any beat are ignored, then taps further than
+    OUTLIER_MADS normalised MADs from the median are rejected. None with too few taps.
+    """
+    if not beats:
+        return None
+    half = (beats[1] - beats[0]) / 2 if len(beats) > 1 else 0.5
+    offsets = []
+    for tap in taps:
+        idx = bisect_left(beats, tap)
+        nearest = min(beats[max(0, idx - 1) : idx + 1], key=lambda b: abs(tap - b))
+        if abs(tap - nearest) < half:
+            offsets.append(tap - nearest)
+    if len(offsets) < MIN_TAPS:
+        return None
+    median = statistics.median(offsets)
+    mad = statistics.median(abs(d - median) for d in offsets)
+    limit = max(MIN_SPREAD, OUTLIER_MADS * 1.4826 * mad)
+    kept = [d for d in offsets if abs(d - median) <= limit]
+    if len(kept) < MIN_TAPS:
+        return None
+    return statistics.median(kept), statistics.pstdev(kept), len(kept)
+
+
+class Calibration:
+    """One tap-along session: an "audio" phase with clicks, then a silent "visual" phase."""
+
+    PHASES = ("audio", "visual")
+
+    def __init__(self, device: str, bpm: float = CALIBRATION_BPM, beats: int = CALIBRATION_BEATS) -> None:
+        self.device = device
+        self.interval = 60.0 / bpm
+        self.beats = [LEAD_IN + i * self.interval for i in range(beats)]
+        self.phase_idx = 0
+        self.taps: Dict[str, List[float]] = {phase: [] for phase in self.PHASES}
+        self.result: Optional[LatencyProfile] = None
+        self.done = False
+
+    @property
+    def phase(self) -> str:
+        return self.PHASES[self.phase_idx]
+
+    @property
+    def length(self) -> float:
+        return self.beats[-1] + self.interval
+
+    def click_pcm(self):
+        """The audio phase's click track as int16 PCM in the mixer's layout."""
+        import numpy as np
+
+        from synthetic import click_track
+
+        freq, _, channels = pygame.mixer.get_init()
+        signal = click_track([(2, b) for b in self.beats], self.length, freq)
+        pcm = (signal * 32767).astype(np.int16)
+        return pcm if channels == 1 else np.repeat(pcm[:, None], channels, axis=1)
+
+    def beat_index(self, t: float) -> int:
+        """Number of beats already played at phase time ``t``."""
+        return bisect_left(self.beats, t)
+
+    def flash(self, t: float) -> bool:
+        idx = self.beat_index(t + FLASH_TIME) - 1
+        return idx >= 0 and 0.0 <= t - self.beats[idx] < FLASH_TIME
+
+    def tap(self, t: float) -> None:
+        self.taps[self.phase].append(t)
+
+    def next_phase(self) -> bool:
+        """Advance to the visual phase; False (and the result computed) after the last one."""
+        if self.phase_idx + 1 < len(self.PHASES):
+            self.phase_idx += 1
+            return True
+        self.done = True
+        self.result = self._estimate()
+        return False
+
+    def _estimate(self) -> Optional[LatencyProfile]:
+        beats = self.beats[WARMUP_BEATS:]
+        heard = robust_offset(self.taps["audio"], beats)
+        seen = robust_offset(self.taps["visual"], beats)
+        if heard is None or seen is None:
+            return None
+        return LatencyProfile(
+            device=self.device,
+            audio_latency=heard[0] - seen[0],
+            input_latency=seen[0],
+            jitter=max(heard[1], seen[1]),
+            taps=heard[2] + seen[2],
+            updated=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        )
@@ -1,14 +1,24 @@
 import hashlib
+import multiprocessing
+import os
 import random
-from typing import Dict, List, Tuple
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 import pygame
 
-from models import Song
+from audio_player import ensure_mixer
+from models import MIN_FIRST_NOTE, Song
 
 
-MIN_FIRST_NOTE = 0.4
+DEFAULT_BPM = 120.0  # 템포 추정도 실패했을 때 절차적 차트용
+DIFFICULTY_LADDER: Tuple[float, ...] = (0.7, 1.0, 1.5, 2.5, 4.0)
+
+Progress = Callable[[float], None]  # 0.0 ~ 1.0 진행률 보고용 콜백
 
 
 def stable_seed(key: str) -> int:
@@ -17,10 +27,76 @@ def stable_seed(key: str) -> int:
     return int(digest[:8], 16)
 
 
+@dataclass
+class OnsetAnalysis:
+    """Spectral-flux curve of one audio file plus the onsets picked from it."""
+
+    flux: np.ndarray  # flux value per hop (frame i compares frame i+1 with frame i)
+    frame_rate: float  # flux values per second
+    first_frame_time: float  # time (s) of flux[0]
+    onsets: List[float]
+    band_flux: Optional[np.ndarray] = None  # (frames, bands) positive flux per frequency band
+    # per onset row: (strongest band, bitmask of bands that hit together)
+    onset_bands: np.ndarray = field(default_factory=lambda: np.zeros((0, 2), dtype=np.int64))
+
+
+def _pick_peaks(flux: np.ndarray, thresh: float, lo: int = 0, hi: Optional[int] = None, last_idx: int = -10) -> np.ndarray:
+    """Local maxima above ``thresh`` in ``flux[lo:hi]`` with a one-frame refractory gap after ``last_idx``."""
+    hi = len(flux) if hi is None else min(hi, len(flux))
+    if hi <= lo:
+        return np.zeros(0, dtype=np.int64)
+    seg = flux[lo:hi]
+    left = flux[lo - 1 : hi - 1] if lo > 0 else np.concatenate((flux[:1], flux[: hi - 1]))
+    right = flux[lo + 1 : hi + 1] if hi < len(flux) else np.concatenate((flux[lo + 1 : hi], flux[hi - 1 : hi]))
+    candidates = lo + np.flatnonzero((seg >= thresh) & (seg >= left) & (seg >= right))
+    peaks: List[int] = []
+    for i in candidates.tolist():  # 평탄한 봉우리에서만 후보가 연달아 나온다
+        if i - last_idx < 2:
+            continue
+        peaks.append(i)
+        last_idx = i
+    return np.asarray(peaks, dtype=np.int64)
+
+
+def _band_tags(strength: np.ndarray, near: np.ndarray) -> np.ndarray:
+    """(strongest band, co-hit bitmask) rows from per-onset band strength and nearby band peaks."""
+    weights = 1 << np.arange(strength.shape[1])
+    masks = ((near & (strength >= 1.0)) * weights).sum(axis=1)
+    leads = np.argmax(strength, axis=1)
+    masks |= 1 << leads
+    return np.stack((leads, masks), axis=1).astype(np.int64)
+
+
+def _onset_threshold(flux: np.ndarray) -> np.ndarray:
+    # Adaptive threshold: lower threshold for higher difficulty by caller
+    # We keep detector pure; selection handles density.
+    return np.median(flux, axis=0) + 0.6 * np.std(flux, axis=0)
+
+
 class OnsetDetector:
     """Spectral-flux onset detector using pygame audio array."""
 
+    frame = 2048
+    hop = 512
+    # 밴드 하한(Hz): 저음(킥) → 레인 0 ... 고음(하이햇) → 레인 3
+    bands: Tuple[float, ...] = (0.0, 200.0, 800.0, 3200.0)
+    chunk_frames = 512  # STFT 를 이만큼씩 묶어서 한 번에 계산 (메모리 상한)
+    # 긴 곡은 프레임 구간을 나눠 프로세스 풀에서 계산한다 (PCM 은 공유 메모리로 넘긴다)
+    workers: Optional[int] = None  # None = 코어 수
+    parallel_min_seconds = 240.0  # 이보다 짧으면 풀 기동 비용이 더 크다
+    segment_frames = 16 * 512  # chunk_frames 의 배수: 배치 경계가 단일 패스와 같아 결과가 동일
+
     def detect(self, path: str) -> List[float]:
+        return self.analyze(path).onsets
+
+    def analyze(self, path: str, progress: Optional[Progress] = None) -> OnsetAnalysis:
+        data, freq = self._load_signal(path)
+        if progress is not None:
+            progress(0.2)  # 디코딩이 대략 전체의 1/5
+        return self._analyze_signal(data, freq, progress)
+
+    def _load_signal(self, path: str) -> Tuple[np.ndarray, int]:
+        ensure_mixer()
         snd = pygame.mixer.Sound(path)
         freq, _, _ = pygame.mixer.get_init()
         data = pygame.sndarray.array(snd).astype(np.float32)
@@ -29,100 +105,329 @@ class OnsetDetector:
         maxv = np.max(np.abs(data))
         if maxv > 0:
             data /= maxv
-        frame = 2048
-        hop = 512
+        return data, freq
+
+    def _band_edges(self, freq: int) -> np.ndarray:
+        bins = self.frame // 2 + 1
+        edges = np.searchsorted(np.arange(bins) * freq / self.frame, self.bands)
+        return np.unique(np.clip(edges, 0, bins - 1))
+
+    def _stft_flux(
+        self, data: np.ndarray, freq: int, progress: Optional[Progress] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Total and per-band positive flux, one FFT per frame computed chunk by chunk."""
+        frame = self.frame
+        n_frames = (len(data) - frame - 1) // self.hop + 1 if len(data) > frame else 0
+        edges = self._band_edges(freq)
+        if n_frames < 2:
+            return np.zeros(0), np.zeros((0, len(edges)))
+        frames = np.lib.stride_tricks.sliding_window_view(data, frame)[:: self.hop][:n_frames]
         hann = np.hanning(frame)
-        flux_values: List[float] = []
-        positions: List[int] = []
-        pos = 0
-        prev_mag = None
-        while pos + frame < len(data):
-            window = data[pos : pos + frame] * hann
-            spectrum = np.fft.rfft(window)
-            mag = np.abs(spectrum)
+        total = np.empty(n_frames - 1)
+        band = np.empty((n_frames - 1, len(edges)))
+        prev_mag: Optional[np.ndarray] = None
+        for start in range(0, n_frames, self.chunk_frames):
+            mag = np.abs(np.fft.rfft(frames[start : start + self.chunk_frames] * hann, axis=1))
             if prev_mag is not None:
-                diff = mag - prev_mag
-                flux = np.sum(np.clip(diff, 0, None))
-                flux_values.append(float(flux))
-                positions.append(pos)
-            prev_mag = mag
-            pos += hop
-        if not flux_values:
-            return []
-        flux_arr = np.asarray(flux_values)
-        # Adaptive threshold: lower threshold for higher difficulty by caller
-        # We keep detector pure; selection handles density.
-        thresh = np.median(flux_arr) + 0.6 * np.std(flux_arr)
-        peaks: List[int] = []
-        last_idx = -10
-        for i, val in enumerate(flux_arr):
-            if val < thresh or i - last_idx < 2:  # small local refractory in frames
-                continue
-            left = flux_arr[i - 1] if i > 0 else val
-            right = flux_arr[i + 1] if i + 1 < len(flux_arr) else val
-            if val >= left and val >= right:
-                peaks.append(i)
-                last_idx = i
-        times = [((positions[idx] + frame // 2) / freq) for idx in peaks]
-        return times
+                mag_pair = np.concatenate((prev_mag[None, :], mag))
+                out = slice(start - 1, start - 1 + len(mag))
+            else:
+                mag_pair = mag
+                out = slice(0, len(mag) - 1)
+            diff = np.clip(np.diff(mag_pair, axis=0), 0, None)
+            total[out] = diff.sum(axis=1)
+            band[out] = np.add.reduceat(diff, edges, axis=1)
+            prev_mag = mag[-1]
+            if progress is not None:
+                progress(0.2 + 0.7 * min(1.0, (start + len(mag)) / n_frames))
+        return total, band
+
+    def _flux(self, data: np.ndarray, freq: int, progress: Optional[Progress] = None) -> Tuple[np.ndarray, np.ndarray]:
+        workers = self.workers or os.cpu_count() or 1
+        if workers > 1 and len(data) >= self.parallel_min_seconds * freq:
+            return self._parallel_flux(data, freq, workers, progress)
+        return self._stft_flux(data, freq, progress)
+
+    def _parallel_flux(
+        self, data: np.ndarray, freq: int, workers: int, progress: Optional[Progress] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """``_stft_flux`` split into frame ranges analysed in worker processes.
+
+        Workers read the PCM from shared memory and write their flux rows into a shared
+        output block, so neither the signal nor the results are pickled. Each range also
+        decodes one frame past its end (flux compares neighbouring frames), so the merged
+        curve equals the single-pass one and thresholds/peaks are picked on it as usual.
+        """
+        n_flux = max(0, (len(data) - self.frame - 1) // self.hop)
+        n_bands = len(self._band_edges(freq))
+        step = max(self.chunk_frames, self.segment_frames // self.chunk_frames * self.chunk_frames)
+        ranges = [(start, min(start + step, n_flux)) for start in range(0, n_flux, step)]
+        if len(ranges) < 2:
+            return self._stft_flux(data, freq, progress)
+        pcm = shared_memory.SharedMemory(create=True, size=data.nbytes)
+        out = shared_memory.SharedMemory(create=True, size=n_flux * (1 + n_bands) * 8)
+        try:
+            np.ndarray(data.shape, data.dtype, pcm.buf)[:] = data
+            # spawn: 게임은 다른 스레드(차트 스트리밍 등)가 돌고 있어 fork 는 안전하지 않다
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=ctx) as pool:
+                futures = [
+                    pool.submit(
+                        _flux_range, self, pcm.name, len(data), data.dtype.str, out.name, n_flux, n_bands, freq, a, b
+                    )
+                    for a, b in ranges
+                ]
+                for done, future in enumerate(as_completed(futures), 1):
+                    future.result()
+                    if progress is not None:
+                        progress(0.2 + 0.7 * done / len(ranges))
+            total, band = _flux_views(out, n_flux, n_bands)
+            result = total.copy(), band.copy()
+            del total, band  # 공유 메모리를 닫기 전에 뷰를 놓아야 한다
+            return result
+        finally:
+            pcm.close()
+            pcm.unlink()
+            out.close()
+            out.unlink()
+
+    def _analyze_signal(self, data: np.ndarray, freq: int, progress: Optional[Progress] = None) -> OnsetAnalysis:
+        flux_arr, band_flux = self._flux(data, freq, progress)
+        analysis = OnsetAnalysis(
+            flux=flux_arr,
+            frame_rate=freq / self.hop,
+            first_frame_time=(self.hop + self.frame // 2) / freq,
+            onsets=[],
+            band_flux=band_flux,
+        )
+        if len(flux_arr) == 0:
+            return analysis
+        peaks = _pick_peaks(flux_arr, float(_onset_threshold(flux_arr)))
+        analysis.onsets = self.onset_times(peaks, freq).tolist()
+
+        # 밴드마다 자기 임계값으로 피크를 찾고, 전체 온셋 ±1 프레임 안에서 같이 친 밴드를 묶는다
+        band_thresh = _onset_threshold(band_flux)
+        hit = np.zeros(band_flux.shape, dtype=bool)
+        for b in range(band_flux.shape[1]):
+            hit[_pick_peaks(band_flux[:, b], band_thresh[b]), b] = True
+        near = hit.copy()
+        near[1:] |= hit[:-1]
+        near[:-1] |= hit[1:]
+        strength = band_flux[peaks] / np.maximum(band_thresh, 1e-9)
+        analysis.onset_bands = _band_tags(strength, near[peaks])
+        return analysis
 
+    def onset_times(self, peaks: np.ndarray, freq: int) -> np.ndarray:
+        """Seconds of flux frames (frame i compares STFT frames i and i+1)."""
+        return ((peaks + 1) * self.hop + self.frame // 2) / freq
 
-def quantize_onsets(times: List[float], bpm: int, divisions: int = 4) -> List[float]:
-    if bpm <= 0 or not times:
+
+def _flux_views(out: shared_memory.SharedMemory, n_flux: int, n_bands: int) -> Tuple[np.ndarray, np.ndarray]:
+    total = np.ndarray((n_flux,), np.float64, out.buf)
+    band = np.ndarray((n_flux, n_bands), np.float64, out.buf, offset=n_flux * 8)
+    return total, band
+
+
+def _flux_range(
+    detector: OnsetDetector,
+    pcm_name: str,
+    n_samples: int,
+    dtype: str,
+    out_name: str,
+    n_flux: int,
+    n_bands: int,
+    freq: int,
+    start: int,
+    stop: int,
+) -> None:
+    """Worker: flux rows ``start:stop`` of the shared PCM, written into the shared output block."""
+    pcm = shared_memory.SharedMemory(name=pcm_name)
+    out = shared_memory.SharedMemory(name=out_name)
+    try:
+        data = np.ndarray((n_samples,), np.dtype(dtype), pcm.buf)
+        total, band = _flux_views(out, n_flux, n_bands)
+        hop = detector.hop
+        seg_total, seg_band = detector._stft_flux(data[start * hop : stop * hop + detector.frame + 1], freq)
+        total[start:stop] = seg_total
+        band[start:stop] = seg_band
+        del data, total, band
+    finally:
+        pcm.close()
+        out.close()
+
+
+class TempoEstimator:
+    """BPM and first-beat phase from an onset flux curve (autocorrelation + comb filter)."""
+
+    def __init__(self, min_bpm: float = 70.0, max_bpm: float = 190.0, step: float = 0.25, harmonics: int = 4):
+        self.min_bpm = min_bpm
+        self.max_bpm = max_bpm
+        self.step = step
+        self.harmonics = harmonics
+
+    def estimate(self, analysis: OnsetAnalysis) -> Tuple[float, float]:
+        """Return (bpm, first beat time in seconds); (0, 0) when the curve is too short."""
+        flux = analysis.flux
+        rate = analysis.frame_rate
+        if len(flux) < int(rate * 4):
+            return 0.0, 0.0
+        x = flux - flux.mean()
+        n = len(x)
+        # FFT 자기상관 (O(n log n))
+        spec = np.fft.rfft(x, 2 * n)
+        ac = np.fft.irfft(spec * np.conj(spec))[:n]
+        ac /= ac[0] if ac[0] > 0 else 1.0
+
+        bpms = np.arange(self.min_bpm, self.max_bpm + self.step, self.step)
+        periods = 60.0 * rate / bpms  # 프레임 단위 박 길이
+        k = np.arange(1, self.harmonics + 1)
+        lags = periods[:, None] * k[None, :]
+        # 배수 지연까지 더하는 comb: 한 박의 정수배마다 자기상관이 같이 높아야 한다
+        comb = np.interp(lags, np.arange(n), ac, right=0.0).sum(axis=1)
+        # 너무 빠르거나 느린 템포로 옥타브가 튀지 않도록 120bpm 근처를 약하게 선호
+        prior = np.exp(-0.5 * (np.log2(bpms / 120.0) / 1.0) ** 2)
+        best = int(np.argmax(comb * prior))
+        bpm = float(bpms[best])
+        return bpm, self._phase(flux, rate, analysis.first_frame_time, 60.0 * rate / bpm)
+
+    def _phase(self, flux: np.ndarray, rate: float, first_frame_time: float, period: float) -> float:
+        n_beats = int((len(flux) - 1) // period)
+        if n_beats < 1:
+            return first_frame_time
+        steps = max(1, int(np.ceil(period)))
+        phases = np.linspace(0.0, period, steps, endpoint=False)
+        idx = np.rint(phases[:, None] + period * np.arange(n_beats)[None, :]).astype(np.int64)
+        idx = np.clip(idx, 0, len(flux) - 1)
+        score = flux[idx].sum(axis=1)
+        phase = phases[int(np.argmax(score))]
+        return float(first_frame_time + phase / rate)
+
+
+def quantize_onsets(times: Sequence[float], bpm: float, divisions: int = 4, beat_offset: float = 0.0) -> np.ndarray:
+    times = np.asarray(times, dtype=np.float64)
+    if bpm <= 0 or len(times) == 0:
         return times
     beat = 60.0 / bpm
     grid = beat / divisions
-    return [round(t / grid) * grid for t in times]
+    return np.round((times - beat_offset) / grid) * grid + beat_offset
 
 
-def _filter_density(times: List[float], difficulty: float) -> List[float]:
-    """Adjust density by difficulty: higher difficulty -> more notes, smaller gaps."""
-    if not times:
-        return times
-    times = sorted(times)
+# BandTag 배열: 온셋마다 (가장 센 밴드, 같이 친 밴드 비트마스크) 한 행
+_POPCOUNT = np.array([bin(m).count("1") for m in range(16)], dtype=np.int64)
+# _NTH_BIT[mask, k] = mask 에서 k 번째로 켜진 비트(레인) 번호
+_NTH_BIT = np.array([[([l for l in range(4) if m >> l & 1] + [0] * 4)[k] for k in range(4)] for m in range(16)], dtype=np.int64)
+
+
+def _pick_bit(mask: np.ndarray, u: np.ndarray) -> np.ndarray:
+    """A uniformly chosen set bit of each (non-zero) 4-bit mask, driven by uniforms ``u``."""
+    count = np.maximum(_POPCOUNT[mask], 1)
+    return _NTH_BIT[mask, np.minimum((u * count).astype(np.int64), count - 1)]
+
+
+def _min_gap_keep(times: np.ndarray, min_gap: float) -> np.ndarray:
+    """Indices kept by the greedy 'drop anything closer than min_gap to the last kept note' pass.
+
+    Notes whose gap to the previous onset is already >= min_gap always start a new cluster;
+    within clusters every chain advances together via searchsorted, one step per iteration.
+    """
+    n = len(times)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    starts = np.flatnonzero(np.concatenate(([True], np.diff(times) >= min_gap)))
+    cluster_end = np.repeat(np.append(starts[1:], n), np.diff(np.append(starts, n)))
+    step = np.searchsorted(times, times + min_gap, side="left")
+    kept = [starts]
+    current = starts
+    while len(current):
+        nxt = step[current]
+        current = nxt[nxt < cluster_end[current]]
+        kept.append(current)
+    return np.sort(np.concatenate(kept))
+
+
+def _min_gap(difficulty: float) -> float:
     # min gap shrinks with difficulty
-    min_gap = max(0.08, 0.18 - 0.05 * (difficulty - 1))
-    keep: List[float] = []
-    last_t = -1e9
-    for t in times:
-        if t - last_t < min_gap:
-            continue
-        keep.append(t)
-        last_t = t
+    return max(0.08, 0.18 - 0.05 * (difficulty - 1))
+
+
+def _filter_density(
+    times: Sequence[float], difficulty: float, bands: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Adjust density by difficulty: higher difficulty -> more notes, smaller gaps.
+
+    ``bands`` (rows parallel to ``times``) is carried along with the surviving onsets.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    if len(times) == 0:
+        return times, bands
+    order = np.argsort(times, kind="stable")
+    keep = order[_min_gap_keep(times[order], _min_gap(difficulty))]
     # If still too dense/sparse, randomly drop/add slightly
-    rng = random.Random(len(times))
+    rng = np.random.default_rng(len(times))
     target_mult = difficulty
     if target_mult < 1.0:
         drop_prob = min(0.6, 0.2 + (1.0 - target_mult))
-        keep = [t for t in keep if rng.random() > drop_prob]
+        keep = keep[rng.random(len(keep)) > drop_prob]
+        out_times = times[keep]
     elif target_mult > 1.0:
         # Duplicate occasional notes for chords/extra hits
-        extras: List[float] = []
-        for t in keep:
-            if rng.random() < 0.15 * (target_mult - 1.0):
-                extras.append(t + rng.uniform(-0.02, 0.02))
-        keep.extend(extras)
-        keep.sort()
-    return keep
-
-
-def map_onsets_to_lanes(times: List[float], seed: int, difficulty: float) -> List[Tuple[int, float]]:
-    times = _filter_density(times, difficulty)
-    rng = random.Random(seed)
-    chart: List[Tuple[int, float]] = []
-    prev_lane = rng.randrange(4) if times else 0
-    for i, t in enumerate(times):
-        candidates = list(range(4))
-        if rng.random() < 0.7 and prev_lane in candidates and len(candidates) > 1:
-            candidates.remove(prev_lane)
-        lane = rng.choice(candidates)
-        prev_lane = lane
-        chart.append((lane, t))
+        extra = rng.random(len(keep)) < 0.15 * (target_mult - 1.0)
+        jitter = rng.uniform(-0.02, 0.02, len(keep))[extra]
+        out_times = np.concatenate((times[keep], times[keep[extra]] + jitter))
+        keep = np.concatenate((keep, keep[extra]))
+        resort = np.argsort(out_times, kind="stable")
+        out_times, keep = out_times[resort], keep[resort]
+    else:
+        out_times = times[keep]
+    return out_times, None if bands is None else np.asarray(bands)[keep]
+
+
+def _break_jacks(lanes: np.ndarray, masks: np.ndarray, u: np.ndarray, side: np.ndarray) -> np.ndarray:
+    """Move every third note of a same-lane run onto a co-hitting band or an adjacent lane."""
+    n = len(lanes)
+    run_start = np.concatenate(([True], lanes[1:] != lanes[:-1]))
+    start_idx = np.maximum.accumulate(np.where(run_start, np.arange(n), 0))
+    move = (np.arange(n) - start_idx) % 3 == 2
+    others = masks & ~(1 << lanes) & 0xF
+    alt = np.where(others > 0, _pick_bit(others, u), (lanes + side) % 4)
+    return np.where(move, alt, lanes)
+
+
+def map_onsets_to_lanes(
+    times: Sequence[float], seed: int, difficulty: float, bands: Optional[np.ndarray] = None
+) -> List[Tuple[int, float]]:
+    """Assign lanes to onsets.
+
+    With ``bands`` from the multi-band detector, lanes follow pitch (low band -> left lane)
+    and chords land on the other bands that hit at the same time; otherwise lanes are random.
+    Output is deterministic for a given ``seed``.
+    """
+    times, bands = _filter_density(times, difficulty, bands)
+    n = len(times)
+    if n == 0:
+        return []
+    rng = np.random.default_rng(seed)
+    u_lane, u_alt, u_chord, u_pick = rng.random((4, n))
+    if bands is not None:
+        masks = bands[:, 1] & 0xF
+        lanes = _break_jacks(np.minimum(bands[:, 0], 3), masks, u_alt, rng.choice((-1, 1), n))
+        others = masks & ~(1 << lanes) & 0xF
+        chord = (others > 0) & (u_chord < 0.35 * difficulty)
+    else:
+        # 70% 확률로 직전 레인을 피한다: 이전 레인에서 1~3 칸(또는 0~3 칸) 이동
+        avoid = u_lane < 0.7
+        steps = np.where(avoid, 1 + (u_alt * 3).astype(np.int64), (u_alt * 4).astype(np.int64))
+        lanes = (rng.integers(4) + np.cumsum(steps)) % 4
+        others = 0xF & ~(1 << lanes)
         # Add chord when close timing and higher difficulty
-        if i > 0 and times[i] - times[i - 1] < 0.22 and rng.random() < 0.35 * difficulty:
-            chord_lane = rng.choice([l for l in range(4) if l != lane])
-            chart.append((chord_lane, t))
-    return chart
+        close = np.concatenate(([False], np.diff(times) < 0.22))
+        chord = close & (u_chord < 0.35 * difficulty)
+    chord_lanes = _pick_bit(others[chord], u_pick[chord])
+    # 코드 노트는 본 노트 바로 뒤에 오도록 끼워 넣는다
+    all_lanes = np.concatenate((lanes, chord_lanes))
+    all_times = np.concatenate((times, times[chord]))
+    order = np.argsort(np.concatenate((np.arange(n) * 2, np.flatnonzero(chord) * 2 + 1)), kind="stable")
+    return list(zip(all_lanes[order].tolist(), all_times[order].tolist()))
 
 
 class ProceduralChartGenerator:
@@ -147,34 +452,59 @@ class ProceduralChartGenerator:
 
 
 class OnsetChartGenerator:
-    def __init__(self, detector: OnsetDetector, fallback: ProceduralChartGenerator, allow_onset: bool = True):
+    """Onset chart pipeline: audio analysis (per file) -> grid quantization (per tempo) -> lanes (per difficulty).
+
+    Only the last stage depends on difficulty, so the FFT pass runs once per audio file
+    no matter how many difficulties are generated.
+    """
+
+    def __init__(
+        self,
+        detector: OnsetDetector,
+        fallback: ProceduralChartGenerator,
+        allow_onset: bool = True,
+        tempo: Optional[TempoEstimator] = None,
+    ):
         self.detector = detector
         self.fallback = fallback
         self.allow_onset = allow_onset
+        self.tempo = tempo or TempoEstimator()
         self.cache: Dict[str, Tuple[List[Tuple[int, float]], str]] = {}
+        # 곡 파일별 분석 결과 (실패하면 None 을 넣어 다시 시도하지 않는다)
+        self.analysis_cache: Dict[str, Optional[OnsetAnalysis]] = {}
+        # 곡 파일별 추정 템포 (bpm, 첫 박 위치) — 차트와 함께 캐시
+        self.tempo_cache: Dict[str, Tuple[float, float]] = {}
 
-    def generate(self, song: Song) -> Tuple[List[Tuple[int, float]], str]:
-        cache_key = f"{song.name}|{song.path}|{song.bpm}|{song.difficulty}|{song.chart_offset}"
+    def generate(self, song: Song, progress: Optional[Progress] = None) -> Tuple[List[Tuple[int, float]], str]:
+        if song.bpm <= 0:
+            song.auto_tempo = True
+        tempo_key = "auto" if song.auto_tempo else song.bpm
+        cache_key = f"{song.name}|{song.path}|{tempo_key}|{song.difficulty}|{song.chart_offset}"
         if cache_key in self.cache:
+            self._apply_tempo(song)
             return self.cache[cache_key]
 
         chart: List[Tuple[int, float]] = []
         source = "procedural"
 
         if self.allow_onset:
-            try:
-                onsets = self.detector.detect(song.path)
-            except Exception as exc:
-                print(f"[warn] onset detection failed: {exc}")
-                onsets = []
-            if onsets and len(onsets) >= 5:
+            analysis = self.analysis_for(song.path, progress)
+            if analysis is not None and song.auto_tempo and song.path not in self.tempo_cache:
+                bpm, first_beat = self.tempo.estimate(analysis)
+                if bpm > 0:
+                    self.tempo_cache[song.path] = (bpm, first_beat)
+            self._apply_tempo(song)
+            if analysis is not None and len(analysis.onsets) >= 5:
                 seed = stable_seed(f"{song.name}:{song.path}")
-                times = quantize_onsets(onsets, song.bpm)
-                times = [max(MIN_FIRST_NOTE, t + song.chart_offset) for t in times]
-                chart = map_onsets_to_lanes(times, seed=seed, difficulty=song.difficulty)
+                times = quantize_onsets(analysis.onsets, song.bpm, beat_offset=song.beat_offset or 0.0)
+                times = np.maximum(MIN_FIRST_NOTE, times + song.chart_offset)
+                bands = analysis.onset_bands if len(analysis.onset_bands) else None
+                chart = map_onsets_to_lanes(times, seed=seed, difficulty=song.difficulty, bands=bands)
                 source = "onset"
 
         if not chart:
+            if song.bpm <= 0:
+                song.bpm = DEFAULT_BPM
             chart = self.fallback.generate(song)
             source = "procedural"
 
@@ -183,4 +513,257 @@ class OnsetChartGenerator:
         end_time = max(t for _, t in chart) if chart else song.length_hint
         song.length_hint = max(song.length_hint, end_time)
         self.cache[cache_key] = (chart, source)
+        if progress is not None:
+            progress(1.0)
         return chart, source
+
+    def analysis_for(self, path: str, progress: Optional[Progress] = None) -> Optional[OnsetAnalysis]:
+        """Onset/flux analysis of one audio file, computed on first use."""
+        if path not in self.analysis_cache:
+            try:
+                self.analysis_cache[path] = self.detector.analyze(path, progress)
+            except Exception as exc:
+                print(f"[warn] onset detection failed: {exc}")
+                self.analysis_cache[path] = None
+        return self.analysis_cache[path]
+
+    def generate_ladder(
+        self, song: Song, difficulties: Sequence[float] = DIFFICULTY_LADDER
+    ) -> List[Tuple[float, List[Tuple[int, float]], str]]:
+        """Charts for several difficulties of one song, sharing a single audio analysis."""
+        ladder: List[Tuple[float, List[Tuple[int, float]], str]] = []
+        for difficulty in difficulties:
+            variant = replace(song, difficulty=difficulty)
+            chart, source = self.generate(variant)
+            song.bpm, song.beat_offset, song.auto_tempo = variant.bpm, variant.beat_offset, variant.auto_tempo
+            song.length_hint = max(song.length_hint, variant.length_hint)
+            ladder.append((difficulty, chart, source))
+        return ladder
+
+    def stream(self, song: Song) -> "ProgressiveChart":
+        """Progressive chart job for ``song``; already complete when it was streamed before."""
+        key = f"stream|{song.name}|{song.path}|{song.bpm if not song.auto_tempo and song.bpm > 0 else 'auto'}|{song.difficulty}|{song.chart_offset}"
+        if key in self.cache:
+            self._apply_tempo(song)
+            chart, source = self.cache[key]
+            return ProgressiveChart.finished(song, chart, source)
+
+        def store(job: ProgressiveChart) -> None:
+            self.cache[key] = job.result()
+            if song.auto_tempo and song.bpm > 0:
+                self.tempo_cache[song.path] = (song.bpm, song.beat_offset or 0.0)
+
+        return ProgressiveChart(song, self.detector, self.tempo, self.fallback, on_done=store)
+
+    def _apply_tempo(self, song: Song) -> None:
+        if song.auto_tempo and song.path in self.tempo_cache:
+            song.bpm, song.beat_offset = self.tempo_cache[song.path]
+
+
+class ProgressiveChart:
+    """Onset chart produced segment by segment so a song can start before analysis ends.
+
+    Each segment only sees audio up to its end plus ``lookahead`` and takes its thresholds
+    from the last ``context`` seconds, so the finished chart is the same however fast the
+    worker runs. ``horizon`` is the song time up to which the chart is final.
+    """
+
+    segment = 6.0  # 한 번에 처리하는 오디오 길이(초)
+    lookahead = 1.0
+    context = 30.0
+    tempo_window = 30.0  # 자동 BPM 은 앞부분만 보고 정한다
+
+    def __init__(
+        self,
+        song: Song,
+        detector: OnsetDetector,
+        tempo: TempoEstimator,
+        fallback: ProceduralChartGenerator,
+        on_done: Optional[Callable[["ProgressiveChart"], None]] = None,
+    ) -> None:
+        self.song = song
+        self.detector = detector
+        self.tempo = tempo
+        self.fallback = fallback
+        self.on_done = on_done
+        self.seed = stable_seed(f"{song.name}:{song.path}")
+        self.cond = threading.Condition()
+        self.notes: List[Tuple[int, float]] = []
+        self.horizon = 0.0
+        self.progress = 0.0
+        self.done = False
+        self.source = "onset"
+        self._data: Optional[np.ndarray] = None
+        self._freq = 0
+        self._n_flux = 0
+        self._computed = 0
+        self._next = 0
+        self._segment_idx = 0
+        self._last_peak = -10
+        self._last_kept = -1e9
+        n_bands = len(detector.bands)
+        self._band_last = [-10] * n_bands
+        self._prev_hit = np.zeros(n_bands, dtype=bool)  # 직전 세그먼트 마지막 프레임의 밴드 피크
+
+    @classmethod
+    def finished(cls, song: Song, chart: List[Tuple[int, float]], source: str) -> "ProgressiveChart":
+        job = cls(song, OnsetDetector(), TempoEstimator(), ProceduralChartGenerator())
+        job.notes = list(chart)
+        job.source = source
+        job.horizon = float("inf")
+        job.progress = 1.0
+        job.done = True
+        return job
+
+    # ---- 소비자 쪽 ----
+    def notes_from(self, start: int) -> Tuple[List[Tuple[int, float]], int]:
+        """Notes published after index ``start`` and the index to continue from."""
+        with self.cond:
+            return self.notes[start:], len(self.notes)
+
+    def wait(self, horizon: Optional[float] = None, timeout: Optional[float] = None) -> bool:
+        """Block until the chart is final up to ``horizon`` (or complete when None)."""
+        with self.cond:
+            return self.cond.wait_for(
+                lambda: self.done or (horizon is not None and self.horizon >= horizon), timeout
+            )
+
+    def result(self) -> Tuple[List[Tuple[int, float]], str]:
+        chart = sorted(self.notes, key=lambda x: x[1])
+        return chart, self.source
+
+    # ---- 작업 쪽 ----
+    def run(self) -> None:
+        try:
+            while self.step():
+                pass
+        except Exception as exc:
+            print(f"[warn] progressive chart failed for '{self.song.name}': {exc}")
+            self._finish()
+
+    def step(self) -> bool:
+        """Chart the next segment; False once the chart is complete."""
+        if self.done:
+            return False
+        if self._data is None:
+            if not self._start():
+                self._finish()
+                return False
+        if self._next >= self._n_flux:
+            self._finish()
+            return False
+        self._chart_segment()
+        return True
+
+    def _start(self) -> bool:
+        song = self.song
+        try:
+            self._data, self._freq = self.detector._load_signal(song.path)
+        except Exception as exc:
+            print(f"[warn] onset detection failed: {exc}")
+            return False
+        det = self.detector
+        self._n_flux = max(0, (len(self._data) - det.frame - 1) // det.hop)
+        self._flux = np.zeros(self._n_flux)
+        self._band = np.zeros((self._n_flux, len(det.bands)))
+        self._rate = self._freq / det.hop
+        self._seg_frames = max(1, int(round(self.segment * self._rate)))
+        if song.bpm <= 0:
+            song.auto_tempo = True
+        if song.auto_tempo:
+            head = min(self._n_flux, int(self.tempo_window * self._rate))
+            self._compute_flux(head)
+            analysis = OnsetAnalysis(
+                flux=self._flux[:head],
+                frame_rate=self._rate,
+                first_frame_time=(det.hop + det.frame // 2) / self._freq,
+                onsets=[],
+            )
+            bpm, first_beat = self.tempo.estimate(analysis)
+            if bpm > 0:
+                song.bpm, song.beat_offset = bpm, first_beat
+        self.progress = 0.2
+        return True
+
+    def _compute_flux(self, upto: int) -> None:
+        if upto <= self._computed:
+            return
+        hop = self.detector.hop
+        chunk = self._data[self._computed * hop : upto * hop + self.detector.frame + 1]
+        total, band = self.detector._stft_flux(chunk, self._freq)
+        self._flux[self._computed : upto] = total
+        self._band[self._computed : upto] = band
+        self._computed = upto
+
+    def _chart_segment(self) -> None:
+        song = self.song
+        a = self._next
+        b = min(self._n_flux, a + self._seg_frames)
+        avail = min(self._n_flux, b + int(self.lookahead * self._rate))
+        self._compute_flux(avail)
+        flux = self._flux[:avail]
+        band = self._band[:avail]
+        ctx = max(0, b - int(self.context * self._rate))
+        peaks = _pick_peaks(flux, float(_onset_threshold(flux[ctx:])), a, b, self._last_peak)
+        if len(peaks):
+            self._last_peak = int(peaks[-1])
+
+        # 밴드 피크: 행 0 = 프레임 a-1, 마지막 행 = 프레임 b (다음 세그먼트 것이지만 ±1 묶음에 필요)
+        band_thresh = _onset_threshold(band[ctx:])
+        hit = np.zeros((b - a + 2, band.shape[1]), dtype=bool)
+        hit[0] = self._prev_hit
+        for j in range(band.shape[1]):
+            band_peaks = _pick_peaks(band[:, j], band_thresh[j], a, b + 1, self._band_last[j])
+            hit[band_peaks - a + 1, j] = True
+            committed = band_peaks[band_peaks < b]
+            if len(committed):
+                self._band_last[j] = int(committed[-1])
+        self._prev_hit = hit[b - a].copy()
+
+        piece: List[Tuple[int, float]] = []
+        if len(peaks):
+            rows = peaks - a
+            near = hit[rows] | hit[rows + 1] | hit[rows + 2]
+            tags = _band_tags(band[peaks] / np.maximum(band_thresh, 1e-9), near)
+            times = quantize_onsets(self.detector.onset_times(peaks, self._freq), song.bpm, beat_offset=song.beat_offset or 0.0)
+            times = np.maximum(MIN_FIRST_NOTE, times + song.chart_offset)
+            # 세그먼트 경계를 넘어서도 최소 간격을 지킨다
+            keep = times >= self._last_kept + _min_gap(song.difficulty)
+            piece = map_onsets_to_lanes(times[keep], self.seed + self._segment_idx, song.difficulty, tags[keep])
+            piece = [(lane, max(MIN_FIRST_NOTE, t)) for lane, t in piece]
+            if piece:
+                self._last_kept = max(t for _, t in piece)
+
+        if b >= self._n_flux:
+            horizon = float("inf")
+        else:
+            grid = 15.0 / song.bpm if song.bpm > 0 else 0.0
+            # 다음 세그먼트 노트가 양자화/지터로 당겨질 수 있는 만큼 여유를 둔다
+            horizon = float(self.detector.onset_times(np.asarray(b), self._freq)) + song.chart_offset - grid / 2 - 0.02
+        self._next = b
+        self._segment_idx += 1
+        with self.cond:
+            self.notes.extend(piece)
+            self.horizon = max(self.horizon, horizon)
+            self.progress = 0.2 + 0.8 * b / max(1, self._n_flux)
+            self.cond.notify_all()
+
+    def _finish(self) -> None:
+        song = self.song
+        chart: List[Tuple[int, float]] = []
+        if not self.notes:
+            if song.bpm <= 0:
+                song.bpm = DEFAULT_BPM
+            chart = [(lane, max(MIN_FIRST_NOTE, t)) for lane, t in self.fallback.generate(song)]
+            self.source = "procedural"
+        end_time = max((t for _, t in self.notes + chart), default=song.length_hint)
+        song.length_hint = max(song.length_hint, end_time)
+        self._data = None
+        with self.cond:
+            self.notes.extend(chart)
+            self.horizon = float("inf")
+            self.progress = 1.0
+            self.done = True
+            self.cond.notify_all()
+        if self.on_done is not None:
+            self.on_done(self)
@@ -0,0 +1,103 @@
+import json
+import os
+import string
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+FONT_CACHE_PATH = "font_cache.json"
+
+_paths: Optional[Dict[str, List]] = None
+_fonts: Dict[Tuple[str, int, bool], pygame.font.Font] = {}
+
+
+def _load_paths() -> Dict[str, List]:
+    global _paths
+    if _paths is None:
+        _paths = {}
+        if os.path.exists(FONT_CACHE_PATH):
+            try:
+                with open(FONT_CACHE_PATH, encoding="utf-8") as fh:
+                    _paths = json.load(fh)
+            except (OSError, ValueError):
+                _paths = {}
+    return _paths
+
+
+def _save_paths() -> None:
+    try:
+        with open(FONT_CACHE_PATH, "w", encoding="utf-8") as fh:
+            json.dump(_paths, fh, indent=1)
+    except OSError as exc:
+        print(f"[warn] font cache save failed for {FONT_CACHE_PATH}: {exc}")
+
+
+def _resolve(name: str, bold: bool) -> Tuple[Optional[str], bool]:
+    """What SysFont would pick: (font file or None for the default font, fake-bold flag)."""
+    found: Dict[str, object] = {}
+
+    def capture(path: Optional[str], size: int, set_bold: bool, set_italic: bool) -> None:
+        found["path"], found["bold"] = path, set_bold
+
+    pygame.font.SysFont(name, 1, bold=bold, constructor=capture)  # 시스템 폰트 전체 스캔 (느림)
+    return found.get("path"), bool(found.get("bold"))
+
+
+def font_path(name: str, bold: bool = False) -> Tuple[Optional[str], bool]:
+    """Font file for ``name``, resolved once and remembered on disk so later runs skip the scan."""
+    paths = _load_paths()
+    key = f"{name}|{'bold' if bold else 'regular'}"
+    cached = paths.get(key)
+    if cached is not None and (cached[0] is None or os.path.exists(cached[0])):
+        return cached[0], cached[1]
+    path, fake_bold = _resolve(name, bold)
+    paths[key] = [path, fake_bold]
+    _save_paths()
+    return path, fake_bold
+
+
+def load_font(name: str, size: int, bold: bool = False) -> pygame.font.Font:
+    """Drop-in for ``pygame.font.SysFont`` backed by the font path cache."""
+    key = (name, size, bold)
+    font = _fonts.get(key)
+    if font is None:
+        path, fake_bold = font_path(name, bold)
+        font = pygame.font.Font(path, size)
+        if fake_bold:
+            font.set_bold(True)
+        _fonts[key] = font
+    return font
+
+
+class GlyphText:
+    """Per-character glyphs of one font and colour, for text that changes every frame.
+
+    Drawing blits cached glyphs instead of rendering a new Surface (scores, timers); fine
+    for the monospace UI font, kerning is not applied.
+    """
+
+    CHARS = string.digits + string.ascii_letters + " ./:-+!%()"
+
+    def __init__(self, font: pygame.font.Font, color: Tuple[int, int, int], chars: str = CHARS) -> None:
+        self.glyphs = {ch: font.render(ch, True, color) for ch in chars}
+        self.advance = {ch: glyph.get_width() for ch, glyph in self.glyphs.items()}
+        self.height = font.get_height()
+
+    def width(self, text: str) -> int:
+        advance = self.advance
+        total = 0
+        for ch in text:
+            total += advance.get(ch, 0)
+        return total
+
+    def draw(self, screen: pygame.Surface, text: str, x: int, y: int) -> None:
+        glyphs = self.glyphs
+        advance = self.advance
+        for ch in text:
+            glyph = glyphs.get(ch)
+            if glyph is not None:
+                screen.blit(glyph, (x, y))
+                x += advance[ch]
+
+    def draw_centered(self, screen: pygame.Surface, text: str, cx: int, cy: int) -> None:
+        self.draw(screen, text, cx - self.width(text) // 2, cy - self.height // 2)
@@ -1,43 +1,160 @@
 import sys
-from typing import List, Optional, Tuple
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 
 import pygame
 
-from audio_player import AudioPlayer
-from models import Song, Track
-
-MIN_FIRST_NOTE = 0.4  # clamp first note a bit after lead-in
+from audio_player import AudioPlayer, ensure_mixer
+from calibration import Calibration, LatencyProfile, device_id, load_profile, save_profile
+from broadcast import BROADCAST_HZ, EVENT_GAME_OVER, EVENT_KO, EVENT_MENU, EVENT_START, MatchBroadcaster, MatchEvent
+from fonts import GlyphText, load_font
+from keysounds import KeySounds
+from library import SongLibrary
+from models import DUPLICATE_GAP, MIN_FIRST_NOTE, CompiledChart, Song, TimingStats, Track, chart_hash, compile_chart
+from netplay import NetSession, now_ms
+from perf import PlayPerf
+from replay import Replay, ReplayPlayer, ReplayRecorder, latest_replay, replay_path
+from results import MatchResult, PlayerResult, ResultStore
+from rules import DEFAULT_RULES, SIM_HZ, load_rules
+
+if TYPE_CHECKING:
+    from chart import OnsetChartGenerator, ProgressiveChart
+
+
+MENU_ROWS = 8  # 메뉴에 한 번에 보이는 곡 수
+LEADERBOARD_ROWS = 5
+BROADCAST_STEPS = SIM_HZ // BROADCAST_HZ  # 관전 스냅샷을 보내는 스텝 간격
+RENDER_FPS = 240  # 렌더링 상한: 디스플레이가 따라오는 만큼 그리되 CPU 를 다 쓰지는 않게
+PRACTICE_PREROLL = 2.0  # 연습 모드에서 탐색/반복 지점 앞에 붙이는 준비 시간 (초)
+PRACTICE_STEP = 5.0  # 연습 모드 Left/Right 한 번에 움직이는 시간 (초)
+RATE_STEP = 0.1  # 연습 모드 재생 속도 단위 (0.5x ~ 1.0x)
+PRACTICE_SECTIONS = 10  # 숫자키 1..9,0 으로 고르는 차트 구간 수
+STREAM_SAFETY = 4.0  # 곡 시간 기준으로 차트가 이만큼 앞서 있어야 시작/진행한다 (노트가 화면에 보이는 시간보다 길게)
+
+_chart_generator: Optional["OnsetChartGenerator"] = None
+_chart_jobs: Dict[str, "ProgressiveChart"] = {}
+_chart_lock = threading.Lock()
+_compiled_charts: Dict[Tuple[str, float], Tuple[List[Tuple[int, float]], float, CompiledChart]] = {}
+
+
+def chart_job(song: Song) -> "ProgressiveChart":
+    """Progressive chart job of a chartless song; the first request starts it on a worker thread."""
+    global _chart_generator
+    with _chart_lock:
+        job = _chart_jobs.get(song.name)
+        if job is None:
+            if _chart_generator is None:
+                # numpy 를 끌어오는 차트 모듈은 자동 차트 곡을 처음 고를 때 읽는다 (시작 시간 단축)
+                from chart import OnsetChartGenerator, OnsetDetector, ProceduralChartGenerator
+
+                _chart_generator = OnsetChartGenerator(OnsetDetector(), ProceduralChartGenerator())
+            job = _chart_generator.stream(song)
+            _chart_jobs[song.name] = job
+            threading.Thread(target=_run_chart_job, args=(song, job), name="chart-stream", daemon=True).start()
+        return job
+
+
+def _run_chart_job(song: Song, job: "ProgressiveChart") -> None:
+    job.run()
+    song.chart, song.chart_source = job.result()
+
+
+def ensure_chart(song: Song) -> None:
+    """Fill ``song.chart`` from the audio when the song has no manual chart (blocking)."""
+    if song.chart:
+        return
+    job = chart_job(song)
+    job.wait()
+    song.chart, song.chart_source = job.result()
+
+
+def song_chart(song: Song, rate: float = 1.0) -> CompiledChart:
+    """Song chart with audio offset applied, compiled once per chart, offset and playback rate."""
+    ensure_chart(song)
+    source = song.chart or []
+    cached = _compiled_charts.get((song.name, rate))
+    if cached is not None and cached[0] is source and cached[1] == song.offset:
+        return cached[2]
+    chart = compile_chart(source, song.offset, MIN_FIRST_NOTE, rate)
+    if (chart.merged or chart.dropped) and rate == 1.0:
+        print(f"[warn] chart of '{song.name}': merged {chart.merged} duplicate note(s), dropped {chart.dropped} invalid note(s)")
+    _compiled_charts[(song.name, rate)] = (source, song.offset, chart)
+    return chart
+
+
+class ChartLoad:
+    """A song start waiting for its chart job (shown as the loading screen).
+
+    ``full`` waits for the whole chart (replays need it for the hash check); otherwise the
+    song starts as soon as the chart is final ``STREAM_SAFETY`` seconds in.
+    """
+
+    def __init__(self, song: Song, on_ready: Callable[[Song], None], full: bool = False) -> None:
+        self.song = song
+        self.on_ready = on_ready
+        self.full = full
+        self.job = chart_job(song)
+
+    @property
+    def progress(self) -> float:
+        return 1.0 if self.ready() else self.job.progress
+
+    def ready(self) -> bool:
+        return self.job.done or (not self.full and self.job.horizon >= STREAM_SAFETY)
 
 
 class Game:
-    def __init__(self) -> None:
-        pygame.init()
+    def __init__(
+        self,
+        net: Optional[NetSession] = None,
+        broadcaster: Optional[MatchBroadcaster] = None,
+        perf_mode: bool = True,
+        keysounds: bool = True,
+    ) -> None:
+        # pygame.init() 은 쓰지 않는 서브시스템까지 열고, 믹서는 AudioPlayer 가 백그라운드로 연다
+        pygame.display.init()
+        pygame.font.init()
         self.width, self.height = 1440, 810
         self.screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("Battle! Rhythm Hell")
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont("Menlo", 22)
-        self.big_font = pygame.font.SysFont("Menlo", 36, bold=True)
-        self.label_font = pygame.font.SysFont("Menlo", 26, bold=True)
-        self.menu_font = pygame.font.SysFont("Menlo", 26)
-        self.menu_big_font = pygame.font.SysFont("Menlo", 44, bold=True)
+        self.font = load_font("Menlo", 22)
+        self.big_font = load_font("Menlo", 36, bold=True)
+        self.label_font = load_font("Menlo", 26, bold=True)
+        self.menu_font = load_font("Menlo", 26)
+        self.menu_big_font = load_font("Menlo", 44, bold=True)
 
         self.hit_y = self.height - 150
         self.speed = 420
 
         self.tracks = self._make_tracks()
-        self.songs = self._load_song_list()
+        # 곡 목록은 인덱스(library.json)만 읽고, 차트가 든 Song 은 고를 때 만든다
+        self.library = SongLibrary.open()
         self.selected_song_idx = 0
+        self.menu_top = 0  # 가상 스크롤: 화면에 보이는 첫 줄
+        self.menu_label_cache: Dict[Tuple[int, bool, str], pygame.Surface] = {}
 
         self.state = "menu"
         self.audio = AudioPlayer()
+        self.keysounds = KeySounds(enabled=keysounds)
+        self.results = ResultStore()  # 경기 기록 (백그라운드 스레드가 SQLite 에 쓴다)
+        # 기기별 지연 보정: 곡마다의 offset 위에 전역으로 더한다 (처음 곡을 시작할 때 읽는다)
+        self.latency = LatencyProfile()
+        self.latency_device: Optional[str] = None
+        self.calibration: Optional[Calibration] = None
+        self.timing_hud: bool = False  # H: 플레이 중 타이밍 히스토그램 표시
         self.song_end: float = 0.0
         self.start_ms: int = pygame.time.get_ticks()
         self.current_song: Optional[Song] = None
         self.just_started: bool = False
         self.play_mode: str = "sudden"
         self.game_modes = [("sudden", "Sudden KO"), ("endurance", "Endurance")]
+        if net is None:
+            # 연습은 탐색/반복으로 두 화면이 어긋나므로 로컬 대전에서만
+            self.game_modes.append(("practice", "Practice"))
         self.selected_mode_idx: int = 0
+        # 모드별 판정/HP 규칙 (rules.json 에서 덮어쓰기 가능)
+        self.mode_rules = load_rules()
 
         # (예전 ESC 확인용 플래그 – 지금은 안 씀, 남겨만둠)
         self.confirming_exit: bool = False
@@ -64,6 +181,52 @@ class Game:
         self.last_combo_attack_time: float = -1.0
         self.last_combo_attack_player: Optional[int] = None
 
+        # 리플레이 기록/재생
+        self.recorder = ReplayRecorder()
+        self.replay_player: Optional[ReplayPlayer] = None
+
+        # 네트워크 대전: 각자 자기 키보드의 QWER 로 자기 트랙만 친다
+        self.net = net
+        if self.net is not None:
+            local_keys = self.tracks[0].keys
+            for idx, track in enumerate(self.tracks):
+                track.keys = dict(local_keys) if idx == self.net.player_idx else {}
+
+        # 관전용 상태 방송 (논블로킹 UDP)
+        self.broadcaster = broadcaster
+
+        # 수동 차트가 없는 곡은 백그라운드에서 차트를 만들면서 시작
+        self.chart_load: Optional[ChartLoad] = None
+        self.chart_stream: Optional["ProgressiveChart"] = None  # 플레이 중에도 노트가 계속 추가되는 차트
+        self.stream_pos: int = 0
+        self.late_notes: int = 0
+
+        # 고정 스텝 시뮬레이션: 곡 시간 sim_steps / SIM_HZ 까지 판정이 끝난 상태
+        self.sim_steps: int = 0
+
+        # 연습 모드: A–B 반복 구간 (곡 시간, 초)과 재생 속도
+        self.loop_a: Optional[float] = None
+        self.loop_b: Optional[float] = None
+        self.rate: float = 1.0  # 지금 재생 중인 속도 (차트 시간도 이 속도에 맞춰져 있다)
+        self.practice_rate: float = 1.0  # 고른 속도: 늘린 오디오가 준비되면 rate 가 따라간다
+
+        # 퍼포먼스 플레이 모드: 플레이 화면용 Surface 는 곡 시작 때 미리 만들고, 곡 중에는 GC 를 멈춘다
+        self.perf = PlayPerf(enabled=perf_mode)
+        self.play_bg: Optional[pygame.Surface] = None
+        self.divider_glow: Optional[pygame.Surface] = None
+        self.dim_overlays: Dict[int, pygame.Surface] = {}
+        self.drain_overlay: Optional[pygame.Surface] = None
+        self.glyphs: Dict[Tuple[int, int, int], GlyphText] = {}
+        self.big_glyphs: Optional[GlyphText] = None
+        self.text_cache: Dict[Tuple[str, str, Tuple[int, int, int]], pygame.Surface] = {}
+        self.panel_labels: Dict[str, Tuple[pygame.Surface, pygame.Surface]] = {}
+        # 패널 Rect/색도 곡 시작 때 만든다: (패널, HP 바, HP 채움, 타이밍 HUD), (패널, 테두리, HP 바 테두리)
+        self.panel_rects: Dict[str, Tuple[pygame.Rect, pygame.Rect, pygame.Rect, pygame.Rect]] = {}
+        self.panel_colors: Dict[str, Tuple[Tuple[int, int, int, int], ...]] = {}
+        self.hp_colors: List[Tuple[int, int, int]] = []  # HP 1% 단위 색
+        # 점수/콤보/HP 문자열은 값이 바뀔 때만 다시 만든다: [점수, 글자, 콤보, 글자, HP, 글자]
+        self.panel_text: Dict[str, list] = {}
+
     def _make_tracks(self) -> Tuple[Track, Track]:
         half = self.width // 2
         left_keys = {pygame.K_q: 0, pygame.K_w: 1, pygame.K_e: 2, pygame.K_r: 3}
@@ -73,492 +236,80 @@ class Game:
             Track("Player 2", half, half, right_keys, (255, 176, 122)),
         )
 
-    def _load_song_list(self) -> List[Song]:
-        return [
-            Song(
-                "Beethoven Virus",
-                "songs/Beethoven Virus.mp3",
-                bpm=162,
-                offset=-0.5,
-                difficulty=7.0,
-                chart = [
-                (1, 8.000), (2, 8.185), (3, 8.370), (1, 8.555),
-                (0, 8.740), (1, 8.925), (2, 9.110), (3, 9.295),
-
-                (1, 9.480), (3, 9.750), (2, 9.935), (0, 10.120),
-                (1, 10.305), (2, 10.490), (3, 10.675), (1, 10.860),
-
-                # 16분 3연타 패턴
-                (2, 11.045), (2, 11.138), (2, 11.230),
-
-                (0, 11.415), (1, 11.600), (3, 11.785), (2, 11.970),
-                (1, 12.155), (0, 12.340), (2, 12.525), (3, 12.710),
-
-                # 좌우 대칭 점프 패턴
-                (0, 12.895), (3, 12.895),
-                (1, 13.080), (2, 13.080),
-                (0, 13.265), (3, 13.265),
-
-                (1, 13.450), (2, 13.635), (3, 13.820), (1, 14.005),
-                (0, 14.190), (1, 14.375), (2, 14.560), (3, 14.745),
-
-                # 16분 계단
-                (0, 14.930), (1, 15.015), (2, 15.100), (3, 15.185),
-
-                (2, 15.370), (1, 15.555), (0, 15.740), (3, 15.925),
-                (1, 16.110), (2, 16.295), (3, 16.480), (1, 16.665),
-
-                # 중간 하이라이트 계단+점프
-                (0, 16.850), (3, 16.850),
-                (1, 17.035), (2, 17.220),
-                (0, 17.405), (3, 17.590),
-
-                (1, 17.775), (2, 17.960), (3, 18.145), (1, 18.330),
-                (0, 18.515), (1, 18.700), (2, 18.885), (3, 19.070),
-
-                # 32분 같은 빠른 5연타 느낌 반영
-                (1, 19.255), (1, 19.332), (1, 19.410), (1, 19.488), (1, 19.565),
-
-                (3, 19.750), (2, 19.935), (1, 20.120), (0, 20.305),
-                (1, 20.490), (3, 20.675), (2, 20.860), (1, 21.045),
-
-                # 패턴 밀도 증가
-                (0, 21.230), (1, 21.322), (2, 21.415), (3, 21.508),
-                (1, 21.600), (2, 21.692), (3, 21.785), (0, 21.878),
-
-                (1, 21.970), (2, 22.155), (3, 22.340), (1, 22.525),
-                (0, 22.710), (2, 22.895), (3, 23.080), (1, 23.265),
-
-                # 변주 계단
-                (0, 23.450), (1, 23.635), (2, 23.820), (3, 24.005),
-                (1, 24.190), (0, 24.375), (2, 24.560), (3, 24.745),
-
-                # A파트 끝부 16분 4타로 마무리
-                (1, 24.930), (1, 25.015), (1, 25.100), (1, 25.185),
-
-                # 마무리 직전 계단
-                (2, 25.370), (3, 25.555), (1, 25.740), (0, 25.925),
-                (1, 26.110), (2, 26.295), (3, 26.480), (1, 26.665),
-
-                # 26.8~32.0 구간 연속 패턴 (밀도 높게)
-                (0, 26.850), (1, 27.035), (2, 27.220), (3, 27.405),
-                (1, 27.590), (2, 27.775), (3, 27.960), (0, 28.145),
-
-                (1, 28.330), (2, 28.515), (3, 28.700), (1, 28.885),
-                (0, 29.070), (2, 29.255), (3, 29.440), (1, 29.625),
-
-                (0, 29.810), (1, 29.995), (2, 30.180), (3, 30.365),
-                (1, 30.550), (2, 30.735), (3, 30.920), (1, 31.105),
-
-                (0, 31.290), (2, 31.475), (3, 31.660), (1, 31.845),
-                (0, 32.000), (2, 32.185), (3, 32.370), (1, 32.555),
-                (0, 32.740), (1, 32.925), (2, 33.110), (3, 33.295),
-
-                (1, 33.480), (2, 33.665), (3, 33.850), (1, 34.035),
-                (0, 34.220), (1, 34.405), (2, 34.590), (3, 34.775),
-
-                # 계단 반복
-                (0, 34.960), (1, 35.145), (2, 35.330), (3, 35.515),
-
-                (1, 35.700), (2, 35.885), (3, 36.070), (1, 36.255),
-                (0, 36.440), (1, 36.625), (2, 36.810), (3, 36.995),
-
-                # 좌우 왕복
-                (3, 37.180), (0, 37.180),
-                (2, 37.365), (1, 37.550),
-                (3, 37.735), (0, 37.920),
-
-                (1, 38.105), (2, 38.290), (3, 38.475), (1, 38.660),
-                (0, 38.845), (1, 39.030), (2, 39.215), (3, 39.400),
-
-                # 부드러운 4레인 순환
-                (0, 39.585), (1, 39.770), (2, 39.955), (3, 40.140),
-                (1, 40.325), (2, 40.510), (3, 40.695), (1, 40.880),
-
-                # 중심 레인 위주의 B파트 멜로디 느낌
-                (2, 41.065), (2, 41.250), (1, 41.435), (3, 41.620),
-
-                (0, 41.805), (1, 41.990), (2, 42.175), (3, 42.360),
-                (1, 42.545), (2, 42.730), (3, 42.915), (1, 43.100),
-
-                # 약간 더 촘촘한 계단 (난타 최소화)
-                (0, 43.285), (1, 43.380), (2, 43.475), (3, 43.570),
-
-                (1, 43.755), (2, 43.940), (3, 44.125), (1, 44.310),
-                (0, 44.495), (2, 44.680), (3, 44.865), (1, 45.050),
-
-                # B파트 중반: 점프 + 교차
-                (0, 45.235), (3, 45.235),
-                (1, 45.420), (2, 45.605),
-                (0, 45.790), (3, 45.790),
-
-                (1, 45.975), (2, 46.160), (3, 46.345), (1, 46.530),
-                (0, 46.715), (1, 46.900), (2, 47.085), (3, 47.270),
-
-                # 대각선 교차
-                (0, 47.455), (3, 47.640), (1, 47.825), (2, 48.010),
-
-                # 레인 흔들기 패턴
-                (1, 48.195), (3, 48.380), (2, 48.565), (0, 48.750),
-                (1, 48.935), (2, 49.120), (3, 49.305), (1, 49.490),
-
-                # B파트 후반 서서히 밀도 증가
-                (0, 49.675), (1, 49.860), (2, 50.045), (3, 50.230),
-                (1, 50.415), (2, 50.600), (3, 50.785), (1, 50.970),
-
-                (0, 51.155), (1, 51.340), (3, 51.525), (2, 51.710),
-                (1, 51.895), (3, 52.080), (2, 52.265), (1, 52.450),
-
-                # A파트와 연결되는 느낌으로 세기 증가
-                (0, 52.635), (1, 52.820), (2, 53.005), (3, 53.190),
-                (1, 53.375), (2, 53.560), (3, 53.745), (1, 53.930),
-
-                # B파트 마지막 4초: 고정된 흐름 유지
-                (0, 54.115), (2, 54.300), (3, 54.485), (1, 54.670),
-                (0, 54.855), (1, 55.040), (2, 55.225), (3, 55.410),
-                (1, 55.595), (2, 55.780), (3, 55.965), (1, 56.000), 
-                (2, 56.185), (3, 56.370), (1, 56.555),
-                (0, 56.740), (1, 56.925), (2, 57.110), (3, 57.295),
-
-                # 대칭 + 계단
-                (0, 57.480), (3, 57.480),
-                (1, 57.665), (2, 57.665),
-                (0, 57.850), (3, 57.850),
-
-                (1, 58.035), (2, 58.220), (3, 58.405), (1, 58.590),
-                (0, 58.775), (2, 58.960), (3, 59.145), (1, 59.330),
-
-                # 흐름 유지 구간
-                (0, 59.515), (1, 59.700), (2, 59.885), (3, 60.070),
-                (2, 60.255), (1, 60.440), (0, 60.625), (3, 60.810),
-
-                # 리듬 강조 (난타 없는 12분 느낌)
-                (1, 60.995), (2, 61.088), (3, 61.180),
-                (1, 61.365), (2, 61.550), (0, 61.735),
-
-                (1, 61.920), (3, 62.105), (2, 62.290), (1, 62.475),
-                (0, 62.660), (1, 62.845), (2, 63.030), (3, 63.215),
-
-                # 교차 + 계단
-                (0, 63.400), (2, 63.585), (3, 63.770), (1, 63.955),
-                (0, 64.140), (1, 64.325), (2, 64.510), (3, 64.695),
-
-                # C파트 중반: 패턴 강도 ↑ (하지만 난타 없음)
-                (1, 64.880), (2, 65.065), (3, 65.250), (1, 65.435),
-                (0, 65.620), (1, 65.805), (3, 65.990), (2, 66.175),
-
-                (0, 66.360), (2, 66.545), (3, 66.730), (1, 66.915),
-                (0, 67.100), (1, 67.285), (2, 67.470), (3, 67.655),
-
-                # 16분 난타 대신 “연속 12분 계단”으로 타격감 표현
-                (0, 67.840), (1, 67.932),
-                (0, 68.740), (1, 68.925), (2, 69.110), (3, 69.295),
-
-                (1, 69.480), (3, 69.665), (2, 69.850), (0, 70.035),
-                (1, 70.220), (2, 70.405), (3, 70.590), (1, 70.775),
-
-                # A' 계단 강화
-                (0, 70.960), (1, 71.145), (2, 71.330), (3, 71.515),
-                (1, 71.700), (2, 71.885), (3, 72.070), (1, 72.255),
-
-                # 대칭 + 중심 레인 움직임
-                (0, 72.440), (3, 72.440),
-                (1, 72.625), (2, 72.810),
-                (0, 72.995), (3, 72.995),
-
-                (1, 73.180), (2, 73.365), (3, 73.550), (1, 73.735),
-                (0, 73.920), (1, 74.105), (2, 74.290), (3, 74.475),
-
-                # 중간 긴장감 상승
-                (0, 74.660), (1, 74.845), (2, 75.030), (3, 75.215),
-                (1, 75.400), (2, 75.585), (3, 75.770), (1, 75.955),
-
-                (0, 76.140), (1, 76.325), (3, 76.510), (2, 76.695),
-                (0, 76.880), (2, 77.065), (3, 77.250), (1, 77.435),
-
-                # A' 후반 - 패턴 순환
-                (0, 77.620), (1, 77.805), (2, 77.990), (3, 78.175),
-                (2, 78.360), (1, 78.545), (0, 78.730), (3, 78.915),
-
-                (1, 79.100), (2, 79.285), (3, 79.470), (1, 79.655),
-                (0, 79.840), (2, 80.025), (3, 80.210), (1, 80.395),
-
-                # 패턴 강화(난타 없이 미세 촘촘)
-                (0, 80.580), (1, 80.672), (2, 80.765), (3, 80.858),
-                (1, 81.043), (2, 81.228), (3, 81.413), (1, 81.598),
-
-                (0, 81.783), (1, 81.968), (2, 82.153), (3, 82.338),
-                (1, 82.523), (2, 82.708), (3, 82.893), (1, 83.078),
-
-                # 후반부 긴장감 ↑
-                (0, 83.263), (1, 83.448), (3, 83.633), (2, 83.818),
-                (0, 84.003), (2, 84.188), (3, 84.373), (1, 84.558),
-
-                (0, 84.743), (1, 84.928), (2, 85.113), (3, 85.298),
-                (1, 85.483), (2, 85.668), (3, 85.853), (1, 86.038),
-
-                # climax 전
-                (0, 86.223), (1, 86.408), (2, 86.593), (3, 86.778),
-                (1, 86.963), (3, 87.148), (2, 87.333), (1, 87.518),
-
-                (0, 87.703), (1, 87.888), (2, 88.073), (3, 88.258),
-                (1, 88.443), (2, 88.628), (3, 88.813), (1, 88.998),
-
-                # 마지막 10초 — 엔딩 패턴!
-                (0, 89.183), (3, 89.368),
-                (1, 89.553), (2, 89.738),
-                (0, 89.923), (3, 89.923),
-
-                (1, 90.108), (2, 90.293), (3, 90.478), (1, 90.663),
-                (0, 90.848), (1, 91.033), (2, 91.218), (3, 91.403),
-
-                (1, 91.588), (3, 91.773), (2, 91.958), (1, 92.143),
-                (0, 92.328), (1, 92.513), (2, 92.698), (3, 92.883),
-
-                (1, 93.068), (2, 93.253), (3, 93.438), (1, 93.623),
-
-                # 피날레 4레인 순환
-                (0, 93.808), (1, 93.993), (2, 94.178), (3, 94.363),
-                (1, 94.548), (2, 94.733), (3, 94.918), (1, 95.103),
-
-                (0, 95.288), (2, 95.473), (3, 95.658), (1, 95.843),
-                (0, 96.028), (1, 96.213), (2, 96.398), (3, 96.583),
-
-                # 엔딩부 마무리 계단
-                (1, 96.768), (2, 96.953), (3, 97.138), (1, 97.323),
-                (0, 97.508), (1, 97.693), (2, 97.878), (3, 98.063),
-
-                (1, 98.248), (0, 98.433), (2, 98.618), (3, 98.803),
-                (1, 98.988), (2, 99.173), (3, 99.358), (1, 99.543),
-
-                # 엔딩 피날레 8노트
-                (0, 99.728), (1, 99.913), (2, 100.098), (3, 100.283),
-            
-
-                ],
-                length_hint=102.5,
-                start_delay=2.5,
-            ),
-            Song(
-                "Small girl (feat. D.O.)",
-                "songs/Small girl.mp3",
-                bpm=85,
-                offset=0.2,
-                difficulty=4.0,
-                chart=[
-                    (2, 0.765), (2, 1.912), (3, 2.088),
-                    (0, 2.176), (1, 2.529), (2, 3.588), (1, 4.294), (1, 4.559),
-
-                    (3, 5.0), (3, 5.618), (2, 5.706), (1, 6.059), (0, 6.324),
-                    (0, 6.412), (0, 7.029), (3, 7.471), (1, 8.176), (0, 8.265),
-
-                    (0, 8.529), (0, 8.882), (2, 9.235), (3, 9.765), (1, 9.941),
-                    (0, 10.294), (0, 10.912), (0, 11.265), (0, 11.353), (2, 11.971),
-
-                    (2, 12.588), (0, 12.765), (0, 12.941), (0, 13.118), (0, 13.382),
-                    (0, 13.647), (1, 13.735), (2, 14.529), (1, 14.882), (3, 15.147),
-
-                    (3, 15.235), (3, 15.412), (3, 15.588), (3, 15.941), (2, 16.647),
-                    (0, 16.912), (0, 17.265), (0, 17.353), (0, 17.618), (1, 18.059),
-
-                    (1, 18.324), (3, 18.412), (2, 18.676), (2, 19.382), (3, 19.471),
-                    (1, 19.824), (1, 20.176), (1, 20.529), (3, 20.794), (2, 22.294),
-
-                    (2, 22.559), (1, 22.912), (1, 23.618), (2, 23.706), (0, 24.059),
-                    (0, 24.324), (0, 24.412), (0, 24.676), (0, 24.941), (2, 25.471),
-
-                    (3, 25.824), (3, 26.176), (3, 26.529), (3, 27.941), (3, 28.294),
-                    (1, 29.0), (0, 29.353), (2, 29.706), (2, 29.882), (0, 30.588),
-
-                    (0, 30.765), (1, 30.941), (2, 31.118), (1, 31.471), (0, 31.824),
-                    (1, 32.0), (1, 32.529), (2, 32.882), (3, 33.235), (3, 33.588),
-
-                    (3, 33.941), (3, 35.0), (3, 35.353), (2, 35.618), (3, 36.059),
-                    (1, 36.765), (1, 37.471), (0, 38.529), (3, 38.882), (2, 39.235),
-
-                    (3, 39.588), (2, 39.941), (2, 40.559), (1, 41.441), (2, 41.618),
-                    (2, 42.059), (3, 42.324), (0, 42.412), (0, 43.118), (0, 43.471),
-
-                    (0, 43.824), (0, 44.088), (0, 44.265), (0, 44.882), (1, 45.147),
-                    (1, 45.235), (3, 45.588), (3, 46.118), (2, 46.294), (1, 46.647),
-
-                    (2, 47.706), (3, 47.882), (2, 47.971), (0, 48.059), (1, 48.412),
-                    (0, 49.029), (2, 49.118), (2, 49.471), (3, 49.824), (0, 50.529),
-
-                    (1, 50.882), (1, 51.235), (0, 52.206), (0, 52.294), (3, 52.559),
-                    (1, 53.353), (1, 53.618), (2, 53.706), (2, 54.412), (2, 54.765),
-
-                    (2, 55.471), (2, 55.824), (2, 56.882), (2, 57.235), (0, 57.5),
-                    (0, 57.588), (1, 57.853), (3, 58.206), (3, 58.559), (2, 58.647),
-
-                    (3, 59.0), (3, 59.088), (1, 59.353), (2, 59.706), (2, 60.059),
-                    (2, 60.324), (0, 60.412), (1, 60.765), (2, 61.118), (2, 61.824),
-
-                    (2, 62.529), (0, 62.882), (1, 63.588), (1, 63.941), (3, 64.294),
-                    (3, 64.559), (3, 64.647), (2, 65.706), (2, 65.971), (2, 66.059),
-
-                    (1, 66.412), (1, 67.471), (3, 67.735), (3, 67.824), (3, 68.353),
-                    (3, 68.794), (1, 69.235), (2, 69.588), (1, 69.676), (3, 69.941),
-
-                    (3, 70.294), (3, 70.382), (3, 70.559), (1, 70.647), (2, 71.0),
-                    (3, 71.088), (1, 71.353), (2, 71.882), (2, 72.059), (0, 72.5),
-
-                    (1, 73.029), (2, 73.735), (2, 74.088), (0, 74.176), (1, 75.235),
-                    (0, 75.412), (2, 75.588), (2, 75.941), (3, 76.118), (3, 76.206),
-
-                    (3, 76.735), (2, 76.824), (0, 77.0), (0, 77.353), (0, 77.618),
-                    (0, 78.059), (0, 78.412), (2, 78.853), (3, 79.294), (3, 79.735),
-
-                    (2, 79.824), (0, 80.088), (0, 80.176), (0, 80.441), (3, 80.882),
-                    (3, 81.235), (3, 81.5), (3, 81.588), (1, 81.941), (1, 82.206),
-
-                    (2, 82.294), (1, 82.647), (0, 83.353), (2, 83.706), (1, 84.059),
-                    (1, 84.412), (3, 84.588), (3, 85.118), (3, 85.382), (1, 85.471),
-
-                    (0, 85.824), (1, 86.088), (1, 86.529), (1, 86.794), (3, 87.147),
-                    (3, 87.235), (3, 87.5), (3, 87.588), (3, 87.765), (2, 88.118),
-
-                    (1, 88.294), (3, 88.647), (2, 89.0), (1, 89.353), (1, 89.971),
-                    (0, 90.059), (0, 90.324), (2, 90.412), (2, 91.118), (2, 91.294),
-
-                    (2, 92.706), (2, 92.882), (1, 93.147), (0, 93.235), (0, 93.588),
-                    (0, 93.941), (1, 94.559), (0, 94.647), (1, 94.912), (2, 95.0),
-
-                    (3, 95.265), (1, 95.971), (2, 96.412), (2, 96.765), (3, 97.029),
-                    (2, 97.118), (1, 97.382), (1, 97.471), (3, 97.735), (1, 98.882),
-
-                    (0, 99.235), (0, 99.5), (1, 99.941), (0, 100.294), (1, 101.0),
-                    (1, 101.176), (0, 101.529), (0, 101.618), (0, 101.706), (1, 101.882),
-
-                    (0, 102.059), (1, 102.412), (3, 102.588), (2, 102.765), (3, 102.941),
-                    (2, 103.118), (1, 103.735), (1, 103.824), (1, 104.529), (1, 105.941),
-
-                    (1, 106.647), (3, 106.912), (3, 107.353), (2, 107.706), (1, 108.059),
-                    (0, 108.324), (1, 108.765), (0, 109.118), (1, 109.382), (3, 109.471),
-
-                    (3, 110.176), (3, 110.529), (2, 110.882), (1, 111.588), (3, 111.853),
-                    (3, 112.206), (2, 113.706), (2, 113.971), (0, 114.059), (1, 114.412),
-
-                    (2, 115.029), (1, 115.382), (3, 116.882), (2, 117.235), (0, 117.853),
-                    (1, 118.206), (2, 118.294), (1, 118.559), (1, 119.0), (0, 119.706),
-
-                    (0, 119.971), (0, 120.059), (1, 120.235), (3, 120.676), (3, 120.941),
-                    (3, 121.824), (2, 122.529), (2, 122.882), (2, 123.588), (2, 124.206),
-
-                    (2, 124.294), (0, 124.912), (0, 125.529), (0, 126.412), (1, 127.118),
-                    (2, 128.088), (0, 128.529), (1, 129.412), (0, 129.853), (0, 129.941),
-
-                    (1, 130.206), (3, 130.294), (3, 130.559), (1, 131.353), (1, 131.529),
-                    (0, 131.794), (2, 132.147), (3, 133.471), (2, 133.824), (0, 134.088),
-
-                    (1, 134.176), (0, 134.882), (0, 135.5), (0, 135.853), (2, 136.206),
-                    (2, 136.912), (2, 137.0), (2, 137.265), (3, 137.971), (3, 138.765),
-
-                    (3, 139.471), (1, 140.882), (3, 141.941), (2, 142.294), (2, 142.647),
-                    (3, 142.824), (3, 143.353), (3, 143.706), (2, 144.412), (1, 144.765),
-
-                    (1, 145.824), (3, 146.529), (2, 146.882), (2, 147.588), (3, 147.941),
-                    (3, 149.0), (3, 149.529), (2, 149.706), (3, 150.059), (0, 150.412),
-
-                    (0, 150.765), (0, 151.206), (0, 151.471), (0, 152.265), (0, 154.118),
-                    (2, 155.176), (2, 156.147), (1, 156.676), (0, 156.765), (1, 158.529),
-
-                    (0, 159.235), (1, 159.676), (0, 160.294), (0, 160.824), (2, 160.912),
-                    (2, 161.441), (0, 161.971), (0, 162.235), (0, 162.765), (0, 163.471),
-
-                    (0, 163.824), (1, 164.794), (2, 164.882), (0, 165.235), (1, 165.5),
-                    (0, 165.588), (1, 165.941), (3, 166.294), (3, 166.471), (3, 166.647),
-
-                    (3, 167.0), (2, 167.618), (3, 167.706), (3, 168.059), (2, 170.441),
-                    (2, 170.529), (0, 170.882), (3, 171.941), (2, 172.118), (2, 172.294),
-
-                    (2, 172.647), (0, 173.0), (0, 173.265), (0, 173.353), (1, 173.706),
-                    (1, 174.412), (0, 175.824), (0, 176.176), (1, 177.059), (0, 177.235),
-
-                    (0, 177.588), (2, 177.765), (3, 177.941), (2, 178.647), (2, 178.912),
-                    (3, 179.0), (2, 179.706), (3, 180.412), (2, 180.765), (3, 181.118),
-
-                    (2, 181.824), (1, 182.176), (3, 182.529), (3, 182.706), (3, 182.882),
-                    (3, 183.235), (3, 183.941), (3, 184.294)
-                ],
-                length_hint=189.8,
-                start_delay=2.5,
-            ),
-            Song(
-                "A Cruel Angel's Thesis",
-                "songs/tensi.mp3",
-                bpm=128,
-                offset=-0.3,
-                difficulty=8.0,
-                chart=
-                [
-                    (0, 16.500), (1, 16.969), (1, 17.438), (0, 17.789), (3, 17.789), (1, 17.789), (1, 17.906), (3, 18.141), (2, 18.375), (1, 18.609),
-                    (3, 18.609), (3, 18.609), (2, 18.844), (1, 19.078), (0, 19.312), (3, 19.430), (0, 19.664), (0, 19.781), (1, 20.250), (0, 20.719),
-                    (2, 20.719), (3, 21.188), (1, 21.539), (0, 21.539), (3, 21.539), (3, 21.656), (1, 21.891), (1, 22.125), (3, 22.359), (2, 22.359),
-                    (1, 22.359), (3, 22.594), (2, 22.594), (1, 22.594), (3, 22.828), (0, 22.828), (1, 22.828), (3, 23.062), (2, 23.062), (0, 23.062),
-                    (2, 23.297), (0, 23.297), (0, 23.414), (0, 23.414), (0, 23.883), (1, 24.469), (2, 24.703), (2, 24.820), (2, 24.938), (1, 25.641),
-                    (1, 25.875), (3, 26.227), (3, 26.344), (2, 26.578), (2, 26.812), (2, 27.516), (0, 27.750), (1, 28.102), (0, 28.453), (3, 28.688),
-                    (1, 29.039), (1, 29.156), (3, 29.391), (0, 29.625), (1, 29.977), (0, 30.328), (0, 30.562), (0, 31.266), (1, 31.383), (1, 31.500),
-                    (1, 31.852), (1, 31.969), (1, 32.203), (1, 32.438), (1, 33.141), (3, 33.258), (1, 33.375), (0, 33.727), (0, 33.844), (3, 34.078),
-                    (1, 34.312), (0, 35.016), (0, 35.250), (3, 35.602), (3, 35.719), (2, 35.953), (3, 36.188), (0, 36.656), (0, 37.125), (3, 37.125),
-                    (1, 37.828), (2, 38.062), (0, 38.062), (1, 38.062), (2, 39.000), (1, 39.469), (2, 39.703), (2, 39.820), (2, 39.996), (1, 40.699),
-                    (1, 40.875), (3, 41.227), (3, 41.344), (2, 41.578), (2, 41.812), (2, 42.516), (0, 42.750), (1, 43.102), (0, 43.453), (3, 43.688),
-                    (1, 44.039), (1, 44.156), (3, 44.391), (0, 44.625), (1, 44.977), (0, 45.328), (0, 45.562), (0, 46.266), (1, 46.383), (1, 46.500),
-                    (1, 46.852), (1, 46.969), (1, 47.203), (1, 47.438), (1, 48.141), (3, 48.258), (1, 48.375), (0, 48.727), (0, 48.844), (3, 49.078),
-                    (1, 49.312), (0, 50.016), (0, 50.250), (3, 50.602), (3, 50.719), (2, 50.953), (3, 51.188), (0, 51.539), (0, 51.656), (1, 51.891),
-                    (0, 52.125), (2, 52.125), (0, 52.594), (0, 52.594), (3, 53.062), (2, 53.062), (0, 53.531), (3, 53.531), (1, 54.000), (1, 54.000),
-                    (0, 54.000), (0, 54.000), (1, 54.352), (1, 54.469), (1, 54.703), (1, 54.938), (1, 55.289), (1, 55.406), (1, 55.641), (3, 55.875),
-                    (2, 55.875), (3, 56.227), (3, 56.344), (1, 56.578), (1, 56.812), (1, 56.812), (0, 56.812), (0, 57.164), (0, 57.281), (1, 57.516),
-                    (2, 57.750), (1, 57.750), (1, 57.750), (1, 58.102), (1, 58.219), (1, 58.453), (3, 58.688), (0, 58.688), (1, 58.688), (1, 59.039),
-                    (1, 59.156), (0, 59.391), (0, 59.625), (0, 59.625), (2, 59.625), (3, 60.094), (1, 60.094), (0, 60.562), (3, 60.562), (1, 61.031),
-                    (0, 61.031), (2, 61.500), (0, 61.500), (1, 61.852), (0, 61.852), (1, 61.969), (0, 61.969), (1, 62.203), (2, 62.203), (1, 62.438),
-                    (0, 62.438), (1, 62.789), (0, 62.789), (1, 62.906), (0, 62.906), (1, 63.141), (2, 63.141), (1, 63.375), (1, 63.375), (3, 63.727),
-                    (1, 63.727), (3, 63.844), (1, 63.844), (3, 64.078), (0, 64.078), (1, 64.312), (2, 64.312), (1, 64.664), (0, 64.664), (1, 64.781),
-                    (0, 64.781), (1, 65.016), (1, 65.016), (3, 65.250), (0, 65.250), (1, 65.602), (0, 65.602), (0, 65.602), (1, 65.719), (1, 65.719),
-                    (0, 65.719), (1, 65.953), (0, 65.953), (1, 66.188), (0, 66.188), (0, 66.188), (1, 66.539), (3, 66.539), (0, 66.539), (1, 66.656),
-                    (0, 66.656), (1, 66.891), (0, 66.891), (1, 67.125), (3, 67.125), (2, 67.125), (0, 68.062), (3, 68.062), (0, 68.062), (3, 68.062),
-                    (1, 68.414), (0, 68.414), (0, 68.414), (3, 68.531), (2, 68.531), (1, 68.766), (0, 69.000), (3, 69.000), (0, 69.000), (0, 69.469),
-                    (0, 69.938), (1, 69.938), (1, 69.938), (3, 69.938), (1, 70.289), (1, 70.406), (3, 70.641), (0, 70.875), (3, 70.875), (3, 71.109),
-                    (2, 71.344), (1, 71.578), (0, 71.812), (3, 71.930), (0, 72.164), (0, 72.281), (1, 72.750), (0, 73.219), (1, 73.219), (0, 73.688),
-                    (2, 73.688), (1, 73.688), (1, 74.039), (0, 74.039), (3, 74.039), (3, 74.156), (1, 74.391), (1, 74.625), (1, 74.859), (0, 75.094),
-                    (1, 75.328), (3, 75.562), (1, 75.680), (1, 75.914), (1, 76.031), (0, 76.500), (0, 76.969), (0, 77.438), (1, 77.438), (1, 77.438),
-                    (3, 77.438), (1, 77.789), (1, 77.906), (3, 78.141), (0, 78.375), (3, 78.375), (3, 78.609), (2, 78.844), (1, 79.078), (0, 79.312),
-                    (3, 79.430), (0, 79.664), (0, 79.781), (1, 80.250), (0, 80.719), (1, 80.719), (0, 81.188), (2, 81.188), (1, 81.188), (1, 81.539),
-                    (0, 81.539), (3, 81.539), (3, 81.656), (1, 81.891), (1, 82.125), (3, 82.359), (2, 82.359), (1, 82.359), (3, 82.594), (2, 82.594),
-                    (1, 82.594), (3, 82.828), (0, 82.828), (1, 82.828), (3, 83.062), (2, 83.062), (1, 83.062), (3, 83.414), (2, 83.414), (1, 83.414),
-                    (0, 83.531), (0, 83.531), (0, 84.000), (0, 84.469), (0, 84.938), (1, 84.938), (1, 84.938), (3, 84.938), (1, 85.289), (1, 85.406),
-                    (3, 85.641), (0, 85.875), (3, 85.875), (3, 86.109), (2, 86.344), (1, 86.578), (0, 86.812), (3, 86.930), (0, 87.164), (0, 87.281),
-                    (1, 87.750), (0, 88.219), (1, 88.219), (0, 88.688), (2, 88.688), (1, 88.688), (1, 89.039), (0, 89.039), (3, 89.039), (3, 89.156),
-                    (1, 89.391), (1, 89.625), (3, 89.859), (2, 89.859), (1, 89.859), (3, 90.094), (2, 90.094), (1, 90.094), (3, 90.328), (0, 90.328),
-                    (1, 90.328), (3, 90.562), (2, 90.562), (1, 90.562), (3, 90.914), (2, 90.914), (1, 90.914), (0, 91.031), (0, 91.031),
-                ],
-
-
-
-                length_hint=93.5,
-                start_delay=2.5,
-            ),
+    def _selected_song(self) -> Song:
+        return self.library.song(self.selected_song_idx)
 
+    #  ---- State transitions ----
+    def _load_then(self, song: Song, on_ready: Callable[[Song], None], full: bool = False) -> None:
+        """Run ``on_ready(song)`` now, or after a loading screen if the chart must be generated first."""
+        if song.chart:
+            on_ready(song)
+            return
+        self.chart_load = ChartLoad(song, on_ready, full)
+        self.state = "loading"
 
-        ]
+    def _update_loading(self) -> None:
+        load = self.chart_load
+        if load is None or not load.ready():
+            return
+        self.chart_load = None
+        self.state = "menu"
+        load.on_ready(load.song)
 
-    #  ---- State transitions ----
     def _start_song(self, song: Song) -> None:
-        chart = [(lane, max(MIN_FIRST_NOTE, t + song.offset)) for lane, t in (song.chart or [])]
-        if not chart:
+        self._end_song_perf()
+        self.sim_steps = 0
+        self.loop_a = self.loop_b = None
+        self.chart_stream = None
+        self.stream_pos = 0
+        self.late_notes = 0
+        self._load_latency()
+        practice = self.replay_player is None and self.game_modes[self.selected_mode_idx][0] == "practice"
+        self.rate = self.practice_rate if practice and self._rate_ready(song, self.practice_rate) else 1.0
+        job = None
+        if not song.chart:
+            job = chart_job(song)
+            job.wait(STREAM_SAFETY)
+            if job.done:
+                # 작업은 끝났지만 워커 스레드가 아직 song.chart 를 채우기 전일 수 있다
+                song.chart, song.chart_source = job.result()
+        if song.chart:
+            chart = song_chart(song, self.rate)
+        else:
+            # 생성 중인 차트: 앞부분만 확정되면 시작하고 나머지는 플레이 중에 붙인다
+            notes, self.stream_pos = job.notes_from(0)
+            chart = compile_chart(notes, song.offset, MIN_FIRST_NOTE, self.rate)
+            self.chart_stream = job
+        if not len(chart) and self.chart_stream is None:
             print(f"[warn] chart is empty for '{song.name}'. Add (lane, time) tuples to Song.chart.")
-        chart.sort(key=lambda x: x[1])
 
+        if self.replay_player is not None:
+            self.replay_player.reset()
+            self.play_mode = self.replay_player.replay.mode
+            self.recorder.finish()
+        else:
+            self.play_mode = self.game_modes[self.selected_mode_idx][0]
+            if self.play_mode == "practice":
+                self.recorder.finish()  # 탐색한 연습 기록은 리플레이로 재현할 수 없다
+            else:
+                self.recorder.start(song.name, chart, self.play_mode)
+
+        rules = self.mode_rules.get(self.play_mode, DEFAULT_RULES)
         for track in self.tracks:
+            track.set_rules(rules)
             track.load_chart(chart)
 
-        self.song_end = (max(time for _, time in chart) if chart else song.length_hint) + 4.0
+        self.song_end = (chart.end_time if len(chart) else song.length_hint) + 4.0
         self.start_ms = pygame.time.get_ticks()
-        self.audio.queue(song.path, song.start_delay)
+        self.audio.queue(song.path, song.start_delay, self._stretched_pcm(song, self.rate))
         self.state = "play"
         self.current_song = song
         self.just_started = True
-        self.play_mode = self.game_modes[self.selected_mode_idx][0]
+        if self.net is not None and self.net.player_idx == 0 and self.replay_player is None:
+            self.net.send_start(self.library.index_of(song.name), self.selected_mode_idx, now_ms())
+        if self.broadcaster is not None:
+            start = MatchEvent(EVENT_START, song_id=song.name, chart_hash=chart_hash(chart), mode=self.play_mode)
+            self.broadcaster.event(start)
 
         # pause / combo 상태 리셋
         self.is_paused = False
@@ -569,11 +320,143 @@ class Game:
         self.resume_start_ms = 0
         self.last_combo_attack_time = -1.0
         self.last_combo_attack_player = None
+        self._prepare_play_graphics()
+        self.keysounds.prepare()
+        self.keysounds.reset_stats()
+        self.perf.start(song.name)
+
+    def _end_song_perf(self) -> None:
+        report = self.perf.stop()
+        if report is not None:
+            print(report.summary())
+            sounds = self.keysounds.report()
+            if sounds is not None:
+                print(sounds.summary())
+
+    def _start_replay(self, song: Song) -> None:
+        path = latest_replay(song.name)
+        if path is None:
+            print(f"[warn] no replay recorded for '{song.name}'")
+            return
+        try:
+            replay = Replay.load(path)
+        except (OSError, ValueError) as exc:
+            print(f"[warn] replay load failed for {path}: {exc}")
+            return
+        if replay.chart_hash != chart_hash(song_chart(song)):
+            print(f"[warn] chart of '{song.name}' changed since {path} was recorded; playback may diverge")
+        self.replay_player = ReplayPlayer(replay)
+        self._start_song(song)
+
+    def _save_replay(self) -> None:
+        replay = self.recorder.finish()
+        if replay is None or self.current_song is None or not len(replay):
+            return
+        if self.chart_stream is not None:
+            # 생성 중인 차트로 KO 가 났다: 해시를 위해 분석이 끝날 때까지 멈추지 않고 리플레이를 버린다
+            print(f"[info] replay of '{self.current_song.name}' not saved: its chart was still being generated")
+            return
+        # 진행형 차트로 시작했으면 시작 시점의 해시는 일부 차트 기준이라 완성된 차트로 다시 계산
+        replay.chart_hash = chart_hash(song_chart(self.current_song))
+        path = replay_path(self.current_song.name)
+        try:
+            replay.save(path)
+        except OSError as exc:
+            print(f"[warn] replay save failed for {path}: {exc}")
+
+    def _record_result(self, ko_time: Optional[float], winner: Optional[int]) -> None:
+        """Queue the finished match for the history database (replays and practice aren't recorded)."""
+        song = self.current_song
+        if song is None or self.replay_player is not None or self.play_mode == "practice":
+            return
+        # 아직 생성 중인 차트로 KO 가 나면 완성을 기다리지 않는다 (해시는 비워 둔다)
+        digest = "" if self.chart_stream is not None else chart_hash(song_chart(song))
+        players = tuple(PlayerResult(t.score, t.health, dict(t.judgements)) for t in self.tracks)
+        self.results.record(MatchResult(song.name, digest, self.play_mode, players, ko_time, winner))
+
+    def _sync_start(self, start_perf_ms: float) -> None:
+        """Align the song clock to the host's start instant (already converted to our clock)."""
+        self.start_ms = pygame.time.get_ticks() + int(round(start_perf_ms - now_ms()))
+        if self.current_song is not None:
+            self.audio.play_at_ms = self.start_ms + int(self.current_song.start_delay * 1000)
+            late = (pygame.time.get_ticks() - self.audio.play_at_ms) / 1000.0
+            if late > 0.05:
+                # 차트를 기다리느라 호스트의 시작 시각을 지나쳤다: 노래도 그만큼 건너뛰어 맞춘다
+                self.audio.seek(late)
+
+    def _start_synced(self, song: Song, start_perf_ms: float) -> None:
+        """Guest side of a network start, once the song's chart is ready."""
+        self._start_song(song)
+        self._sync_start(start_perf_ms)
+
+    def _can_control_song(self) -> bool:
+        # 네트워크 대전에서는 호스트만 곡 선택/재시작을 한다
+        return self.net is None or self.net.player_idx == 0
+
+    def _poll_net(self) -> None:
+        if self.net.closed_by_peer:
+            self.net.closed_by_peer = False
+            print("[info] opponent left the song")
+            if self.state == "play":
+                self._back_to_menu()
+        start = self.net.take_start()
+        if start is not None and self.net.player_idx == 1:
+            song_idx, mode_idx, start_perf_ms = start
+            self.selected_song_idx = song_idx % len(self.library)
+            self.selected_mode_idx = mode_idx % len(self.game_modes)
+            # 차트를 생성해야 하는 곡은 로딩 화면을 거친다 (분석하는 동안 화면이 멈추지 않게)
+            self._load_then(self._selected_song(), lambda song: self._start_synced(song, start_perf_ms))
+        if self.state == "play":
+            # 상대 입력은 보낸 쪽의 곡 시간 그대로 판정 (지연 보정, 롤백 없음)
+            remote_idx = 1 - self.net.player_idx
+            for lane, song_time in self.net.take_inputs():
+                self._judge_lane(remote_idx, lane, song_time)
+        else:
+            self.net.take_inputs()
+
+    def _sweep_time(self, idx: int, now: float) -> float:
+        # 원격 트랙은 입력 지연만큼 늦게 미스 처리해서 아직 도착하지 않은 입력을 놓치지 않는다
+        if self.net is not None and idx != self.net.player_idx:
+            return now - self.net.input_delay
+        return now
+
+    def _feed_chart_stream(self, now: float) -> None:
+        """Append newly generated notes to both tracks while a progressive chart is playing."""
+        job = self.chart_stream
+        notes, self.stream_pos = job.notes_from(self.stream_pos)
+        if notes:
+            # 전체 차트와 같은 검증/중복 병합을 거친다 (리플레이 해시는 완성된 차트로 계산된다)
+            chart = compile_chart(notes, self.current_song.offset, MIN_FIRST_NOTE, self.rate)
+            lane_times = self.tracks[0].lane_times
+            # 조각 경계에 걸친 중복: 이미 붙인 같은 레인의 마지막 노트와도 비교한다
+            chart = [(lane, t) for lane, t in chart if not lane_times[lane] or t - lane_times[lane][-1] >= DUPLICATE_GAP]
+            # 분석이 플레이헤드를 못 따라온 경우(느린 기기)에만 생긴다: 이미 지난 노트는 버린다
+            fresh = [(lane, t) for lane, t in chart if t > now]
+            if len(fresh) < len(chart):
+                self.late_notes += len(chart) - len(fresh)
+                print(f"[warn] chart analysis fell behind the playhead; dropped {len(chart) - len(fresh)} note(s)")
+            for track in self.tracks:
+                track.append_notes(fresh)
+            if fresh:
+                self.song_end = max(self.song_end, fresh[-1][1] + 4.0)
+        if job.done and self.stream_pos >= len(job.notes):
+            self.chart_stream = None
+
+    def _broadcast_event(self, kind: int, winner: Optional[int] = None) -> None:
+        if self.broadcaster is None:
+            return
+        self.broadcaster.event(MatchEvent(kind, winner))
 
     def _back_to_menu(self) -> None:
+        self._end_song_perf()
+        if self.state != "menu":
+            self._broadcast_event(EVENT_MENU)
         self.state = "menu"
         self.audio.stop()
+        self.recorder.finish()
+        self.replay_player = None
         self.current_song = None
+        self.chart_stream = None
         self.is_paused = False
         self.in_resume_countdown = False
         self.resume_countdown = 0.0
@@ -602,12 +485,15 @@ class Game:
                 now = 0.0
             skip_updates = False
 
+            if self.net is not None:
+                self._poll_net()
+
             # 이벤트 처리
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.KEYDOWN:
-                    running = self._handle_key(event.key, now)
+                    running = self._key_down(event.key, now)
 
             # 재시작 직후 첫 프레임: 시간/업데이트 초기화
             if self.just_started:
@@ -629,59 +515,292 @@ class Game:
                         self.is_paused = False
                         delta_ms = tick_now - self.pause_tick_ms
                         self.start_ms += delta_ms
-                        try:
-                            pygame.mixer.music.unpause()
-                        except pygame.error:
-                            pass
+                        self.audio.unpause()
 
                 # 실제 플레이 진행은 pause / countdown 아닐 때만
                 if not self.is_paused and not self.in_resume_countdown and not skip_updates:
+                    if self.practice_rate != self.rate and self._rate_ready(self.current_song, self.practice_rate):
+                        now = self._apply_rate(now)
+                    if self.loop_b is not None and now >= self.loop_b:
+                        # A–B 반복: B 를 지나면 A (프리롤 포함) 로 되감는다
+                        now = self._seek(self.loop_a)
                     self.audio.tick()
-                    for idx, track in enumerate(self.tracks):
-                        missed = track.update_misses(now)
-                        if missed and not track.is_down:
-                            self._apply_health(idx, "Miss", repeat=missed, now=now)
-                self._check_deaths(now)
-                if self.state != "play" or self.current_song is None:
+                    if self.chart_stream is not None:
+                        self._feed_chart_stream(now)
+                    self._advance_sim(now)
+                if self.state != "play" or self.current_song is None or self.just_started:
                     continue
 
-                self._draw_play(now, raw_now)
+                # 화면은 시뮬레이션(최대 1스텝 전 상태)을 현재 시각 기준으로 그린다
+                # (오디오 출력 지연만큼 늦춰서, 노트가 소리가 들릴 때 판정선에 닿게)
+                self._draw_play(now - self.latency.audio_latency, raw_now)
+                self.perf.frame()
 
                 # 게임 종료 판정도 진행 중일 때만
                 if (
                     not self.is_paused
                     and not self.in_resume_countdown
                     and now > self.song_end
+                    and self.chart_stream is None
                     and all(t.finished() for t in self.tracks)
                 ):
+                    self._end_song_perf()
+                    self._save_replay()
+                    self._record_result(None, self._winner_idx())
+                    self._broadcast_event(EVENT_GAME_OVER, self._winner_idx())
                     self._draw_game_over()
                     pygame.display.flip()
                     self._wait_for_restart()
                     self._back_to_menu()
+            elif self.state == "loading":
+                self._update_loading()
+                if self.state == "loading":
+                    self._draw_loading()
+            elif self.state == "calibrate":
+                self._update_calibration()
+                self._draw_calibration()
             else:
                 self._draw_menu()
 
+            if self.broadcaster is not None:
+                self.broadcaster.flush()
             pygame.display.flip()
-            self.clock.tick(60)
+            self.clock.tick(RENDER_FPS)
+        self._shutdown()
+
+    def _shutdown(self) -> None:
+        """Release the window and flush the match history (every exit goes through here)."""
+        self.results.close()  # 배치 대기 중인 마지막 결과까지 쓰고 끝낸다
         pygame.quit()
 
+    # ---- Latency calibration ----
+    def _load_latency(self) -> None:
+        if self.latency_device is None:
+            ensure_mixer()
+            self.latency_device = device_id()
+            self.latency = load_profile(self.latency_device)
+
+    def _start_calibration(self) -> None:
+        self._load_latency()
+        self.calibration = Calibration(self.latency_device)
+        self.state = "calibrate"
+        self._begin_calibration_phase()
+
+    def _begin_calibration_phase(self) -> None:
+        self.start_ms = pygame.time.get_ticks()
+        if self.calibration.phase == "audio":
+            self.audio.queue("calibration clicks", 0.0, self.calibration.click_pcm())
+        else:
+            self.audio.stop()
+
+    def _calibration_time(self) -> float:
+        return (pygame.time.get_ticks() - self.start_ms) / 1000.0
+
+    def _update_calibration(self) -> None:
+        cal = self.calibration
+        if cal.done:
+            return
+        self.audio.tick()
+        if self._calibration_time() < cal.length:
+            return
+        if cal.next_phase():
+            self._begin_calibration_phase()
+            return
+        self.audio.stop()
+        if cal.result is not None:
+            save_profile(cal.result)
+            self.latency = cal.result
+
+    # ---- Practice ----
+    def _seek(self, target: float, preroll: float = PRACTICE_PREROLL) -> float:
+        """Jump the playing song to ``target`` (minus ``preroll``); returns the new song time."""
+        song = self.current_song
+        start = max(0.0, min(target, self.song_end - 4.0) - preroll)
+        for track in self.tracks:
+            track.seek(start)
+            track.health = track.max_health
+            track.is_down = track.just_downed = False
+        self.sim_steps = int(start * SIM_HZ)
+        self.start_ms = pygame.time.get_ticks() - int((start + song.start_delay) * 1000)
+        self.audio.seek(start)
+        self.last_combo_attack_time = -1.0
+        return start
+
+    def _section_time(self, section: int) -> float:
+        """Start of chart section ``section`` of PRACTICE_SECTIONS equal slices (first to last note)."""
+        times = self.tracks[0].note_times
+        if not times:
+            return 0.0
+        return times[0] + (times[-1] - times[0]) * section / PRACTICE_SECTIONS
+
+    def _rate_ready(self, song: Song, rate: float) -> bool:
+        if rate == 1.0:
+            return True
+        from timestretch import stretched_ready
+
+        return stretched_ready(song.path, rate)
+
+    def _stretched_pcm(self, song: Song, rate: float):
+        if rate == 1.0:
+            return None
+        from timestretch import stretch_job
+
+        return stretch_job(song.path, rate).pcm
+
+    def _set_practice_rate(self, rate: float) -> None:
+        """Pick a playback rate; the audio is stretched in the background the first time."""
+        from timestretch import clamp_rate, stretch_job
+
+        self.practice_rate = clamp_rate(rate)
+        if self.practice_rate != 1.0:
+            job = stretch_job(self.current_song.path, self.practice_rate)
+            if job.done and job.pcm is None:
+                self.practice_rate = self.rate  # 실패 (경고는 이미 출력됨)
+
+    def _apply_rate(self, now: float) -> float:
+        """Switch to the (ready) practice rate at the same spot of the song; returns the new song time."""
+        song = self.current_song
+        scale = self.rate / self.practice_rate
+        self.rate = self.practice_rate
+        # 차트를 다시 읽지 않고 시간만 늘린다: 점수/판정 기록/타이밍 통계가 그대로 남는다
+        for track in self.tracks:
+            track.rescale(scale)
+        self.song_end = (self.song_end - 4.0) * scale + 4.0
+        if self.loop_a is not None:
+            self.loop_a *= scale
+        if self.loop_b is not None:
+            self.loop_b *= scale
+        self.audio.queue(song.path, 0.0, self._stretched_pcm(song, self.rate))
+        return self._seek(now * scale, preroll=0.0)  # 같은 지점에서 이어서 (프리롤 없이)
+
+    def _handle_practice_key(self, key: int, now: float) -> bool:
+        """Seek and loop keys of practice mode; False when ``key`` is not one of them."""
+        if key == pygame.K_LEFT:
+            self._seek(max(0.0, now - PRACTICE_STEP) + PRACTICE_PREROLL)
+        elif key == pygame.K_RIGHT:
+            self._seek(now + PRACTICE_STEP + PRACTICE_PREROLL)
+        elif pygame.K_0 <= key <= pygame.K_9:
+            section = (key - pygame.K_1) % PRACTICE_SECTIONS  # 1..9 → 0..8, 0 → 9
+            self._seek(self._section_time(section))
+        elif key == pygame.K_COMMA:
+            self.loop_a = now
+            if self.loop_b is not None and self.loop_b <= now:
+                self.loop_b = None
+        elif key == pygame.K_PERIOD:
+            a = self.loop_a if self.loop_a is not None else 0.0
+            if now > a:
+                self.loop_a, self.loop_b = a, now
+                self._seek(a)
+        elif key == pygame.K_SLASH:
+            self.loop_a = self.loop_b = None
+        elif key == pygame.K_MINUS:
+            self._set_practice_rate(self.practice_rate - RATE_STEP)
+        elif key == pygame.K_EQUALS:
+            self._set_practice_rate(self.practice_rate + RATE_STEP)
+        else:
+            return False
+        return True
+
+    # ---- Simulation ----
+    def _advance_sim(self, now: float) -> None:
+        """Run fixed ``1 / SIM_HZ`` steps up to song time ``now``.
+
+        Miss sweeps, HP and KO checks happen at step times, so they don't move when frames
+        are slow or uneven; a KO (or restart) stops the remaining steps.
+        """
+        target = int(now * SIM_HZ)
+        while self.sim_steps < target:
+            self.sim_steps += 1
+            self._sim_step(self.sim_steps / SIM_HZ)
+            if self.state != "play" or self.just_started:
+                return
+
+    def _sim_step(self, t: float) -> None:
+        if self.replay_player is not None:
+            # 리플레이 재생: 기록된 입력/미스 시점을 그대로 판정에 흘려 넣는다
+            self.replay_player.feed(self.tracks, t, self._on_replay_judge)
+        else:
+            for idx, track in enumerate(self.tracks):
+                sweep_now = self._sweep_time(idx, t)
+                missed = track.update_misses(sweep_now)
+                if missed:
+                    self.recorder.sweep(idx, sweep_now)
+                if missed and not track.is_down:
+                    self._apply_health(idx, "Miss", repeat=missed, now=sweep_now)
+        if self.broadcaster is not None and self.sim_steps % BROADCAST_STEPS == 0:
+            self.broadcaster.publish(self.tracks, t)
+        self._check_deaths(t)
+
     # ---- Input ----
+    def _sim_running(self) -> bool:
+        return (
+            self.state == "play"
+            and self.current_song is not None
+            and not self.is_paused
+            and not self.in_resume_countdown
+            and not self.just_started
+        )
+
+    def _key_down(self, key: int, now: float) -> bool:
+        """Handle a key press at song time ``now``, with the simulation advanced to it first.
+
+        Without this a press would meet notes the fixed-step miss sweep hasn't dropped yet
+        whenever the previous frame was long, so judgement would depend on frame timing.
+        """
+        if self._sim_running():
+            self._advance_sim(now)
+            if not self._sim_running():
+                return True  # 누르기 전까지의 스텝에서 KO/재시작이 났다: 이 키는 판정하지 않는다
+        return self._handle_key(key, now)
+
     def _handle_key(self, key: int, now: float) -> bool:
         # 메뉴
         if self.state == "menu":
             if key == pygame.K_ESCAPE:
                 return False
             if key == pygame.K_UP:
-                self.selected_song_idx = (self.selected_song_idx - 1) % len(self.songs)
+                self.selected_song_idx = (self.selected_song_idx - 1) % len(self.library)
             elif key == pygame.K_DOWN:
-                self.selected_song_idx = (self.selected_song_idx + 1) % len(self.songs)
+                self.selected_song_idx = (self.selected_song_idx + 1) % len(self.library)
+            elif key == pygame.K_PAGEUP:
+                self.selected_song_idx = max(0, self.selected_song_idx - MENU_ROWS)
+            elif key == pygame.K_PAGEDOWN:
+                self.selected_song_idx = min(len(self.library) - 1, self.selected_song_idx + MENU_ROWS)
+            elif key == pygame.K_HOME:
+                self.selected_song_idx = 0
+            elif key == pygame.K_END:
+                self.selected_song_idx = len(self.library) - 1
             elif key == pygame.K_LEFT:
                 self.selected_mode_idx = (self.selected_mode_idx - 1) % len(self.game_modes)
             elif key == pygame.K_RIGHT:
                 self.selected_mode_idx = (self.selected_mode_idx + 1) % len(self.game_modes)
             elif key in (pygame.K_RETURN, pygame.K_SPACE):
-                song = self.songs[self.selected_song_idx]
-                self._start_song(song)
+                if not self._can_control_song():
+                    return True
+                # 연습 모드는 곡 전체를 탐색하므로 완성된 차트가 필요하다
+                practice = self.game_modes[self.selected_mode_idx][0] == "practice"
+                self._load_then(self._selected_song(), self._start_song, full=practice)
+            elif key == pygame.K_v:
+                self._load_then(self._selected_song(), self._start_replay, full=True)
+            elif key == pygame.K_c and self.net is None:
+                self._start_calibration()
+            return True
+
+        if self.state == "calibrate":
+            cal = self.calibration
+            if key == pygame.K_ESCAPE or cal.done:
+                self.audio.stop()
+                self.calibration = None
+                self.state = "menu"
+            else:
+                cal.tap(self._calibration_time())
+            return True
+
+        # 차트 생성 중: Esc 로 취소 (생성은 백그라운드에서 끝까지 진행되어 캐시에 남는다)
+        if self.state == "loading":
+            if key == pygame.K_ESCAPE:
+                self.chart_load = None
+                self.state = "menu"
             return True
 
         # 플레이 중일 때 (state == "play")
@@ -705,6 +824,15 @@ class Game:
                     return True
                 return True
 
+            # 네트워크 대전: 일시정지 없이 Esc 는 곡에서 나가기, 재시작은 호스트만
+            if self.net is not None:
+                if key == pygame.K_ESCAPE:
+                    self.net.send_quit()
+                    self._back_to_menu()
+                    return True
+                if key == pygame.K_b and not self._can_control_song():
+                    return True
+
             # 여기부터는 정상 플레이 중
             if key == pygame.K_ESCAPE:
                 # ESC → 일시정지 진입
@@ -714,17 +842,38 @@ class Game:
                 # 곡 재시작
                 self._start_song(self.current_song)
                 return True
+            if self.play_mode == "practice" and self._handle_practice_key(key, now):
+                return True
+            if key == pygame.K_h:
+                self.timing_hud = not self.timing_hud
+                return True
 
+            if self.replay_player is not None:
+                return True
+            # 보정된 기기 지연만큼 이른 시각에 누른 것으로 판정 (리플레이/상대에게도 이 시각이 간다)
+            press = now - self.latency.input_offset
             for idx, track in enumerate(self.tracks):
-                if track.is_down:
+                if track.is_down or key not in track.keys:
                     continue
-                label = track.handle_key(key, now)
-                if label:
-                    self._apply_health(idx, label, now=now)
+                lane = track.keys[key]
+                if self.net is not None:
+                    self.net.send_input(lane, press)
+                self._judge_lane(idx, lane, press)
             return True
 
         return True
 
+    def _judge_lane(self, idx: int, lane: int, now: float) -> None:
+        track = self.tracks[idx]
+        if track.is_down:
+            return
+        self.recorder.press(idx, lane, now)
+        label = track.handle_lane(lane, now)
+        if label:
+            if self.keysounds.ready:
+                self.keysounds.play(label, idx)  # 판정 직후 바로: 소리 지연이 가장 짧게
+            self._apply_health(idx, label, now=now)
+
     def _enter_pause(self) -> None:
         """ESC 눌렀을 때 호출: 게임/음악 일시정지."""
         if self.is_paused:
@@ -734,37 +883,21 @@ class Game:
         self.resume_countdown = 0.0
         self.pause_tick_ms = pygame.time.get_ticks()
         self.paused_raw_now = (self.pause_tick_ms - self.start_ms) / 1000.0
-        try:
-            pygame.mixer.music.pause()
-        except pygame.error:
-            pass
+        self.audio.pause()
 
     # ---- HP / 판정 효과 ----
     def _apply_health(self, actor_idx: int, label: str, repeat: int = 1, now: float = 0.0) -> None:
+        if self.play_mode == "practice":
+            return  # 연습 모드: HP 변화/KO 없음
         actor = self.tracks[actor_idx]
-        if actor.is_down:
-            return
         victim = self.tracks[1 - actor_idx]
-
-        for _ in range(repeat):
-            if label == "Perfect":
-                actor.heal(1.5)
-            elif label == "Great":
-                actor.heal(1.0)
-            elif label == "Good":
-                actor.heal(0.6)
-            elif label == "Bad":
-                actor.damage(2.0)
-            elif label == "Miss":
-                actor.damage(5.0)
-
-        # 콤보에 따른 상대 체력 감소/내 체력 회복
-        if label in ("Perfect", "Great", "Good") and actor.combo > 0 and actor.combo % 5 == 0:
-            victim.damage(4.0)
-            actor.heal(3.0)
+        if actor.rules.apply_health(actor, victim, label, repeat):
             self.last_combo_attack_time = now
             self.last_combo_attack_player = actor_idx
 
+    def _on_replay_judge(self, actor_idx: int, label: str, repeat: int, now: float) -> None:
+        self._apply_health(actor_idx, label, repeat=repeat, now=now)
+
     def _check_deaths(self, now: float) -> None:
         if self.state != "play":
             return
@@ -779,14 +912,15 @@ class Game:
             track.last_label_time = now
             if self.play_mode == "sudden":
                 winner_idx = 1 - i if self.tracks[1 - i].health > 0 else None
-                self._handle_ko(winner_idx)
+                self._handle_ko(winner_idx, now)
                 return
 
-    def _handle_ko(self, winner_idx: Optional[int]) -> None:
-        try:
-            pygame.mixer.music.stop()
-        except pygame.error:
-            pass
+    def _handle_ko(self, winner_idx: Optional[int], now: float) -> None:
+        self._end_song_perf()
+        self.audio.stop()
+        self._save_replay()
+        self._record_result(now, winner_idx)
+        self._broadcast_event(EVENT_KO, winner_idx)
         self._draw_ko_overlay(winner_idx)
         pygame.display.flip()
         self._wait_for_restart()
@@ -795,32 +929,138 @@ class Game:
 
     # ---- Drawing ----
     def _draw_menu(self) -> None:
+        if self.latency_device is None and pygame.mixer.get_init():
+            self._load_latency()  # 믹서가 백그라운드에서 열린 뒤에 기기 프로필을 읽는다
         self.screen.fill((18, 18, 24))
         title = self.menu_big_font.render("Battle! Rhythm Hell", True, (240, 240, 240))
         self.screen.blit(title, (self.width // 2 - title.get_width() // 2, 48))
         info_lines = [
             "Controls: P1=QWER, P2=OP[], Up/Down to choose",
-            "In game: B=restart, Esc=pause",
+            "In game: B=restart, Esc=pause, H=timing histogram",
             "Paused: Enter/Space=resume (3s), B=restart, Esc=menu",
-            "Left/Right: change mode (Sudden KO / Endurance)",
+            "Left/Right: change mode (Sudden KO / Endurance / Practice)",
+            "Practice: Left/Right=seek 5s, 1-9,0=section, ','/'.'=loop A/B, '/'=clear, -/= speed",
+            "V: watch latest replay of selected song",
+            f"C: calibrate audio/input latency ({self.latency.summary() if self.latency.taps else 'not calibrated'})",
         ]
+        if self.net is not None:
+            role = "host (choose song)" if self.net.player_idx == 0 else "guest (waiting for host)"
+            status = "connected" if self.net.connected else "waiting for peer"
+            info_lines.append(
+                f"Network {role}: {status}, rtt {self.net.clock.rtt:.0f}ms, input delay {self.net.input_delay * 1000:.0f}ms"
+            )
         y = 150
         for line in info_lines:
             surf = self.menu_font.render(line, True, (210, 210, 210))
             self.screen.blit(surf, (70, y))
             y += 32
         y += 8
-        for idx, song in enumerate(self.songs):
-            color = (255, 230, 150) if idx == self.selected_song_idx else (190, 190, 190)
-            prefix = "➤ " if idx == self.selected_song_idx else "  "
-            label = f"{prefix}{song.name} (bpm {song.bpm}, diff {song.difficulty:.1f})"
-            surf = self.menu_font.render(label, True, color)
+        # 가상 스크롤: 보이는 줄만 그리고, 렌더링한 글자는 캐시해 둔다
+        sel = self.selected_song_idx
+        if sel < self.menu_top:
+            self.menu_top = sel
+        elif sel >= self.menu_top + MENU_ROWS:
+            self.menu_top = sel - MENU_ROWS + 1
+        end = min(len(self.library), self.menu_top + MENU_ROWS)
+        for idx in range(self.menu_top, end):
+            surf = self._menu_label(idx, idx == sel)
             self.screen.blit(surf, (90, y))
             y += 36
+        if len(self.library) > MENU_ROWS:
+            more = self.font.render(f"{sel + 1}/{len(self.library)}  PgUp/PgDn/Home/End", True, (140, 140, 150))
+            self.screen.blit(more, (90, y))
+            y += 28
         mode_code, mode_label = self.game_modes[self.selected_mode_idx]
-        mode_text = f"Mode: {mode_label} ({'stop on KO' if mode_code=='sudden' else 'play to end'})"
+        mode_hint = {"sudden": "stop on KO", "practice": "no HP, seek and loop"}.get(mode_code, "play to end")
+        mode_text = f"Mode: {mode_label} ({mode_hint})"
         mode_surf = self.menu_font.render(mode_text, True, (220, 220, 220))
         self.screen.blit(mode_surf, (70, y + 12))
+        self._draw_leaderboard(self.width - 360, 392)
+
+    def _draw_leaderboard(self, x: int, y: int) -> None:
+        # 질의 결과는 ResultStore 가 새 기록이 쓰일 때까지 캐시하므로 매 프레임 불러도 된다
+        top = self.results.leaderboard(LEADERBOARD_ROWS)
+        if not top:
+            return
+        self.screen.blit(self._text("menu_font", "Top scores", (255, 230, 150)), (x, y))
+        y += 36
+        for rank, entry in enumerate(top, start=1):
+            line = f"{rank}. {entry.score:>6} P{entry.player + 1} {entry.song[:12]}"
+            self.screen.blit(self._text("font", line, (200, 200, 210)), (x, y))
+            y += 28
+
+    def _menu_label(self, idx: int, selected: bool) -> pygame.Surface:
+        entry = self.library.entry(idx)
+        song = self.library.loaded(idx)
+        bpm_value = song.bpm if song is not None else entry.bpm
+        if song is not None and song.chart_source:
+            source = song.chart_source
+        else:
+            source = "manual" if entry.chart_hash else "auto"
+        best = self.results.best(entry.name)
+        key = (idx, selected, f"{bpm_value}|{source}|{best.score if best else ''}")
+        surf = self.menu_label_cache.get(key)
+        if surf is None:
+            if len(self.menu_label_cache) > MENU_ROWS * 8:
+                self.menu_label_cache.clear()
+            color = (255, 230, 150) if selected else (190, 190, 190)
+            prefix = "➤ " if selected else "  "
+            bpm = f"{bpm_value:.0f}" if bpm_value > 0 else "?"
+            label = f"{prefix}{entry.name} (bpm {bpm}, diff {entry.difficulty:.1f}, {source})"
+            if best is not None:
+                label += f"  best {best.score}"
+            surf = self.menu_font.render(label, True, color)
+            self.menu_label_cache[key] = surf
+        return surf
+
+    def _draw_calibration(self) -> None:
+        cal = self.calibration
+        if cal is None:
+            return
+        self.screen.fill((18, 18, 24))
+        title = self.menu_big_font.render("Latency calibration", True, (240, 240, 240))
+        self.screen.blit(title, (self.width // 2 - title.get_width() // 2, 90))
+        if cal.done:
+            if cal.result is None:
+                lines = ["Not enough steady taps to measure. Try again (C in the menu)."]
+            else:
+                lines = [
+                    f"{cal.result.summary()}  (jitter {cal.result.jitter * 1000:.0f}ms, {cal.result.taps} taps)",
+                    f"Saved for {cal.result.device}",
+                ]
+            lines.append("Press any key to return")
+        else:
+            t = self._calibration_time()
+            step = f"{min(cal.beat_index(t), len(cal.beats))}/{len(cal.beats)}"
+            if cal.phase == "audio":
+                lines = [f"1/2  Tap Space in time with the clicks you HEAR  ({step})"]
+            else:
+                lines = [f"2/2  Tap Space in time with the circle you SEE  ({step})"]
+                if cal.flash(t):
+                    pygame.draw.circle(self.screen, self.accent_color, (self.width // 2, self.height // 2 + 60), 70)
+            lines.append(f"current profile: {self.latency.summary()}   Esc: cancel")
+        y = 200
+        for line in lines:
+            surf = self.menu_font.render(line, True, (210, 210, 210))
+            self.screen.blit(surf, (self.width // 2 - surf.get_width() // 2, y))
+            y += 40
+
+    def _draw_loading(self) -> None:
+        load = self.chart_load
+        if load is None:
+            return
+        self.screen.fill((18, 18, 24))
+        title = self.menu_big_font.render("Generating chart...", True, (240, 240, 240))
+        self.screen.blit(title, (self.width // 2 - title.get_width() // 2, self.height // 2 - 120))
+        name = self.menu_font.render(load.song.name, True, (210, 210, 210))
+        self.screen.blit(name, (self.width // 2 - name.get_width() // 2, self.height // 2 - 50))
+        bar = pygame.Rect(self.width // 4, self.height // 2, self.width // 2, 22)
+        pygame.draw.rect(self.screen, (40, 40, 52), bar, border_radius=6)
+        fill = bar.copy()
+        fill.width = int(bar.width * max(0.0, min(1.0, load.progress)))
+        pygame.draw.rect(self.screen, self.accent_color, fill, border_radius=6)
+        hint = self.font.render(f"{load.progress * 100:.0f}%   Esc: cancel", True, (170, 170, 180))
+        self.screen.blit(hint, (self.width // 2 - hint.get_width() // 2, bar.bottom + 16))
 
     def _draw_play(self, now: float, raw_now: float) -> None:
         self._draw_background()
@@ -844,80 +1084,150 @@ class Game:
         if self.in_resume_countdown:
             self._draw_countdown(self.resume_countdown)
 
-    def _draw_background(self) -> None:
-        self.screen.fill(self.bg_color)
+    def _prepare_play_graphics(self) -> None:
+        """Build everything the play screen blits per frame, so drawing creates no Surfaces."""
+        if self.play_bg is None:
+            self.play_bg = pygame.Surface((self.width, self.height))
+            self._render_background(self.play_bg)
+            self.divider_glow = pygame.Surface((4, self.height), pygame.SRCALPHA)
+            pygame.draw.line(self.divider_glow, (255, 255, 255, 60), (2, 0), (2, self.height), 2)
+            for alpha in (140, 180):  # 카운트다운 / 일시정지
+                overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+                overlay.fill((0, 0, 0, alpha))
+                self.dim_overlays[alpha] = overlay
+            self.drain_overlay = pygame.Surface((self.tracks[0].width, self.height), pygame.SRCALPHA)
+            for color in ((230, 230, 230), (235, 235, 235), (215, 215, 215)):
+                self.glyphs[color] = GlyphText(self.font, color)
+            self.big_glyphs = GlyphText(self.big_font, (240, 240, 240))
+            self.hp_colors = [
+                (int(230 - 150 * pct), int(80 + 120 * pct), int(90 + 40 * pct)) for pct in (i / 100 for i in range(101))
+            ]
+        for track in self.tracks:
+            track.prepare_draw()
+            panel = pygame.Rect(track.x + 16, 16, track.width - 32, 140)
+            bar = pygame.Rect(panel.x + 14, panel.bottom - 30, panel.width - 28, 12)
+            hud = pygame.Rect(track.x + 30, 166, track.width - 60, 36)
+            self.panel_rects[track.name] = (panel, bar, bar.copy(), hud)
+            self.panel_colors[track.name] = ((*track.color, 70), (*track.color, 120), (*track.color, 140))
+            self.panel_text[track.name] = [None, "", None, "", None, ""]
+            lane_keys = [""] * 4
+            for key, lane in track.keys.items():
+                if lane < len(lane_keys):
+                    lane_keys[lane] = pygame.key.name(key).upper()
+            self.panel_labels[track.name] = (
+                self.label_font.render(track.name, True, (245, 245, 245)),
+                self.font.render(" ".join(lane_keys), True, (210, 210, 210)),
+            )
+
+    def _text(self, font_name: str, text: str, color: Tuple[int, int, int]) -> pygame.Surface:
+        """Rendered text that doesn't change during a song (labels, hints), cached."""
+        key = (font_name, text, color)
+        surf = self.text_cache.get(key)
+        if surf is None:
+            surf = getattr(self, font_name).render(text, True, color)
+            self.text_cache[key] = surf
+        return surf
+
+    def _render_background(self, target: pygame.Surface) -> None:
+        target.fill(self.bg_color)
         half = self.width // 2
         tint_left = pygame.Surface((half, self.height), pygame.SRCALPHA)
         tint_left.fill((*self.tracks[0].color, 26))
         tint_right = pygame.Surface((half, self.height), pygame.SRCALPHA)
         tint_right.fill((*self.tracks[1].color, 26))
-        self.screen.blit(tint_left, (0, 0))
-        self.screen.blit(tint_right, (half, 0))
+        target.blit(tint_left, (0, 0))
+        target.blit(tint_right, (half, 0))
         band_height = 170
         band = pygame.Surface((self.width, band_height), pygame.SRCALPHA)
         pygame.draw.rect(band, (255, 255, 255, 18), (0, 0, self.width, band_height), border_radius=18)
-        self.screen.blit(band, (0, 0))
+        target.blit(band, (0, 0))
         grid = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
         for y in range(0, self.height, 36):
             alpha = 20 if (y // 36) % 2 == 0 else 12
             pygame.draw.line(grid, (255, 255, 255, alpha), (0, y), (self.width, y), 1)
-        self.screen.blit(grid, (0, 0))
+        target.blit(grid, (0, 0))
+
+    def _draw_background(self) -> None:
+        if self.play_bg is None:
+            self._prepare_play_graphics()
+        self.screen.blit(self.play_bg, (0, 0))
 
     def _draw_center_divider(self) -> None:
         pygame.draw.line(self.screen, self.center_line_color, (self.width // 2, 0), (self.width // 2, self.height), 3)
-        glow = pygame.Surface((4, self.height), pygame.SRCALPHA)
-        pygame.draw.line(glow, (255, 255, 255, 60), (2, 0), (2, self.height), 2)
-        self.screen.blit(glow, (self.width // 2 - 2, 0))
+        self.screen.blit(self.divider_glow, (self.width // 2 - 2, 0))
         pygame.draw.circle(self.screen, self.center_line_color, (self.width // 2, int(self.hit_y)), 8, 2)
 
     def _draw_ui(self, now: float) -> None:
         for track in self.tracks:
             self._draw_track_panel(track)
             self._draw_judgement(track, now)
+            if self.timing_hud:
+                self._draw_timing_hud(track)
         self._draw_footer(now)
 
     def _draw_track_panel(self, track: Track) -> None:
-        panel_rect = pygame.Rect(track.x + 16, 16, track.width - 32, 140)
-        pygame.draw.rect(self.screen, (*track.color, 70), panel_rect, border_radius=14)
-        pygame.draw.rect(self.screen, (*track.color, 120), panel_rect, width=2, border_radius=14)
-        name_surf = self.label_font.render(track.name, True, (245, 245, 245))
-        score_surf = self.font.render(f"Score {track.score}", True, (230, 230, 230))
-        combo_surf = self.font.render(f"Combo {track.combo}", True, (230, 230, 230))
-        lane_keys = [""] * 4
-        for key, lane in track.keys.items():
-            label = pygame.key.name(key).upper()
-            if lane < len(lane_keys):
-                lane_keys[lane] = label
-        keys_surf = self.font.render(" ".join(lane_keys), True, (210, 210, 210))
+        panel_rect = self.panel_rects[track.name][0]
+        fill_color, border_color, _ = self.panel_colors[track.name]
+        pygame.draw.rect(self.screen, fill_color, panel_rect, border_radius=14)
+        pygame.draw.rect(self.screen, border_color, panel_rect, width=2, border_radius=14)
+        name_surf, keys_surf = self.panel_labels[track.name]
+        glyphs = self.glyphs[(230, 230, 230)]
 
         top_y = panel_rect.y + 12
         self.screen.blit(name_surf, (panel_rect.x + 14, top_y))
         self.screen.blit(keys_surf, (panel_rect.right - keys_surf.get_width() - 14, top_y))
 
+        text = self.panel_text[track.name]
+        if text[0] != track.score:
+            text[0], text[1] = track.score, f"Score {track.score}"
+        if text[2] != track.combo:
+            text[2], text[3] = track.combo, f"Combo {track.combo}"
         mid_y = panel_rect.y + 62
-        self.screen.blit(score_surf, (panel_rect.x + 14, mid_y))
-        self.screen.blit(combo_surf, (panel_rect.right - combo_surf.get_width() - 14, mid_y))
+        glyphs.draw(self.screen, text[1], panel_rect.x + 14, mid_y)
+        glyphs.draw(self.screen, text[3], panel_rect.right - glyphs.width(text[3]) - 14, mid_y)
 
         self._draw_health_bar(track, panel_rect)
         if track.is_down:
-            down_surf = self.font.render("DOWN", True, (255, 120, 120))
+            down_surf = self._text("font", "DOWN", (255, 120, 120))
             self.screen.blit(down_surf, (panel_rect.right - down_surf.get_width() - 14, panel_rect.y + 96))
 
     def _draw_health_bar(self, track: Track, panel_rect: pygame.Rect) -> None:
+        _, bar_rect, fill_rect, _ = self.panel_rects[track.name]
         hp_pct = max(0.0, min(1.0, track.health / track.max_health))
-        bar_rect = pygame.Rect(panel_rect.x + 14, panel_rect.y + panel_rect.height - 30, panel_rect.width - 28, 12)
         pygame.draw.rect(self.screen, (30, 30, 40), bar_rect, border_radius=4)
         fill_w = int(bar_rect.width * hp_pct)
         if fill_w > 0:
-            hp_color = (
-                int(230 - 150 * hp_pct),
-                int(80 + 120 * hp_pct),
-                int(90 + 40 * hp_pct),
-            )
-            pygame.draw.rect(self.screen, hp_color, (bar_rect.x, bar_rect.y, fill_w, bar_rect.height), border_radius=4)
-        pygame.draw.rect(self.screen, (*track.color, 140), bar_rect, width=2, border_radius=4)
-        hp_text = self.font.render(f"HP {int(track.health)}/{int(track.max_health)}", True, (235, 235, 235))
-        self.screen.blit(hp_text, (bar_rect.x, bar_rect.y - 20))
+            fill_rect.width = fill_w  # 미리 만든 Rect 의 폭만 바꾼다
+            pygame.draw.rect(self.screen, self.hp_colors[int(hp_pct * 100)], fill_rect, border_radius=4)
+        pygame.draw.rect(self.screen, self.panel_colors[track.name][2], bar_rect, width=2, border_radius=4)
+        text = self.panel_text[track.name]
+        hp = int(track.health)
+        if text[4] != hp:
+            text[4], text[5] = hp, f"HP {hp}/{int(track.max_health)}"
+        self.glyphs[(235, 235, 235)].draw(self.screen, text[5], bar_rect.x, bar_rect.y - 20)
+
+    def _draw_timing_hud(self, track: Track) -> None:
+        rect = self.panel_rects[track.name][3]
+        self._draw_histogram(track.timing, rect, track.color)
+        stats = track.timing
+        text = f"avg {stats.mean * 1000:+.1f}ms  sd {stats.stddev * 1000:.1f}ms  early {stats.early} late {stats.late}"
+        self.glyphs[(215, 215, 215)].draw(self.screen, text, rect.x, rect.bottom + 4)
+
+    def _draw_histogram(self, stats: TimingStats, rect: pygame.Rect, color: Tuple[int, int, int]) -> None:
+        """Timing histogram of ``stats`` in ``rect``: early bins left of the centre line, late right."""
+        screen = self.screen
+        pygame.draw.rect(screen, (30, 30, 40), rect, border_radius=4)
+        bins = stats.bins
+        peak = max(bins)
+        width = rect.width / len(bins)
+        if peak:
+            for i, count in enumerate(bins):
+                if count:
+                    height = max(1, int(rect.height * count / peak))
+                    x = rect.x + int(i * width)
+                    pygame.draw.rect(screen, color, (x, rect.bottom - height, max(1, int(width) - 1), height))
+        mid = rect.x + rect.width // 2
+        pygame.draw.line(screen, (240, 240, 240), (mid, rect.y), (mid, rect.bottom - 1), 1)
 
     def _draw_judgement(self, track: Track, now: float) -> None:
         if track.last_label_time <= 0:
@@ -928,48 +1238,47 @@ class Game:
         if now < track.first_note_time:
             return
         color = self.judge_colors.get(track.last_label, (235, 235, 235))
-        surf = self.big_font.render(track.last_label, True, color)
+        surf = self._text("big_font", track.last_label, color)
         alpha = max(0, 255 - int((age / 1.1) * 255))
-        surf.set_alpha(alpha)
         x = track.x + track.width // 2 - surf.get_width() // 2
         y = self.hit_y - 130
-        shadow = self.big_font.render(track.last_label, True, (0, 0, 0))
+        # 캐시된 Surface 라 알파는 블릿 직전에 매번 다시 정한다
+        shadow = self._text("big_font", track.last_label, (0, 0, 0))
         shadow.set_alpha(min(alpha, 140))
         self.screen.blit(shadow, (x + 2, y + 2))
+        surf.set_alpha(alpha)
         self.screen.blit(surf, (x, y))
 
     def _draw_footer(self, now: float) -> None:
-        info_text = "B: restart | Esc: pause"
-        info_surf = self.font.render(info_text, True, (205, 205, 205))
+        info_surf = self._text("font", "B: restart | Esc: pause | H: timing", (205, 205, 205))
         info_x = self.width // 2 - info_surf.get_width() // 2
         info_y = self.height - 48
         self.screen.blit(info_surf, (info_x, info_y))
-        timer_surf = self.font.render(f"{now:05.2f}s", True, (215, 215, 215))
-        timer_x = self.width // 2 - timer_surf.get_width() // 2
-        timer_y = info_y + 26
-        self.screen.blit(timer_surf, (timer_x, timer_y))
+        glyphs = self.glyphs[(215, 215, 215)]
+        timer = f"{now:05.2f}s"
+        glyphs.draw(self.screen, timer, self.width // 2 - glyphs.width(timer) // 2, info_y + 26)
+        if self.play_mode == "practice":
+            a = "--.--" if self.loop_a is None else f"{self.loop_a:05.2f}"
+            b = "--.--" if self.loop_b is None else f"{self.loop_b:05.2f}"
+            rate = f"{self.rate:.1f}x" if self.practice_rate == self.rate else f"{self.rate:.1f}x (next {self.practice_rate:.1f}x)"
+            loop = f"PRACTICE {rate}  loop {a} - {b}"
+            glyphs.draw(self.screen, loop, self.width // 2 - glyphs.width(loop) // 2, info_y - 26)
 
     def _draw_countdown(self, remain: float) -> None:
-        overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 140))
-        self.screen.blit(overlay, (0, 0))
-        text = self.big_font.render(f"Starts in {remain:0.1f}s", True, (240, 240, 240))
-        rect = text.get_rect(center=(self.width // 2, self.height // 2))
-        self.screen.blit(text, rect)
+        self.screen.blit(self.dim_overlays[140], (0, 0))
+        self.big_glyphs.draw_centered(self.screen, f"Starts in {remain:0.1f}s", self.width // 2, self.height // 2)
 
     def _draw_pause_menu(self) -> None:
-        overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
-        lines = [
+        self.screen.blit(self.dim_overlays[180], (0, 0))
+        lines = (
             "Paused",
             "Enter/Space: resume (3s countdown)",
             "B: restart song",
             "Esc: back to menu",
-        ]
+        )
         y = self.height // 2 - 40
         for line in lines:
-            surf = self.big_font.render(line, True, (240, 240, 240))
+            surf = self._text("big_font", line, (240, 240, 240))
             rect = surf.get_rect(center=(self.width // 2, y))
             self.screen.blit(surf, rect)
             y += 44
@@ -993,17 +1302,23 @@ class Game:
         victim_track = self.tracks[victim_idx]
 
         # 맞은 쪽 레인 전체 붉은 오버레이
-        overlay = pygame.Surface((victim_track.width, self.height), pygame.SRCALPHA)
-        overlay.fill((255, 80, 80, alpha))
-        self.screen.blit(overlay, (victim_track.x, 0))
+        self.drain_overlay.fill((255, 80, 80, alpha))
+        self.screen.blit(self.drain_overlay, (victim_track.x, 0))
 
         # 중앙에 HP 이펙트 텍스트
-        text = self.big_font.render("HP DRAIN!", True, (255, 255, 255))
+        text = self._text("big_font", "HP DRAIN!", (255, 255, 255))
         text.set_alpha(alpha)
         cx = victim_track.x + victim_track.width // 2 - text.get_width() // 2
         cy = self.height // 2 - text.get_height() // 2
         self.screen.blit(text, (cx, cy))
 
+    def _winner_idx(self) -> Optional[int]:
+        # 우선 체력, 동률이면 점수 (None = 무승부)
+        p1, p2 = self.tracks
+        if p1.health == p2.health:
+            return None if p1.score == p2.score else (0 if p1.score > p2.score else 1)
+        return 0 if p1.health > p2.health else 1
+
     def _draw_game_over(self) -> None:
         overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
         overlay.fill((0, 0, 0, 160))
@@ -1033,6 +1348,22 @@ class Game:
             rect = surf.get_rect(center=(self.width // 2, y))
             self.screen.blit(surf, rect)
             y += 44
+        self._draw_timing_breakdown()
+
+    def _draw_timing_breakdown(self) -> None:
+        """Per-player timing summary under the result: histogram, mean/spread and early/late split."""
+        top = self.height - 170
+        for track in self.tracks:
+            stats = track.timing
+            rect = pygame.Rect(track.x + 60, top + 30, track.width - 120, 60)
+            lines = (
+                f"{track.name}: {stats.count} hits  avg {stats.mean * 1000:+.1f}ms  sd {stats.stddev * 1000:.1f}ms",
+                f"early {stats.early} / late {stats.late}   (-{stats.span * 1000:.0f}ms .. +{stats.span * 1000:.0f}ms)",
+            )
+            for i, line in enumerate(lines):
+                surf = self.font.render(line, True, (225, 225, 225))
+                self.screen.blit(surf, (rect.x, top - 24 + i * 24))
+            self._draw_histogram(stats, rect, track.color)
 
     def _draw_ko_overlay(self, winner_idx: Optional[int]) -> None:
         overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
@@ -1056,13 +1387,21 @@ class Game:
         while waiting:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
+                    self._shutdown()
                     sys.exit(0)
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
+                        if self.net is not None:
+                            self.net.send_quit()
                         self._back_to_menu()
                         return
-                    if event.key == pygame.K_b:
+                    if event.key == pygame.K_b and self._can_control_song():
                         self._start_song(self.current_song)
                         return
+            if self.net is not None:
+                # 호스트가 다음 곡/재시작을 보내면 메인 루프에서 처리하도록 빠져나간다
+                if self.net.start_pending or self.net.closed_by_peer:
+                    return
+            if self.broadcaster is not None:
+                self.broadcaster.flush()  # KO/결과 이벤트의 반복 전송
             self.clock.tick(60)
@@ -0,0 +1,136 @@
+"""Hit sounds: one preloaded sample per judgement played on a reserved channel pool.
+
+Samples are synthesised once when the first song starts, so a hit only picks a voice and
+calls ``Channel.play``. When every voice is busy the oldest one is stolen.
+"""
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pygame
+
+from audio_player import MIXER_BUFFER, STRETCH_CHANNEL, ensure_mixer, reserve_channels
+
+VOICES = 8  # 두 명이 초당 20개 이상 쳐도 소리 길이(최대 60ms)보다 충분히 많다
+FIRST_CHANNEL = STRETCH_CHANNEL + 1
+VOLUME = 0.5
+PAN = ((1.0, 0.45), (0.45, 1.0))  # 플레이어별 (왼쪽, 오른쪽) 볼륨
+LATENCY_SAMPLES = 4096  # 곡마다 보관하는 트리거 시간 수 (링 버퍼)
+
+# 판정별 소리: (주파수 Hz, 길이 s, 감쇠 s, 음량); 주파수 0 은 잡음
+SAMPLES: Dict[str, Tuple[float, float, float, float]] = {
+    "Perfect": (1760.0, 0.045, 0.012, 0.9),
+    "Great": (1320.0, 0.045, 0.012, 0.8),
+    "Good": (990.0, 0.05, 0.015, 0.7),
+    "Bad": (330.0, 0.06, 0.02, 0.7),
+    "Miss": (0.0, 0.03, 0.008, 0.35),
+}
+
+
+def synth_sample(freq: int, channels: int, tone: float, length: float, decay: float, gain: float) -> np.ndarray:
+    """16-bit click in the mixer's layout: a decaying sine (or noise burst when ``tone`` is 0)."""
+    n = max(1, int(length * freq))
+    t = np.arange(n) / freq
+    if tone > 0:
+        wave = np.sin(2 * np.pi * tone * t)
+    else:
+        wave = np.random.default_rng(0).uniform(-1.0, 1.0, n)
+    pcm = (wave * np.exp(-t / decay) * gain * 32767).astype(np.int16)
+    return pcm if channels == 1 else np.repeat(pcm[:, None], channels, axis=1)
+
+
+@dataclass
+class KeySoundReport:
+    """Hit-sound counters of one song."""
+
+    triggers: int
+    stolen: int
+    trigger_p50_ms: float
+    trigger_p95_ms: float
+    buffer_ms: float
+
+    def summary(self) -> str:
+        return (
+            f"[keysound] {self.triggers} hits, {self.stolen} voices stolen, "
+            f"trigger p50 {self.trigger_p50_ms:.3f}ms / p95 {self.trigger_p95_ms:.3f}ms "
+            f"+ mixer buffer {self.buffer_ms:.1f}ms = ~{self.trigger_p95_ms + self.buffer_ms:.1f}ms to output"
+        )
+
+
+class KeySounds:
+    """Judgement sounds on ``VOICES`` reserved channels (after the stretch channel)."""
+
+    def __init__(self, enabled: bool = True, voices: int = VOICES) -> None:
+        self.enabled = enabled
+        self.voices = voices
+        self.sounds: Dict[str, pygame.mixer.Sound] = {}
+        self.channels: List[pygame.mixer.Channel] = []
+        self.started: List[float] = []  # 채널별 마지막 재생 시작 시각
+        self.next = 0
+        self.buffer_ms = 0.0
+        self.triggers = 0
+        self.stolen = 0
+        self.latency = [0.0] * LATENCY_SAMPLES
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.channels)
+
+    def prepare(self) -> None:
+        """Open the voice pool and build the samples (once; call before a song starts)."""
+        if not self.enabled or self.ready:
+            return
+        ensure_mixer()
+        freq, _, channels = pygame.mixer.get_init()
+        reserve_channels(FIRST_CHANNEL + self.voices)
+        self.channels = [pygame.mixer.Channel(FIRST_CHANNEL + i) for i in range(self.voices)]
+        self.started = [0.0] * self.voices
+        for label, (tone, length, decay, gain) in SAMPLES.items():
+            sound = pygame.sndarray.make_sound(synth_sample(freq, channels, tone, length, decay, gain))
+            sound.set_volume(VOLUME)
+            self.sounds[label] = sound
+        self.buffer_ms = MIXER_BUFFER / freq * 1000
+
+    def reset_stats(self) -> None:
+        self.triggers = 0
+        self.stolen = 0
+
+    def play(self, label: str, player: int) -> None:
+        sound = self.sounds.get(label)
+        if sound is None:
+            return
+        start = time.perf_counter()
+        channel = self.channels[self._voice(start)]
+        channel.set_volume(*PAN[player])
+        channel.play(sound)
+        self.latency[self.triggers % LATENCY_SAMPLES] = time.perf_counter() - start
+        self.triggers += 1
+
+    def _voice(self, now: float) -> int:
+        # 비어 있는 채널을 돌아가며 찾고, 모두 울리는 중이면 가장 먼저 시작한 소리를 끊는다
+        channels = self.channels
+        count = len(channels)
+        for i in range(count):
+            idx = (self.next + i) % count
+            if not channels[idx].get_busy():
+                break
+        else:
+            started = self.started
+            idx = min(range(count), key=started.__getitem__)
+            self.stolen += 1
+        self.started[idx] = now
+        self.next = (idx + 1) % count
+        return idx
+
+    def report(self) -> Optional[KeySoundReport]:
+        if not self.triggers:
+            return None
+        samples = sorted(self.latency[: min(self.triggers, LATENCY_SAMPLES)])
+        return KeySoundReport(
+            triggers=self.triggers,
+            stolen=self.stolen,
+            trigger_p50_ms=samples[len(samples) // 2] * 1000,
+            trigger_p95_ms=samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+            buffer_ms=self.buffer_ms,
+        )
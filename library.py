@@ -0,0 +1,167 @@
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from models import MIN_FIRST_NOTE, Song, compile_chart
+
+LIBRARY_PATH = "library.json"
+SONG_DIR = "songs"
+SONG_LIST_MODULE = "songs.py"
+AUDIO_EXTS = (".mp3", ".ogg", ".wav", ".flac")
+INDEX_VERSION = 2  # 2: chart_hash is the compiled chart's (offset applied, duplicates merged)
+
+
+@dataclass
+class SongEntry:
+    """Menu metadata for one song; the full Song (chart included) is built only when needed."""
+
+    name: str
+    path: str
+    bpm: float  # 0 = estimated from the audio when the chart is generated
+    length: float
+    difficulty: float
+    chart_hash: str  # hash of the compiled manual chart (as replays record it), "" when the chart is generated from audio
+    mtime: float  # audio file mtime when indexed (0 when the file is missing)
+    builtin: bool = True  # defined in songs.py (else discovered in SONG_DIR)
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+class SongLibrary:
+    """Persistent song index: startup reads one JSON file instead of building every Song.
+
+    ``open`` rescans incrementally: songs.py is re-imported only when its mtime changed and
+    audio files in SONG_DIR are re-indexed only when new or modified.
+    """
+
+    def __init__(self, entries: List[SongEntry], path: str = LIBRARY_PATH) -> None:
+        self.entries = entries
+        self.path = path
+        self._by_name = {entry.name: i for i, entry in enumerate(entries)}
+        self._songs: Dict[int, Song] = {}
+        self._builtin: Optional[Dict[str, Song]] = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def open(cls, path: str = LIBRARY_PATH, song_dir: str = SONG_DIR) -> "SongLibrary":
+        index: Dict = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as fh:
+                    index = json.load(fh)
+                if index.get("version") != INDEX_VERSION:
+                    index = {}
+            except (OSError, ValueError) as exc:
+                print(f"[warn] song index unreadable, rescanning: {exc}")
+                index = {}
+        library = cls([], path)
+        changed = library._rescan(index, song_dir)
+        if changed:
+            library.save(index.get("songs_mtime", 0.0))
+        return library
+
+    def _rescan(self, index: Dict, song_dir: str) -> bool:
+        old = [SongEntry(**raw) for raw in index.get("entries", [])]
+        changed = not index
+        songs_mtime = _mtime(SONG_LIST_MODULE)
+        builtin = [e for e in old if e.builtin]
+        if not builtin or index.get("songs_mtime") != songs_mtime:
+            builtin = [self._entry_of(song) for song in self._builtin_songs().values()]
+            index["songs_mtime"] = songs_mtime
+            changed = True
+
+        # songs.py 에 없는 오디오 파일은 자동 차트 곡으로 추가
+        known = {os.path.normpath(e.path) for e in builtin}
+        scanned_old = {os.path.normpath(e.path): e for e in old if not e.builtin}
+        scanned: List[SongEntry] = []
+        try:
+            names = sorted(os.listdir(song_dir))
+        except OSError:
+            names = []
+        for name in names:
+            if not name.lower().endswith(AUDIO_EXTS):
+                continue
+            file_path = os.path.join(song_dir, name)
+            key = os.path.normpath(file_path)
+            if key in known:
+                continue
+            mtime = _mtime(file_path)
+            entry = scanned_old.get(key)
+            if entry is None or entry.mtime != mtime:
+                entry = SongEntry(os.path.splitext(name)[0], file_path, 0.0, 0.0, 1.0, "", mtime, builtin=False)
+                changed = True
+            scanned.append(entry)
+        if len(scanned) != len(scanned_old):
+            changed = True
+
+        self.entries = builtin + scanned
+        self._by_name = {entry.name: i for i, entry in enumerate(self.entries)}
+        return changed
+
+    def _builtin_songs(self) -> Dict[str, Song]:
+        if self._builtin is None:
+            from songs import load_song_list
+
+            self._builtin = {song.name: song for song in load_song_list()}
+        return self._builtin
+
+    @staticmethod
+    def _entry_of(song: Song) -> SongEntry:
+        return SongEntry(
+            name=song.name,
+            path=song.path,
+            bpm=float(song.bpm),
+            length=song.length_hint,
+            difficulty=song.difficulty,
+            chart_hash=compile_chart(song.chart, song.offset, MIN_FIRST_NOTE).content_hash if song.chart else "",
+            mtime=_mtime(song.path),
+        )
+
+    def save(self, songs_mtime: float) -> None:
+        data = {
+            "version": INDEX_VERSION,
+            "songs_mtime": songs_mtime,
+            "entries": [asdict(entry) for entry in self.entries],
+        }
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.path)
+        except OSError as exc:
+            print(f"[warn] song index save failed for {self.path}: {exc}")
+
+    # ---- lookup ----
+    def entry(self, idx: int) -> SongEntry:
+        return self.entries[idx]
+
+    def index_of(self, name: str) -> int:
+        return self._by_name[name]
+
+    def loaded(self, idx: int) -> Optional[Song]:
+        """The Song if it was already built (for menu display), without building it."""
+        return self._songs.get(idx)
+
+    def song(self, idx: int) -> Song:
+        """Full Song for an entry, built on first use and kept (charts are generated into it)."""
+        song = self._songs.get(idx)
+        if song is None:
+            entry = self.entries[idx]
+            if entry.builtin:
+                song = self._builtin_songs().get(entry.name)
+            if song is None:
+                song = Song(entry.name, entry.path, bpm=entry.bpm, difficulty=entry.difficulty)
+            self._songs[idx] = song
+        return song
+
+    def by_name(self, name: str) -> Optional[Song]:
+        idx = self._by_name.get(name)
+        return None if idx is None else self.song(idx)
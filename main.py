@@ -1,5 +1,41 @@
+import argparse
+
+from broadcast import DEFAULT_BROADCAST, MatchBroadcaster
 from game import Game
+from netplay import NetSession
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Battle! Rhythm Hell")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--host", type=int, metavar="PORT", help="host a network battle on this UDP port")
+    group.add_argument("--join", metavar="HOST:PORT", help="join a network battle")
+    parser.add_argument(
+        "--broadcast",
+        nargs="?",
+        const=f"{DEFAULT_BROADCAST[0]}:{DEFAULT_BROADCAST[1]}",
+        metavar="HOST:PORT",
+        help="publish match state for spectator.py",
+    )
+    parser.add_argument(
+        "--no-perf-mode",
+        action="store_true",
+        help="keep the garbage collector running during songs (allocation counters are still printed)",
+    )
+    parser.add_argument("--no-keysounds", action="store_true", help="no hit sounds")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    Game().run()
\ No newline at end of file
+    args = parse_args()
+    net = None
+    if args.host:
+        net = NetSession.host(args.host)
+    elif args.join:
+        host, _, port = args.join.rpartition(":")
+        net = NetSession.join(host or "127.0.0.1", int(port))
+    broadcaster = None
+    if args.broadcast:
+        host, _, port = args.broadcast.rpartition(":")
+        broadcaster = MatchBroadcaster((host or DEFAULT_BROADCAST[0], int(port)))
+    Game(net=net, broadcaster=broadcaster, perf_mode=not args.no_perf_mode, keysounds=not args.no_keysounds).run()
@@ -1,20 +1,35 @@
+import hashlib
+from bisect import bisect_left
+import math
+import struct
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
 import pygame
 
+from rules import DEFAULT_RULES, JudgeRules
+
+LANES = 4
+MIN_FIRST_NOTE = 0.4  # clamp first note a bit after lead-in
+DUPLICATE_GAP = 0.001  # 같은 레인에서 이보다 가까운 노트는 하나로 합친다 (초)
+TIMING_RANGE = 0.2  # 타이밍 히스토그램 범위: ±200ms (밖은 양 끝 칸에 모은다)
+TIMING_BIN = 0.01  # 히스토그램 칸 너비 (초)
+
 
 @dataclass
 class Song:
     name: str
     path: str
-    bpm: int
+    bpm: float  # <= 0: estimate from the audio (see chart.TempoEstimator)
     offset: float = 0.0  # audio alignment
     chart_offset: float = 0.0  # fine tune for chart timing
     difficulty: float = 1.0  # density multiplier
     length_hint: float = 60.0
     start_delay: float = 2.5  # lead-in seconds
     chart: Optional[List[Tuple[int, float]]] = None  # optional manual chart (lane, time)
+    beat_offset: Optional[float] = None  # first beat time for grid quantization
+    auto_tempo: bool = False  # bpm/beat_offset were estimated from the audio
+    chart_source: str = ""  # "onset"/"procedural" once a chart was generated for a chartless song
 
 
 @dataclass
@@ -28,6 +43,49 @@ class Note:
         return hit_y - (self.time - now) * speed
 
 
+class TimingStats:
+    """Streaming signed hit offsets (press - note, + = late): Welford mean/variance and a histogram.
+
+    ``add`` is O(1) and allocation-free, so it runs on every judged press.
+    """
+
+    def __init__(self, span: float = TIMING_RANGE, bin_width: float = TIMING_BIN) -> None:
+        self.span = span
+        self.bin_width = bin_width
+        self.bins = [0] * int(round(2 * span / bin_width))
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.early = 0
+        self.late = 0
+        for i in range(len(self.bins)):
+            self.bins[i] = 0
+
+    def add(self, offset: float) -> None:
+        self.count += 1
+        delta = offset - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (offset - self.mean)
+        if offset < 0:
+            self.early += 1
+        elif offset > 0:
+            self.late += 1
+        idx = int((offset + self.span) / self.bin_width)
+        last = len(self.bins) - 1
+        self.bins[0 if idx < 0 else last if idx > last else idx] += 1
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+
 class Track:
     def __init__(self, name: str, x: int, width: int, keys: Dict[int, int], color: Tuple[int, int, int]):
         self.name = name
@@ -35,30 +93,107 @@ class Track:
         self.width = width
         self.keys = keys
         self.color = color
-        self.max_health: float = 100.0
+        self.rules: JudgeRules = DEFAULT_RULES
+        self.max_health: float = self.rules.max_health
         self.health: float = self.max_health
         self.is_down: bool = False
         self.just_downed: bool = False
         self.notes: List[Note] = []
+        # 레인별 노트(시간순)와 커서: 커서 앞쪽 노트는 전부 처리(hit/missed)된 상태
+        self.lane_notes: List[List[Note]] = [[] for _ in range(LANES)]
+        self.lane_cursor: List[int] = [0] * LANES
+        self.cursor: int = 0
+        # 연습 모드 탐색용 시간 목록 (notes / lane_notes 와 같은 순서)
+        self.note_times: List[float] = []
+        self.lane_times: List[List[float]] = [[] for _ in range(LANES)]
+        self.timing = TimingStats()  # 판정된 입력의 타이밍 오차 (곡마다 초기화)
+        self.judgements: Dict[str, int] = {}  # 라벨별 판정 횟수 (Miss 포함)
         self.last_label: str = "Ready"
         self.last_label_time: float = 0.0
         self.last_press: Dict[int, float] = {}
         self.first_note_time: float = 0.0
         self.score: int = 0
         self.combo: int = 0
+        self.lane_color = (*[c // 2 for c in color], 180)
+        self.press_overlay: Optional[pygame.Surface] = None  # prepare_draw 에서 한 번 만든다
 
-    def load_chart(self, chart: List[Tuple[int, float]]) -> None:
-        self.notes = [Note(lane, time) for lane, time in chart]
+    def prepare_draw(self) -> None:
+        """Allocate the surfaces ``draw`` reuses every frame."""
+        size = (self.width // LANES - 8, 26)
+        if self.press_overlay is None or self.press_overlay.get_size() != size:
+            self.press_overlay = pygame.Surface(size, pygame.SRCALPHA)
+
+    def set_rules(self, rules: JudgeRules) -> None:
+        self.rules = rules
+        self.max_health = rules.max_health
+        self.health = min(self.health, self.max_health)
+
+    def load_chart(self, chart: Union["CompiledChart", Sequence[Tuple[int, float]]]) -> None:
+        if not isinstance(chart, CompiledChart):
+            chart = compile_chart(chart)
+        self.notes = [Note(lane, time) for lane, time in zip(chart.lanes, chart.times)]
+        self.lane_notes = [[self.notes[i] for i in idx] for idx in chart.lane_index]
+        self.note_times = list(chart.times)
+        self.lane_times = [[chart.times[i] for i in idx] for idx in chart.lane_index]
+        self.lane_cursor = [0] * LANES
+        self.cursor = 0
+        self.timing.reset()
+        self.judgements = {}
         self.score = 0
         self.combo = 0
         self.last_label = "Ready"
         self.last_label_time = 0.0
         self.last_press = {}
-        self.first_note_time = min((n.time for n in self.notes), default=0.0)
+        self.first_note_time = chart.times[0] if chart.times else 0.0
         self.health = self.max_health
         self.is_down = False
         self.just_downed = False
 
+    def append_notes(self, chart: List[Tuple[int, float]]) -> None:
+        """Add notes to a chart that is already playing (progressively generated charts).
+
+        Notes must lie after everything already judged; they are inserted in time order.
+        """
+        had_notes = bool(self.notes)
+        for lane, time in sorted(chart, key=lambda x: x[1]):
+            note = Note(lane, time)
+            self.note_times.insert(_insert_by_time(self.notes, note, self.cursor), time)
+            self.lane_times[lane].insert(_insert_by_time(self.lane_notes[lane], note, self.lane_cursor[lane]), time)
+        if not had_notes and self.notes:
+            self.first_note_time = self.notes[0].time
+
+    def rescale(self, scale: float) -> None:
+        """Multiply every note time by ``scale`` in place (practice playback rate change).
+
+        Judged flags, cursors, score and timing statistics stay as they are.
+        """
+        for note in self.notes:
+            note.time *= scale
+        self.note_times = [t * scale for t in self.note_times]
+        self.lane_times = [[t * scale for t in times] for times in self.lane_times]
+        self.first_note_time *= scale
+
+    def seek(self, time: float) -> None:
+        """Practice seek: notes from ``time`` on become pending again, earlier ones count as done.
+
+        Cursors are found by binary search and only notes judged at or after ``time`` are
+        reset, so a seek costs O(log n) plus the notes it replays (no ``load_chart``).
+        """
+        start = bisect_left(self.note_times, time)
+        for note in self.notes[start : self.cursor]:
+            note.hit = note.missed = False
+        self.cursor = start
+        for lane, lane_notes in enumerate(self.lane_notes):
+            lane_start = bisect_left(self.lane_times[lane], time)
+            # 커서 앞은 한 번도 보지 않으므로 뒤쪽에 남은 판정 흔적(레인 커서 앞까지)만 지운다
+            for note in lane_notes[lane_start : self.lane_cursor[lane]]:
+                note.hit = note.missed = False
+            self.lane_cursor[lane] = lane_start
+        self.combo = 0
+        self.last_label = "Ready"
+        self.last_label_time = 0.0
+        self.last_press = {}
+
     def heal(self, amount: float) -> None:
         if self.is_down:
             return
@@ -78,90 +213,219 @@ class Track:
             return None
         if key not in self.keys:
             return None
-        lane = self.keys[key]
+        return self.handle_lane(self.keys[key], now)
+
+    def handle_lane(self, lane: int, now: float) -> Optional[str]:
+        """Judge a press on ``lane`` at ``now`` (shared by keyboard input and replays)."""
+        if self.is_down:
+            return None
         self.last_press[lane] = now
         note = self._closest_pending_note(lane)
         if note is None:
             self.last_label = "Miss"
             self.last_label_time = now
             self.combo = 0
+            self._count("Miss")
             return "Miss"
-        delta = abs(note.time - now)
-        windows = [
-            (0.08, "Perfect", 1000, True),
-            (0.16, "Great", 700, True),
-            (0.24, "Good", 400, True),
-            (0.32, "Bad", 100, False),
-        ]
-        for limit, label, points, keep_combo in windows:
-            if delta <= limit:
-                note.hit = True
-                if keep_combo:
-                    bonus = min(self.combo * 8, 400)
-                    self.score += points + bonus
-                    self.combo += 1
-                else:
-                    self.score += points
-                    self.combo = 0
-                self.last_label = label
-                self.last_label_time = now
-                return label
+        rules = self.rules
+        idx = rules.judge(abs(note.time - now))
+        if idx < len(rules.windows):
+            note.hit = True
+            self.lane_cursor[lane] += 1
+            self.timing.add(now - note.time)
+            label = rules.labels[idx]
+            if rules.keep_combo[idx]:
+                self.score += rules.points[idx] + rules.combo_bonus(self.combo)
+                self.combo += 1
+            else:
+                self.score += rules.points[idx]
+                self.combo = 0
+            self.last_label = label
+            self.last_label_time = now
+            self._count(label)
+            return label
         # 약간 일찍 눌렀을 때도 Bad 처리하여 콤보를 끊음
-        if now < note.time and (note.time - now) <= 0.35:
+        if now < note.time and (note.time - now) <= rules.early_bad:
             note.hit = True
+            self.lane_cursor[lane] += 1
+            self.timing.add(now - note.time)
             self.last_label = "Bad"
             self.last_label_time = now
-            self.score += 100
+            self.score += rules.early_bad_points
             self.combo = 0
+            self._count("Bad")
             return "Bad"
         if now > note.time:
             note.missed = True
+            self.lane_cursor[lane] += 1
             self.last_label = "Miss"
             self.last_label_time = now
             self.combo = 0
+            self._count("Miss")
             return "Miss"
         return None
 
-    def update_misses(self, now: float, drop_after: float = 0.3) -> int:
+    def _count(self, label: str) -> None:
+        self.judgements[label] = self.judgements.get(label, 0) + 1
+
+    def update_misses(self, now: float, drop_after: Optional[float] = None) -> int:
+        if drop_after is None:
+            drop_after = self.rules.drop_after
         missed = 0
-        for note in self.notes:
-            if not note.hit and not note.missed and now - note.time > drop_after:
+        notes = self.notes
+        idx = self.cursor
+        # 노트가 시간순이므로 drop 기준보다 늦은 노트에서 멈춘다
+        while idx < len(notes) and now - notes[idx].time > drop_after:
+            note = notes[idx]
+            if not note.hit and not note.missed:
                 note.missed = True
                 self.last_label = "Miss"
                 self.last_label_time = now
                 self.combo = 0
                 missed += 1
+            idx += 1
+        while idx < len(notes) and (notes[idx].hit or notes[idx].missed):
+            idx += 1
+        self.cursor = idx
+        if missed:
+            self.judgements["Miss"] = self.judgements.get("Miss", 0) + missed
         return missed
 
     def draw(self, screen: pygame.Surface, now: float, hit_y: float, speed: float) -> None:
-        lane_w = self.width // 4
-        lane_color = (*[c // 2 for c in self.color], 180)
+        if self.press_overlay is None:
+            self.prepare_draw()
+        lane_w = self.width // LANES
+        height = screen.get_height()
         glow_age = now - self.last_label_time
         glow_strength = max(0.0, 1.0 - glow_age / 0.4)
-        for lane in range(4):
+        overlay = self.press_overlay
+        for lane in range(LANES):
             x = self.x + lane * lane_w
-            pygame.draw.rect(screen, lane_color, (x + 4, 0, lane_w - 8, screen.get_height()), border_radius=8)
+            pygame.draw.rect(screen, self.lane_color, (x + 4, 0, lane_w - 8, height), border_radius=8)
             press_age = now - self.last_press.get(lane, -999)
             if press_age < 0.18:
                 alpha = int(160 * (1 - press_age / 0.18))
-                overlay = pygame.Surface((lane_w - 8, 26), pygame.SRCALPHA)
                 overlay.fill((*self.color, alpha))
                 screen.blit(overlay, (x + 4, hit_y - 10))
         base_bar_height = 6 + int(12 * glow_strength)
         pygame.draw.rect(screen, self.color, (self.x, hit_y, self.width, base_bar_height), border_radius=4)
-        for note in self.notes:
-            if note.hit or note.missed:
+        # 커서 앞은 전부 처리된 노트, 화면 위쪽 밖으로 나가는 노트부터는 볼 필요 없음 (시간순)
+        notes = self.notes
+        for idx in range(self.cursor, len(notes)):
+            note = notes[idx]
+            y = hit_y - (note.time - now) * speed
+            if y <= -80:
+                break
+            if note.hit or note.missed or y >= height + 40:
                 continue
-            y = note.y(now, hit_y, speed)
-            if -80 < y < screen.get_height() + 40:
-                lane_x = self.x + note.lane * lane_w + 6
-                pygame.draw.rect(screen, self.color, (lane_x, y, lane_w - 12, 24), border_radius=6)
+            pygame.draw.rect(screen, self.color, (self.x + note.lane * lane_w + 6, y, lane_w - 12, 24), border_radius=6)
 
     def _closest_pending_note(self, lane: int) -> Optional[Note]:
-        pending = [n for n in self.notes if n.lane == lane and not n.hit and not n.missed]
-        if not pending:
-            return None
-        return min(pending, key=lambda n: n.time)
+        # 레인 안에서는 항상 가장 이른 미처리 노트부터 처리되므로 커서만 전진하면 된다
+        lane_notes = self.lane_notes[lane]
+        idx = self.lane_cursor[lane]
+        while idx < len(lane_notes) and (lane_notes[idx].hit or lane_notes[idx].missed):
+            idx += 1
+        self.lane_cursor[lane] = idx
+        return lane_notes[idx] if idx < len(lane_notes) else None
 
     def finished(self) -> bool:
-        return all(n.hit or n.missed for n in self.notes)
+        notes = self.notes
+        while self.cursor < len(notes) and (notes[self.cursor].hit or notes[self.cursor].missed):
+            self.cursor += 1
+        return self.cursor >= len(notes)
+
+
+def _insert_by_time(notes: List[Note], note: Note, lo: int) -> int:
+    # 대부분 맨 뒤에 붙으므로 뒤에서부터 자리를 찾는다
+    idx = len(notes)
+    while idx > lo and notes[idx - 1].time > note.time:
+        idx -= 1
+    notes.insert(idx, note)
+    return idx
+
+
+def chart_hash(chart: Union["CompiledChart", Sequence[Tuple[int, float]]]) -> str:
+    """Content hash of a loaded (lane, time) chart; identifies the chart a replay was played on."""
+    if isinstance(chart, CompiledChart):
+        return chart.content_hash
+    digest = hashlib.sha1()
+    for lane, time in chart:
+        digest.update(struct.pack("<Bd", lane, time))
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class CompiledChart:
+    """A chart validated, deduplicated and sorted once; tracks, replays and caches share it.
+
+    Iterating yields (lane, time) pairs, so it reads like the plain chart lists it replaces.
+    """
+
+    lanes: Tuple[int, ...]
+    times: Tuple[float, ...]  # 오름차순
+    lane_index: Tuple[Tuple[int, ...], ...]  # 레인별 노트 번호 (시간순)
+    content_hash: str
+    merged: int = 0  # 합쳐진 중복 노트 수
+    dropped: int = 0  # 레인/시간이 잘못되어 버린 노트 수
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __iter__(self) -> Iterator[Tuple[int, float]]:
+        return zip(self.lanes, self.times)
+
+    @property
+    def end_time(self) -> float:
+        return self.times[-1] if self.times else 0.0
+
+
+def compile_chart(
+    chart: Sequence[Tuple[int, float]], offset: float = 0.0, min_time: Optional[float] = None, rate: float = 1.0
+) -> CompiledChart:
+    """Validate lanes and times, apply ``offset`` (clamped to ``min_time``), sort and merge duplicates.
+
+    ``rate`` < 1 stretches the times to match audio slowed down to that speed.
+
+    Notes on the same lane closer than DUPLICATE_GAP collapse into the first one. The sort
+    is stable on time only, so a chart without duplicates keeps the hash it always had.
+    """
+    notes: List[Tuple[float, int]] = []
+    dropped = 0
+    for entry in chart:
+        try:
+            lane, time = entry
+            lane_no = int(lane)
+            t = (float(time) + offset) / rate
+        except (TypeError, ValueError):
+            dropped += 1
+            continue
+        if lane_no != lane or not 0 <= lane_no < LANES or not math.isfinite(t):
+            dropped += 1
+            continue
+        if min_time is not None and t < min_time:
+            t = min_time
+        notes.append((t, lane_no))
+    notes.sort(key=lambda n: n[0])
+
+    lanes: List[int] = []
+    times: List[float] = []
+    lane_index: List[List[int]] = [[] for _ in range(LANES)]
+    last = [-math.inf] * LANES
+    merged = 0
+    for t, lane in notes:
+        if t - last[lane] < DUPLICATE_GAP:
+            merged += 1
+            continue
+        last[lane] = t
+        lane_index[lane].append(len(times))
+        lanes.append(lane)
+        times.append(t)
+    return CompiledChart(
+        lanes=tuple(lanes),
+        times=tuple(times),
+        lane_index=tuple(tuple(idx) for idx in lane_index),
+        content_hash=chart_hash(list(zip(lanes, times))),
+        merged=merged,
+        dropped=dropped,
+    )
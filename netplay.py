@@ -0,0 +1,290 @@
+import socket
+import statistics
+import struct
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional, Tuple
+
+# 메시지 종류 (첫 바이트)
+MSG_HELLO = 1
+MSG_PING = 2
+MSG_PONG = 3
+MSG_START = 4
+MSG_INPUT = 5
+MSG_QUIT = 6
+MSG_START_ACK = 7
+
+_HELLO = struct.Struct("<B")
+_PING = struct.Struct("<BId")  # type, seq, sender clock(ms)
+_PONG = struct.Struct("<BIdd")  # type, seq, echoed clock, responder clock
+_START = struct.Struct("<BHBdH")  # type, song index, mode index, host start tick(ms), match id
+_START_ACK = struct.Struct("<BH")  # type, match id
+_INPUT_HEADER = struct.Struct("<BHB")  # type, match id, count
+_INPUT = struct.Struct("<IBd")  # seq, lane, song time(s)
+
+INPUT_REDUNDANCY = 4  # 패킷 유실 대비: 매 전송마다 최근 입력을 같이 보낸다
+PING_INTERVAL = 0.25
+START_RESEND = 0.1  # 확인이 올 때까지 START 를 다시 보내는 간격 (초)
+START_RESENDS = 30  # 상대가 사라졌으면 약 3초 뒤에 포기한다
+OFFSET_WINDOW = 16
+MIN_INPUT_DELAY = 0.02
+MAX_INPUT_DELAY = 0.25
+
+
+def now_ms() -> float:
+    return time.perf_counter() * 1000.0
+
+
+@dataclass
+class ClockSample:
+    rtt: float  # ms
+    offset: float  # remote clock - local clock (ms)
+
+
+class ClockSync:
+    """NTP-style offset estimate: trust the sample with the smallest round trip."""
+
+    def __init__(self, window: int = OFFSET_WINDOW) -> None:
+        self.samples: Deque[ClockSample] = deque(maxlen=window)
+
+    def add(self, sent: float, remote: float, received: float) -> None:
+        rtt = received - sent
+        self.samples.append(ClockSample(rtt, remote - (sent + received) / 2.0))
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.samples)
+
+    @property
+    def offset(self) -> float:
+        if not self.samples:
+            return 0.0
+        return min(self.samples, key=lambda s: s.rtt).offset
+
+    @property
+    def rtt(self) -> float:
+        return min((s.rtt for s in self.samples), default=0.0)
+
+    @property
+    def jitter(self) -> float:
+        if len(self.samples) < 2:
+            return 0.0
+        return statistics.pstdev(s.rtt for s in self.samples)
+
+    def input_delay(self) -> float:
+        """Seconds the remote track lags behind local time so its inputs arrive before the miss sweep."""
+        delay = (self.rtt / 2.0 + 2.0 * self.jitter) / 1000.0 + 0.01
+        return max(MIN_INPUT_DELAY, min(MAX_INPUT_DELAY, delay))
+
+
+class NetSession:
+    """UDP link to the other player's client.
+
+    A daemon thread receives packets and answers pings the moment they arrive, so clock
+    sync isn't skewed by the frame rate; the game thread only drains queues and sends.
+    Each song start carries a match id that tags every input, so inputs still in flight
+    from the previous song are dropped. Send-side state is only touched by the game thread.
+    """
+
+    def __init__(self, player_idx: int, bind: Tuple[str, int], peer: Optional[Tuple[str, int]] = None) -> None:
+        self.player_idx = player_idx  # 0 = host(왼쪽), 1 = guest(오른쪽)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(bind)
+        self.sock.settimeout(START_RESEND)
+        self.peer = peer
+        self.clock = ClockSync()
+        self.connected = False
+        self.closed_by_peer = False
+        self.next_ping = 0.0
+        self.ping_seq = 0
+        # 게임 스레드 전용: 현재 곡의 match id 와 보낸 입력
+        self.match_id = 0
+        self.input_seq = 0
+        self.sent_inputs: Deque[Tuple[int, int, float]] = deque(maxlen=INPUT_REDUNDANCY)
+        # 수신 스레드 전용: 상대 입력 순번은 match id 가 바뀌면 다시 센다
+        self.remote_match = 0
+        self.last_remote_seq = 0
+        # 스레드 사이는 deque 로만 넘긴다 (append/popleft 는 스레드 안전)
+        self.remote_inputs: Deque[Tuple[int, int, float]] = deque()  # (match id, lane, song time)
+        self.start_requests: Deque[Tuple[int, int, float, int]] = deque()
+        self.last_start_match = 0  # 수신 스레드 전용: 다시 온 START 는 한 번만 처리한다
+        # 호스트: 확인되지 않은 START (match id, 패킷, 남은 재전송 횟수, 다음 전송 시각 ms)
+        self.start_lock = threading.Lock()
+        self.pending_start: Optional[Tuple[int, bytes, int, float]] = None
+        self.running = True
+        if peer is not None:
+            self._send(_HELLO.pack(MSG_HELLO))
+        self.thread = threading.Thread(target=self._recv_loop, name="netplay-recv", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def host(cls, port: int, address: str = "0.0.0.0") -> "NetSession":
+        return cls(0, (address, port))
+
+    @classmethod
+    def join(cls, host: str, port: int, local_port: int = 0) -> "NetSession":
+        return cls(1, ("0.0.0.0", local_port), (host, port))
+
+    @property
+    def local_port(self) -> int:
+        return self.sock.getsockname()[1]
+
+    @property
+    def input_delay(self) -> float:
+        return self.clock.input_delay()
+
+    def _send(self, data: bytes) -> None:
+        if self.peer is None:
+            return
+        try:
+            self.sock.sendto(data, self.peer)
+        except (BlockingIOError, InterruptedError, socket.timeout):
+            pass  # 보내기 버퍼가 찼으면 버린다 (다음 패킷에 중복 전송됨)
+        except OSError as exc:
+            if self.running:
+                print(f"[warn] net send failed: {exc}")
+
+    # ---- 송신 ----
+    def send_input(self, lane: int, song_time: float) -> None:
+        self.input_seq += 1
+        self.sent_inputs.append((self.input_seq, lane, song_time))
+        parts = [_INPUT_HEADER.pack(MSG_INPUT, self.match_id, len(self.sent_inputs))]
+        parts.extend(_INPUT.pack(*entry) for entry in self.sent_inputs)
+        self._send(b"".join(parts))
+
+    def send_start(self, song_idx: int, mode_idx: int, start_tick: float) -> None:
+        """``start_tick`` is the song start on the *local* clock; the guest converts it."""
+        self._begin_match((self.match_id + 1) & 0xFFFF)
+        packet = _START.pack(MSG_START, song_idx, mode_idx, start_tick, self.match_id)
+        with self.start_lock:
+            # 수신 스레드가 확인(또는 그 곡의 입력)이 올 때까지 다시 보낸다
+            self.pending_start = (self.match_id, packet, START_RESENDS, now_ms() + START_RESEND * 1000.0)
+        self._send(packet)
+
+    def _begin_match(self, match_id: int) -> None:
+        self.match_id = match_id
+        self.sent_inputs.clear()
+        self.input_seq = 0
+
+    def send_quit(self) -> None:
+        self._send(bytes([MSG_QUIT]))
+
+    def close(self) -> None:
+        self.send_quit()
+        self.running = False
+        self.thread.join(timeout=PING_INTERVAL * 2)
+        self.sock.close()
+
+    # ---- 수신 (백그라운드 스레드) ----
+    def _recv_loop(self) -> None:
+        while self.running:
+            now = now_ms()
+            if self.peer is not None and now >= self.next_ping:
+                self.ping_seq += 1
+                self._send(_PING.pack(MSG_PING, self.ping_seq, now))
+                self.next_ping = now + PING_INTERVAL * 1000.0
+            self._resend_start(now)
+            try:
+                data, addr = self.sock.recvfrom(2048)
+            except (socket.timeout, BlockingIOError, InterruptedError):
+                continue
+            except OSError:
+                if self.running:
+                    continue
+                return
+            if not data:
+                continue
+            if self.peer is None:
+                self.peer = addr  # 호스트는 첫 패킷을 보낸 쪽을 상대로 삼는다
+            if addr != self.peer:
+                continue
+            self.connected = True
+            self._dispatch(data)
+
+    def _resend_start(self, now: float) -> None:
+        with self.start_lock:
+            pending = self.pending_start
+            if pending is None or now < pending[3]:
+                return
+            match, packet, left, _ = pending
+            self.pending_start = (match, packet, left - 1, now + START_RESEND * 1000.0) if left > 1 else None
+        self._send(packet)
+
+    def _start_confirmed(self, match: int) -> None:
+        with self.start_lock:
+            if self.pending_start is not None and self.pending_start[0] == match:
+                self.pending_start = None
+
+    def _dispatch(self, data: bytes) -> None:
+        kind = data[0]
+        try:
+            if kind == MSG_PING:
+                _, seq, sent = _PING.unpack_from(data)
+                self._send(_PONG.pack(MSG_PONG, seq, sent, now_ms()))
+            elif kind == MSG_PONG:
+                _, _, sent, remote = _PONG.unpack_from(data)
+                self.clock.add(sent, remote, now_ms())
+            elif kind == MSG_INPUT:
+                _, match, count = _INPUT_HEADER.unpack_from(data)
+                newer = (match - self.remote_match) & 0xFFFF
+                if newer >= 0x8000:
+                    return  # 늦게 도착한 이전 곡의 입력
+                if newer:
+                    self.remote_match = match  # 새 곡의 첫 입력: 순번을 처음부터 센다
+                    self.last_remote_seq = 0
+                    self._start_confirmed(match)  # 그 곡의 입력이 왔으면 START 도 받은 것
+                for i in range(count):
+                    seq, lane, song_time = _INPUT.unpack_from(data, _INPUT_HEADER.size + i * _INPUT.size)
+                    if seq > self.last_remote_seq:
+                        self.remote_inputs.append((match, lane, song_time))
+                        self.last_remote_seq = seq
+            elif kind == MSG_START:
+                _, song_idx, mode_idx, start_tick, match = _START.unpack_from(data)
+                self._send(_START_ACK.pack(MSG_START_ACK, match))  # 다시 온 START 에도 확인을 보낸다
+                if 0 < (match - self.last_start_match) & 0xFFFF < 0x8000:
+                    self.last_start_match = match
+                    self.start_requests.append((song_idx, mode_idx, start_tick - self.clock.offset, match))
+            elif kind == MSG_START_ACK:
+                _, match = _START_ACK.unpack_from(data)
+                self._start_confirmed(match)
+            elif kind == MSG_QUIT:
+                self.closed_by_peer = True
+        except struct.error:
+            print("[warn] malformed net packet dropped")
+
+    def take_inputs(self) -> List[Tuple[int, float]]:
+        """Remote (lane, song time) inputs of the current match; older ones are dropped."""
+        inputs: List[Tuple[int, float]] = []
+        while self.remote_inputs:
+            match, lane, song_time = self.remote_inputs.popleft()
+            if match == self.match_id:
+                inputs.append((lane, song_time))
+        return inputs
+
+    @property
+    def start_pending(self) -> bool:
+        return bool(self.start_requests)
+
+    def take_start(self) -> Optional[Tuple[int, int, float]]:
+        """(song index, mode index, start time on the local perf clock in ms) once the host starts a song.
+
+        Taking it switches this side to the new match (called on the game thread).
+        """
+        request = None
+        while self.start_requests:
+            request = self.start_requests.popleft()
+        if request is None:
+            return None
+        song_idx, mode_idx, start_tick, match = request
+        self._begin_match(match)
+        return song_idx, mode_idx, start_tick
+
+
+def loopback_pair(port: int = 0) -> Tuple[NetSession, NetSession]:
+    """Host and guest connected over 127.0.0.1, for testing without a second machine."""
+    host = NetSession.host(port, "127.0.0.1")
+    guest = NetSession.join("127.0.0.1", host.local_port)
+    return host, guest
@@ -0,0 +1,127 @@
+import gc
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+GC_SAFETY_OBJECTS = 50_000  # GC 를 꺼둔 동안 추적 객체가 이만큼 늘면 프레임 사이에 young 세대만 수거
+
+
+@dataclass
+class PlayAllocReport:
+    """Allocation counters of one song."""
+
+    song: str
+    frames: int
+    seconds: float
+    tracked_growth: int  # GC 추적 객체(컨테이너) 할당 - 해제: 이 값이 쌓여야 GC 가 돈다
+    block_growth: int  # sys.getallocatedblocks() 증가분
+    collections: Tuple[int, int, int]  # 세대별 GC 실행 횟수
+    gc_ms: float
+    forced: int  # 안전장치로 돌린 young GC 횟수
+    worst_frame_ms: float
+
+    def per_frame(self, value: float) -> float:
+        return value / self.frames if self.frames else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"[perf] {self.song}: {self.frames} frames in {self.seconds:.1f}s, "
+            f"tracked objects {self.tracked_growth:+d} ({self.per_frame(self.tracked_growth):+.2f}/frame), "
+            f"blocks {self.block_growth:+d} ({self.per_frame(self.block_growth):+.2f}/frame), "
+            f"gc {'/'.join(str(c) for c in self.collections)} ({self.gc_ms:.1f}ms, {self.forced} forced), "
+            f"worst frame {self.worst_frame_ms:.1f}ms"
+        )
+
+
+class PlayPerf:
+    """Performance play mode: cyclic GC held off while a song plays, with allocation counters.
+
+    ``start`` collects once and ``gc.freeze``s everything alive (charts, caches, surfaces)
+    so later collections never walk it, then disables the collector when ``enabled``.
+    ``frame`` is called once per rendered frame; ``stop`` restores the collector and
+    returns the song's counters. The counters are also kept with GC left on.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.active = False
+        self.last_report: Optional[PlayAllocReport] = None
+        self._song = ""
+        self._was_enabled = True
+        self._collections: List[int] = [0, 0, 0]
+        self._gc_started = 0.0
+        self._gc_time = 0.0
+        self._tracked = 0
+        self._base = 0
+        self._blocks = 0
+        self._forced = 0
+        self._frames = 0
+        self._started = 0.0
+        self._last_frame = 0.0
+        self._worst = 0.0
+
+    def start(self, song: str) -> None:
+        if self.active:
+            self.stop()
+        gc.collect()
+        gc.freeze()
+        self._was_enabled = gc.isenabled()
+        if self.enabled:
+            gc.disable()
+        self._song = song
+        self._collections = [0, 0, 0]
+        self._gc_time = 0.0
+        self._tracked = 0
+        self._forced = 0
+        self._frames = 0
+        self._worst = 0.0
+        gc.callbacks.append(self._on_gc)
+        self._base = gc.get_count()[0]
+        self._blocks = sys.getallocatedblocks()
+        self._started = self._last_frame = time.perf_counter()
+        self.active = True
+
+    def frame(self) -> None:
+        if not self.active:
+            return
+        now = time.perf_counter()
+        self._frames += 1
+        self._worst = max(self._worst, now - self._last_frame)
+        self._last_frame = now
+        if self.enabled and gc.get_count()[0] > GC_SAFETY_OBJECTS:
+            self._forced += 1
+            gc.collect(0)
+
+    def stop(self) -> Optional[PlayAllocReport]:
+        if not self.active:
+            return None
+        self.active = False
+        tracked = self._tracked + gc.get_count()[0] - self._base
+        blocks = sys.getallocatedblocks() - self._blocks
+        gc.callbacks.remove(self._on_gc)
+        if self._was_enabled:
+            gc.enable()
+        gc.unfreeze()
+        self.last_report = PlayAllocReport(
+            song=self._song,
+            frames=self._frames,
+            seconds=time.perf_counter() - self._started,
+            tracked_growth=tracked,
+            block_growth=blocks,
+            collections=(self._collections[0], self._collections[1], self._collections[2]),
+            gc_ms=self._gc_time * 1000.0,
+            forced=self._forced,
+            worst_frame_ms=self._worst * 1000.0,
+        )
+        return self.last_report
+
+    def _on_gc(self, phase: str, info: Dict[str, int]) -> None:
+        if phase == "start":
+            # 수거가 young 카운터를 0 으로 되돌리므로 그 전까지의 증가분을 모아 둔다
+            self._tracked += gc.get_count()[0] - self._base
+            self._base = 0
+            self._gc_started = time.perf_counter()
+        else:
+            self._collections[info["generation"]] += 1
+            self._gc_time += time.perf_counter() - self._gc_started
@@ -0,0 +1,276 @@
+import os
+import struct
+import sys
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from models import CompiledChart, Track, chart_hash
+from rules import DEFAULT_RULES, JudgeRules, load_rules
+
+REPLAY_MAGIC = b"RHRP"
+REPLAY_VERSION = 1
+REPLAY_DIR = "replays"
+
+# 이벤트 코드 1바이트: kind(1bit) | player(1bit) | lane(2bit)
+EVENT_PRESS = 0
+EVENT_SWEEP = 1  # update_misses 가 실제로 노트를 놓친 시점 (판정을 그대로 재현하기 위함)
+
+_HEADER = struct.Struct("<4sBH")
+_TAIL = struct.Struct("<20sI")
+
+JudgeCallback = Callable[[int, str, int, float], None]
+
+
+def encode_event(kind: int, player: int, lane: int) -> int:
+    return (kind << 3) | (player << 2) | lane
+
+
+def decode_event(code: int) -> Tuple[int, int, int]:
+    return code >> 3, (code >> 2) & 1, code & 3
+
+
+@dataclass
+class Replay:
+    song_id: str
+    chart_hash: str
+    mode: str = "sudden"
+    times: array = field(default_factory=lambda: array("d"))
+    codes: array = field(default_factory=lambda: array("B"))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def events(self) -> Iterator[Tuple[int, int, int, float]]:
+        """Yield (kind, player, lane, time) in recorded order."""
+        for code, t in zip(self.codes, self.times):
+            yield code >> 3, (code >> 2) & 1, code & 3, t
+
+    def to_bytes(self) -> bytes:
+        song = self.song_id.encode("utf-8")
+        mode = self.mode.encode("utf-8")
+        times = array("d", self.times)
+        if sys.byteorder == "big":
+            times.byteswap()
+        return b"".join(
+            (
+                _HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, len(song)),
+                song,
+                bytes([len(mode)]),
+                mode,
+                _TAIL.pack(bytes.fromhex(self.chart_hash), len(self.codes)),
+                times.tobytes(),
+                self.codes.tobytes(),
+            )
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Replay":
+        magic, version, song_len = _HEADER.unpack_from(data, 0)
+        if magic != REPLAY_MAGIC:
+            raise ValueError("not a replay file")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        pos = _HEADER.size
+        song_id = data[pos : pos + song_len].decode("utf-8")
+        pos += song_len
+        mode_len = data[pos]
+        pos += 1
+        mode = data[pos : pos + mode_len].decode("utf-8")
+        pos += mode_len
+        digest, count = _TAIL.unpack_from(data, pos)
+        pos += _TAIL.size
+        times = array("d")
+        times.frombytes(data[pos : pos + count * 8])
+        if sys.byteorder == "big":
+            times.byteswap()
+        pos += count * 8
+        codes = array("B")
+        codes.frombytes(data[pos : pos + count])
+        if len(times) != count or len(codes) != count:
+            raise ValueError("truncated replay file")
+        return cls(song_id, digest.hex(), mode, times, codes)
+
+    def save(self, path: str) -> None:
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, "wb") as fh:
+            fh.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "Replay":
+        with open(path, "rb") as fh:
+            return cls.from_bytes(fh.read())
+
+
+class ReplayRecorder:
+    """Collects lane presses and miss sweeps while a song is played."""
+
+    def __init__(self) -> None:
+        self.replay: Optional[Replay] = None
+
+    def start(self, song_id: str, chart: CompiledChart, mode: str) -> None:
+        self.replay = Replay(song_id, chart_hash(chart), mode)
+
+    def press(self, player: int, lane: int, now: float) -> None:
+        if self.replay is not None:
+            self.replay.times.append(now)
+            self.replay.codes.append(encode_event(EVENT_PRESS, player, lane))
+
+    def sweep(self, player: int, now: float) -> None:
+        if self.replay is not None:
+            self.replay.times.append(now)
+            self.replay.codes.append(encode_event(EVENT_SWEEP, player, 0))
+
+    def finish(self) -> Optional[Replay]:
+        replay, self.replay = self.replay, None
+        return replay
+
+
+def replay_path(song_id: str, folder: str = REPLAY_DIR) -> str:
+    safe = "".join(c if c.isalnum() else "_" for c in song_id).strip("_") or "song"
+    return os.path.join(folder, f"{safe}_{time.strftime('%Y%m%d-%H%M%S')}.rhr")
+
+
+def latest_replay(song_id: str, folder: str = REPLAY_DIR) -> Optional[str]:
+    safe = "".join(c if c.isalnum() else "_" for c in song_id).strip("_") or "song"
+    if not os.path.isdir(folder):
+        return None
+    names = sorted(n for n in os.listdir(folder) if n.startswith(safe + "_") and n.endswith(".rhr"))
+    return os.path.join(folder, names[-1]) if names else None
+
+
+class ReplayPlayer:
+    """Feeds recorded events back through ``Track`` judging, up to a given song time."""
+
+    def __init__(self, replay: Replay) -> None:
+        self.replay = replay
+        self.pos = 0
+
+    def reset(self) -> None:
+        self.pos = 0
+
+    def done(self) -> bool:
+        return self.pos >= len(self.replay)
+
+    def next_time(self) -> Optional[float]:
+        return None if self.done() else self.replay.times[self.pos]
+
+    def feed(self, tracks: Sequence[Track], until: float, on_judge: JudgeCallback) -> int:
+        """Apply every event with time <= ``until``. ``on_judge(player, label, repeat, time)`` applies HP."""
+        times = self.replay.times
+        codes = self.replay.codes
+        count = len(codes)
+        pos = self.pos
+        while pos < count and times[pos] <= until:
+            code = codes[pos]
+            t = times[pos]
+            pos += 1
+            player = (code >> 2) & 1
+            track = tracks[player]
+            if code >> 3 == EVENT_PRESS:
+                label = track.handle_lane(code & 3, t)
+                if label:
+                    on_judge(player, label, 1, t)
+            else:
+                missed = track.update_misses(t)
+                if missed and not track.is_down:
+                    on_judge(player, "Miss", missed, t)
+        fed = pos - self.pos
+        self.pos = pos
+        return fed
+
+
+@dataclass
+class ReplayResult:
+    scores: Tuple[int, int]
+    health: Tuple[float, float]
+    ko_time: Optional[float]
+    winner: Optional[int]  # None = draw
+
+
+def _winner(tracks: Sequence[Track]) -> Optional[int]:
+    # 게임 오버 화면과 같은 규칙: 체력 우선, 동률이면 점수
+    p1, p2 = tracks
+    if p1.health == p2.health:
+        if p1.score == p2.score:
+            return None
+        return 0 if p1.score > p2.score else 1
+    return 0 if p1.health > p2.health else 1
+
+
+def rescore(
+    replay: Replay,
+    chart: CompiledChart,
+    mode: Optional[str] = None,
+    rules: Optional[JudgeRules] = None,
+) -> ReplayResult:
+    """Headless re-score: run the replay through fresh tracks as fast as possible."""
+    mode = mode or replay.mode
+    rules = rules or DEFAULT_RULES
+    tracks = (Track("Player 1", 0, 0, {}, (0, 0, 0)), Track("Player 2", 0, 0, {}, (0, 0, 0)))
+    for track in tracks:
+        track.set_rules(rules)
+        track.load_chart(chart)
+
+    def on_judge(player: int, label: str, repeat: int, _t: float) -> None:
+        rules.apply_health(tracks[player], tracks[1 - player], label, repeat)
+
+    player = ReplayPlayer(replay)
+    ko_time: Optional[float] = None
+    while not player.done():
+        # 같은 시각의 이벤트는 한 프레임에서 처리된 것이므로 묶어서 적용한 뒤 KO를 확인한다
+        now = player.next_time()
+        player.feed(tracks, now, on_judge)
+        if mode == "sudden" and any(t.is_down for t in tracks):
+            ko_time = now
+            break
+
+    if ko_time is not None:
+        down = [t.is_down for t in tracks]
+        winner = None if all(down) else down.index(False)
+    else:
+        winner = _winner(tracks)
+    return ReplayResult(
+        scores=(tracks[0].score, tracks[1].score),
+        health=(tracks[0].health, tracks[1].health),
+        ko_time=ko_time,
+        winner=winner,
+    )
+
+
+def main(argv: List[str]) -> int:
+    from game import song_chart
+    from library import SongLibrary
+
+    if not argv:
+        print("usage: python replay.py REPLAY.rhr [...]")
+        return 2
+    library = SongLibrary.open()
+    mode_rules = load_rules()
+    start = time.perf_counter()
+    for path in argv:
+        replay = Replay.load(path)
+        song = library.by_name(replay.song_id)
+        if song is None:
+            print(f"[warn] {path}: unknown song '{replay.song_id}'")
+            continue
+        chart = song_chart(song)
+        if chart_hash(chart) != replay.chart_hash:
+            print(f"[warn] {path}: chart changed since recording, result may differ")
+        result = rescore(replay, chart, rules=mode_rules.get(replay.mode))
+        ko = f"KO at {result.ko_time:.2f}s" if result.ko_time is not None else "full song"
+        winner = "Draw" if result.winner is None else f"Player {result.winner + 1}"
+        print(
+            f"{path}: {replay.song_id} [{replay.mode}] P1 {result.scores[0]} / HP {int(result.health[0])}"
+            f" | P2 {result.scores[1]} / HP {int(result.health[1])} | {ko} | winner {winner}"
+        )
+    elapsed = time.perf_counter() - start
+    print(f"re-scored {len(argv)} replay(s) in {elapsed:.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,187 @@
+"""Match history in a local SQLite database, written by a background thread.
+
+``record`` only queues the result; the writer thread groups whatever arrives within
+BATCH_WINDOW into one transaction. Reads (per-song best, leaderboard) use indexed
+queries on the caller's connection and are cached until the next batch is committed.
+"""
+import json
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+RESULTS_PATH = "results.db"
+BATCH_WINDOW = 0.5  # 첫 결과가 들어온 뒤 이만큼 더 모아서 한 번에 쓴다 (초)
+BATCH_MAX = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    played_at REAL NOT NULL,
+    song TEXT NOT NULL,
+    chart_hash TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    ko_time REAL,
+    winner INTEGER
+);
+CREATE TABLE IF NOT EXISTS players (
+    match_id INTEGER NOT NULL REFERENCES matches(id),
+    player INTEGER NOT NULL,
+    song TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    health REAL NOT NULL,
+    judgements TEXT NOT NULL,
+    PRIMARY KEY (match_id, player)
+);
+CREATE INDEX IF NOT EXISTS matches_song ON matches(song, played_at);
+CREATE INDEX IF NOT EXISTS players_song_score ON players(song, score DESC);
+CREATE INDEX IF NOT EXISTS players_score ON players(score DESC);
+"""
+
+
+@dataclass
+class PlayerResult:
+    score: int
+    health: float
+    judgements: Dict[str, int] = field(default_factory=dict)  # 라벨별 횟수 (Perfect/…/Miss)
+
+
+@dataclass
+class MatchResult:
+    song: str
+    chart_hash: str
+    mode: str
+    players: Tuple[PlayerResult, ...]
+    ko_time: Optional[float] = None  # 곡 시간 (끝까지 쳤으면 None)
+    winner: Optional[int] = None  # 플레이어 번호 (무승부 None)
+    played_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class ScoreEntry:
+    song: str
+    mode: str
+    player: int
+    score: int
+    played_at: float
+
+
+class ResultStore:
+    """Append-only match history; ``record`` never blocks on the database."""
+
+    def __init__(self, path: str = RESULTS_PATH) -> None:
+        self.path = path
+        self.version = 0  # 배치를 커밋할 때마다 증가 (읽기 캐시 무효화)
+        self._queue: "queue.Queue[Optional[MatchResult]]" = queue.Queue()
+        self._best: Dict[str, Optional[ScoreEntry]] = {}
+        self._top: Dict[int, List[ScoreEntry]] = {}
+        self._cache_version = 0
+        self._reader: Optional[sqlite3.Connection] = None
+        self._writer: Optional[threading.Thread] = None
+        try:
+            conn = sqlite3.connect(path)
+            conn.execute("PRAGMA journal_mode=WAL")  # 쓰는 동안에도 메뉴의 읽기가 막히지 않게
+            conn.executescript(SCHEMA)
+            conn.close()
+            self._reader = sqlite3.connect(path)
+        except sqlite3.Error as exc:
+            print(f"[warn] match history disabled, cannot open {path}: {exc}")
+            return
+        self._writer = threading.Thread(target=self._run, name="results-writer", daemon=True)
+        self._writer.start()
+
+    @property
+    def enabled(self) -> bool:
+        return self._writer is not None
+
+    # ---- writing (background thread) ----
+    def record(self, result: MatchResult) -> None:
+        if self.enabled:
+            self._queue.put(result)
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Flush queued results and stop the writer."""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join(timeout)
+            self._writer = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def _run(self) -> None:
+        conn = sqlite3.connect(self.path)
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + BATCH_WINDOW
+            while batch[-1] is not None and len(batch) < BATCH_MAX:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            results = [r for r in batch if r is not None]
+            if results:
+                try:
+                    self._write(conn, results)
+                    self.version += 1
+                except sqlite3.Error as exc:
+                    print(f"[warn] match history write failed ({len(results)} result(s)): {exc}")
+            if batch[-1] is None:
+                conn.close()
+                return
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, results: List[MatchResult]) -> None:
+        with conn:
+            for r in results:
+                cur = conn.execute(
+                    "INSERT INTO matches (played_at, song, chart_hash, mode, ko_time, winner) VALUES (?, ?, ?, ?, ?, ?)",
+                    (r.played_at, r.song, r.chart_hash, r.mode, r.ko_time, r.winner),
+                )
+                conn.executemany(
+                    "INSERT INTO players (match_id, player, song, mode, score, health, judgements)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (cur.lastrowid, i, r.song, r.mode, p.score, p.health, json.dumps(p.judgements))
+                        for i, p in enumerate(r.players)
+                    ],
+                )
+
+    # ---- reading (caller's thread, cached) ----
+    def _fresh(self) -> None:
+        if self._cache_version != self.version:
+            self._cache_version = self.version
+            self._best.clear()
+            self._top.clear()
+
+    def best(self, song: str) -> Optional[ScoreEntry]:
+        """Highest single-player score recorded on ``song``."""
+        if self._reader is None:
+            return None
+        self._fresh()
+        if song not in self._best:
+            row = self._reader.execute(
+                "SELECT p.song, p.mode, p.player, p.score, m.played_at FROM players p JOIN matches m ON m.id = p.match_id"
+                " WHERE p.song = ? ORDER BY p.score DESC LIMIT 1",
+                (song,),
+            ).fetchone()
+            self._best[song] = ScoreEntry(*row) if row else None
+        return self._best[song]
+
+    def leaderboard(self, limit: int = 5) -> List[ScoreEntry]:
+        """Top single-player scores over all songs."""
+        if self._reader is None:
+            return []
+        self._fresh()
+        top = self._top.get(limit)
+        if top is None:
+            rows = self._reader.execute(
+                "SELECT p.song, p.mode, p.player, p.score, m.played_at FROM players p JOIN matches m ON m.id = p.match_id"
+                " ORDER BY p.score DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+            top = self._top[limit] = [ScoreEntry(*row) for row in rows]
+        return top
@@ -0,0 +1,124 @@
+import json
+import os
+from bisect import bisect_left
+from dataclasses import asdict, dataclass, field, replace
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Optional, Tuple
+
+if TYPE_CHECKING:
+    from models import Track
+
+RULES_PATH = "rules.json"
+SIM_HZ = 1000  # 미스 판정/HP/KO 시뮬레이션의 고정 스텝 (렌더링 프레임과 무관)
+
+
+@dataclass(frozen=True)
+class JudgeRules:
+    """Judgement windows and HP effects for one game mode, precompiled for the hot path."""
+
+    name: str = "default"
+    windows: Tuple[float, ...] = (0.08, 0.16, 0.24, 0.32)
+    labels: Tuple[str, ...] = ("Perfect", "Great", "Good", "Bad")
+    points: Tuple[int, ...] = (1000, 700, 400, 100)
+    keep_combo: Tuple[bool, ...] = (True, True, True, False)
+    early_bad: float = 0.35  # 판정창 밖이어도 이만큼 일찍 누르면 Bad
+    early_bad_points: int = 100
+    drop_after: float = 0.3
+    # 라벨별 HP 변화 (+회복 / -피해)
+    health: Tuple[Tuple[str, float], ...] = (
+        ("Perfect", 1.5),
+        ("Great", 1.0),
+        ("Good", 0.6),
+        ("Bad", -2.0),
+        ("Miss", -5.0),
+    )
+    combo_every: int = 5
+    combo_attack: float = 4.0
+    combo_heal: float = 3.0
+    combo_bonus_step: int = 8
+    combo_bonus_cap: int = 400
+    max_health: float = 100.0
+    _health: Dict[str, float] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _combo_labels: FrozenSet[str] = field(default=frozenset(), init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if not (len(self.windows) == len(self.labels) == len(self.points) == len(self.keep_combo)):
+            raise ValueError("windows, labels, points and keep_combo must have the same length")
+        order = sorted(range(len(self.windows)), key=lambda i: self.windows[i])
+        for name in ("windows", "labels", "points", "keep_combo"):
+            values = getattr(self, name)
+            object.__setattr__(self, name, tuple(values[i] for i in order))
+        object.__setattr__(self, "health", tuple((label, float(v)) for label, v in self.health))
+        object.__setattr__(self, "_health", dict(self.health))
+        object.__setattr__(self, "_combo_labels", frozenset(l for l, keep in zip(self.labels, self.keep_combo) if keep))
+
+    # ---- 판정 ----
+    def judge(self, delta: float) -> int:
+        """Index of the window ``|delta|`` falls in; ``len(windows)`` when outside all of them."""
+        return bisect_left(self.windows, delta)
+
+    def combo_bonus(self, combo: int) -> int:
+        return min(combo * self.combo_bonus_step, self.combo_bonus_cap)
+
+    def health_delta(self, label: str) -> float:
+        return self._health.get(label, 0.0)
+
+    # ---- HP ----
+    def apply_health(self, actor: "Track", victim: "Track", label: str, repeat: int = 1) -> bool:
+        """Apply HP effects of ``repeat`` identical judgements at once. True when a combo attack landed."""
+        if actor.is_down:
+            return False
+        amount = self._health.get(label, 0.0)
+        # heal/damage 는 클램프만 하므로 repeat 번 반복한 결과와 한 번에 곱한 결과가 같다
+        if amount > 0:
+            actor.heal(amount * repeat)
+        elif amount < 0:
+            actor.damage(-amount * repeat)
+
+        # 콤보에 따른 상대 체력 감소/내 체력 회복
+        if label in self._combo_labels and actor.combo > 0 and actor.combo % self.combo_every == 0:
+            victim.damage(self.combo_attack)
+            actor.heal(self.combo_heal)
+            return True
+        return False
+
+    # ---- 설정 ----
+    def with_health(self, **changes: float) -> "JudgeRules":
+        health = dict(self.health)
+        health.update(changes)
+        return replace(self, health=tuple(health.items()))
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("_health", None)
+        data.pop("_combo_labels", None)
+        data["health"] = dict(self.health)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], base: Optional["JudgeRules"] = None) -> "JudgeRules":
+        base = base or DEFAULT_RULES
+        data = dict(data)
+        if "health" in data:
+            health = dict(base.health)
+            health.update(data["health"])
+            data["health"] = tuple(health.items())
+        for key in ("windows", "labels", "points", "keep_combo"):
+            if key in data:
+                data[key] = tuple(data[key])
+        return replace(base, **data)
+
+
+DEFAULT_RULES = JudgeRules()
+
+
+def load_rules(path: str = RULES_PATH) -> Dict[str, JudgeRules]:
+    """Per game-mode rules from a JSON file: ``{"sudden": {...overrides}, ...}``."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as fh:
+            raw = json.load(fh)
+        return {mode: JudgeRules.from_dict({"name": mode, **cfg}) for mode, cfg in raw.items()}
+    except (OSError, ValueError, TypeError) as exc:
+        print(f"[warn] rules load failed for {path}: {exc}")
+        return {}
@@ -0,0 +1,480 @@
+from typing import List
+
+from models import Song
+
+
+def load_song_list() -> List[Song]:
+    return [
+        Song(
+            "Beethoven Virus",
+            "songs/Beethoven Virus.mp3",
+            bpm=162,
+            offset=-0.5,
+            difficulty=7.0,
+            chart = [
+            (1, 8.000), (2, 8.185), (3, 8.370), (1, 8.555),
+            (0, 8.740), (1, 8.925), (2, 9.110), (3, 9.295),
+
+            (1, 9.480), (3, 9.750), (2, 9.935), (0, 10.120),
+            (1, 10.305), (2, 10.490), (3, 10.675), (1, 10.860),
+
+            # 16분 3연타 패턴
+            (2, 11.045), (2, 11.138), (2, 11.230),
+
+            (0, 11.415), (1, 11.600), (3, 11.785), (2, 11.970),
+            (1, 12.155), (0, 12.340), (2, 12.525), (3, 12.710),
+
+            # 좌우 대칭 점프 패턴
+            (0, 12.895), (3, 12.895),
+            (1, 13.080), (2, 13.080),
+            (0, 13.265), (3, 13.265),
+
+            (1, 13.450), (2, 13.635), (3, 13.820), (1, 14.005),
+            (0, 14.190), (1, 14.375), (2, 14.560), (3, 14.745),
+
+            # 16분 계단
+            (0, 14.930), (1, 15.015), (2, 15.100), (3, 15.185),
+
+            (2, 15.370), (1, 15.555), (0, 15.740), (3, 15.925),
+            (1, 16.110), (2, 16.295), (3, 16.480), (1, 16.665),
+
+            # 중간 하이라이트 계단+점프
+            (0, 16.850), (3, 16.850),
+            (1, 17.035), (2, 17.220),
+            (0, 17.405), (3, 17.590),
+
+            (1, 17.775), (2, 17.960), (3, 18.145), (1, 18.330),
+            (0, 18.515), (1, 18.700), (2, 18.885), (3, 19.070),
+
+            # 32분 같은 빠른 5연타 느낌 반영
+            (1, 19.255), (1, 19.332), (1, 19.410), (1, 19.488), (1, 19.565),
+
+            (3, 19.750), (2, 19.935), (1, 20.120), (0, 20.305),
+            (1, 20.490), (3, 20.675), (2, 20.860), (1, 21.045),
+
+            # 패턴 밀도 증가
+            (0, 21.230), (1, 21.322), (2, 21.415), (3, 21.508),
+            (1, 21.600), (2, 21.692), (3, 21.785), (0, 21.878),
+
+            (1, 21.970), (2, 22.155), (3, 22.340), (1, 22.525),
+            (0, 22.710), (2, 22.895), (3, 23.080), (1, 23.265),
+
+            # 변주 계단
+            (0, 23.450), (1, 23.635), (2, 23.820), (3, 24.005),
+            (1, 24.190), (0, 24.375), (2, 24.560), (3, 24.745),
+
+            # A파트 끝부 16분 4타로 마무리
+            (1, 24.930), (1, 25.015), (1, 25.100), (1, 25.185),
+
+            # 마무리 직전 계단
+            (2, 25.370), (3, 25.555), (1, 25.740), (0, 25.925),
+            (1, 26.110), (2, 26.295), (3, 26.480), (1, 26.665),
+
+            # 26.8~32.0 구간 연속 패턴 (밀도 높게)
+            (0, 26.850), (1, 27.035), (2, 27.220), (3, 27.405),
+            (1, 27.590), (2, 27.775), (3, 27.960), (0, 28.145),
+
+            (1, 28.330), (2, 28.515), (3, 28.700), (1, 28.885),
+            (0, 29.070), (2, 29.255), (3, 29.440), (1, 29.625),
+
+            (0, 29.810), (1, 29.995), (2, 30.180), (3, 30.365),
+            (1, 30.550), (2, 30.735), (3, 30.920), (1, 31.105),
+
+            (0, 31.290), (2, 31.475), (3, 31.660), (1, 31.845),
+            (0, 32.000), (2, 32.185), (3, 32.370), (1, 32.555),
+            (0, 32.740), (1, 32.925), (2, 33.110), (3, 33.295),
+
+            (1, 33.480), (2, 33.665), (3, 33.850), (1, 34.035),
+            (0, 34.220), (1, 34.405), (2, 34.590), (3, 34.775),
+
+            # 계단 반복
+            (0, 34.960), (1, 35.145), (2, 35.330), (3, 35.515),
+
+            (1, 35.700), (2, 35.885), (3, 36.070), (1, 36.255),
+            (0, 36.440), (1, 36.625), (2, 36.810), (3, 36.995),
+
+            # 좌우 왕복
+            (3, 37.180), (0, 37.180),
+            (2, 37.365), (1, 37.550),
+            (3, 37.735), (0, 37.920),
+
+            (1, 38.105), (2, 38.290), (3, 38.475), (1, 38.660),
+            (0, 38.845), (1, 39.030), (2, 39.215), (3, 39.400),
+
+            # 부드러운 4레인 순환
+            (0, 39.585), (1, 39.770), (2, 39.955), (3, 40.140),
+            (1, 40.325), (2, 40.510), (3, 40.695), (1, 40.880),
+
+            # 중심 레인 위주의 B파트 멜로디 느낌
+            (2, 41.065), (2, 41.250), (1, 41.435), (3, 41.620),
+
+            (0, 41.805), (1, 41.990), (2, 42.175), (3, 42.360),
+            (1, 42.545), (2, 42.730), (3, 42.915), (1, 43.100),
+
+            # 약간 더 촘촘한 계단 (난타 최소화)
+            (0, 43.285), (1, 43.380), (2, 43.475), (3, 43.570),
+
+            (1, 43.755), (2, 43.940), (3, 44.125), (1, 44.310),
+            (0, 44.495), (2, 44.680), (3, 44.865), (1, 45.050),
+
+            # B파트 중반: 점프 + 교차
+            (0, 45.235), (3, 45.235),
+            (1, 45.420), (2, 45.605),
+            (0, 45.790), (3, 45.790),
+
+            (1, 45.975), (2, 46.160), (3, 46.345), (1, 46.530),
+            (0, 46.715), (1, 46.900), (2, 47.085), (3, 47.270),
+
+            # 대각선 교차
+            (0, 47.455), (3, 47.640), (1, 47.825), (2, 48.010),
+
+            # 레인 흔들기 패턴
+            (1, 48.195), (3, 48.380), (2, 48.565), (0, 48.750),
+            (1, 48.935), (2, 49.120), (3, 49.305), (1, 49.490),
+
+            # B파트 후반 서서히 밀도 증가
+            (0, 49.675), (1, 49.860), (2, 50.045), (3, 50.230),
+            (1, 50.415), (2, 50.600), (3, 50.785), (1, 50.970),
+
+            (0, 51.155), (1, 51.340), (3, 51.525), (2, 51.710),
+            (1, 51.895), (3, 52.080), (2, 52.265), (1, 52.450),
+
+            # A파트와 연결되는 느낌으로 세기 증가
+            (0, 52.635), (1, 52.820), (2, 53.005), (3, 53.190),
+            (1, 53.375), (2, 53.560), (3, 53.745), (1, 53.930),
+
+            # B파트 마지막 4초: 고정된 흐름 유지
+            (0, 54.115), (2, 54.300), (3, 54.485), (1, 54.670),
+            (0, 54.855), (1, 55.040), (2, 55.225), (3, 55.410),
+            (1, 55.595), (2, 55.780), (3, 55.965), (1, 56.000), 
+            (2, 56.185), (3, 56.370), (1, 56.555),
+            (0, 56.740), (1, 56.925), (2, 57.110), (3, 57.295),
+
+            # 대칭 + 계단
+            (0, 57.480), (3, 57.480),
+            (1, 57.665), (2, 57.665),
+            (0, 57.850), (3, 57.850),
+
+            (1, 58.035), (2, 58.220), (3, 58.405), (1, 58.590),
+            (0, 58.775), (2, 58.960), (3, 59.145), (1, 59.330),
+
+            # 흐름 유지 구간
+            (0, 59.515), (1, 59.700), (2, 59.885), (3, 60.070),
+            (2, 60.255), (1, 60.440), (0, 60.625), (3, 60.810),
+
+            # 리듬 강조 (난타 없는 12분 느낌)
+            (1, 60.995), (2, 61.088), (3, 61.180),
+            (1, 61.365), (2, 61.550), (0, 61.735),
+
+            (1, 61.920), (3, 62.105), (2, 62.290), (1, 62.475),
+            (0, 62.660), (1, 62.845), (2, 63.030), (3, 63.215),
+
+            # 교차 + 계단
+            (0, 63.400), (2, 63.585), (3, 63.770), (1, 63.955),
+            (0, 64.140), (1, 64.325), (2, 64.510), (3, 64.695),
+
+            # C파트 중반: 패턴 강도 ↑ (하지만 난타 없음)
+            (1, 64.880), (2, 65.065), (3, 65.250), (1, 65.435),
+            (0, 65.620), (1, 65.805), (3, 65.990), (2, 66.175),
+
+            (0, 66.360), (2, 66.545), (3, 66.730), (1, 66.915),
+            (0, 67.100), (1, 67.285), (2, 67.470), (3, 67.655),
+
+            # 16분 난타 대신 “연속 12분 계단”으로 타격감 표현
+            (0, 67.840), (1, 67.932),
+            (0, 68.740), (1, 68.925), (2, 69.110), (3, 69.295),
+
+            (1, 69.480), (3, 69.665), (2, 69.850), (0, 70.035),
+            (1, 70.220), (2, 70.405), (3, 70.590), (1, 70.775),
+
+            # A' 계단 강화
+            (0, 70.960), (1, 71.145), (2, 71.330), (3, 71.515),
+            (1, 71.700), (2, 71.885), (3, 72.070), (1, 72.255),
+
+            # 대칭 + 중심 레인 움직임
+            (0, 72.440), (3, 72.440),
+            (1, 72.625), (2, 72.810),
+            (0, 72.995), (3, 72.995),
+
+            (1, 73.180), (2, 73.365), (3, 73.550), (1, 73.735),
+            (0, 73.920), (1, 74.105), (2, 74.290), (3, 74.475),
+
+            # 중간 긴장감 상승
+            (0, 74.660), (1, 74.845), (2, 75.030), (3, 75.215),
+            (1, 75.400), (2, 75.585), (3, 75.770), (1, 75.955),
+
+            (0, 76.140), (1, 76.325), (3, 76.510), (2, 76.695),
+            (0, 76.880), (2, 77.065), (3, 77.250), (1, 77.435),
+
+            # A' 후반 - 패턴 순환
+            (0, 77.620), (1, 77.805), (2, 77.990), (3, 78.175),
+            (2, 78.360), (1, 78.545), (0, 78.730), (3, 78.915),
+
+            (1, 79.100), (2, 79.285), (3, 79.470), (1, 79.655),
+            (0, 79.840), (2, 80.025), (3, 80.210), (1, 80.395),
+
+            # 패턴 강화(난타 없이 미세 촘촘)
+            (0, 80.580), (1, 80.672), (2, 80.765), (3, 80.858),
+            (1, 81.043), (2, 81.228), (3, 81.413), (1, 81.598),
+
+            (0, 81.783), (1, 81.968), (2, 82.153), (3, 82.338),
+            (1, 82.523), (2, 82.708), (3, 82.893), (1, 83.078),
+
+            # 후반부 긴장감 ↑
+            (0, 83.263), (1, 83.448), (3, 83.633), (2, 83.818),
+            (0, 84.003), (2, 84.188), (3, 84.373), (1, 84.558),
+
+            (0, 84.743), (1, 84.928), (2, 85.113), (3, 85.298),
+            (1, 85.483), (2, 85.668), (3, 85.853), (1, 86.038),
+
+            # climax 전
+            (0, 86.223), (1, 86.408), (2, 86.593), (3, 86.778),
+            (1, 86.963), (3, 87.148), (2, 87.333), (1, 87.518),
+
+            (0, 87.703), (1, 87.888), (2, 88.073), (3, 88.258),
+            (1, 88.443), (2, 88.628), (3, 88.813), (1, 88.998),
+
+            # 마지막 10초 — 엔딩 패턴!
+            (0, 89.183), (3, 89.368),
+            (1, 89.553), (2, 89.738),
+            (0, 89.923), (3, 89.923),
+
+            (1, 90.108), (2, 90.293), (3, 90.478), (1, 90.663),
+            (0, 90.848), (1, 91.033), (2, 91.218), (3, 91.403),
+
+            (1, 91.588), (3, 91.773), (2, 91.958), (1, 92.143),
+            (0, 92.328), (1, 92.513), (2, 92.698), (3, 92.883),
+
+            (1, 93.068), (2, 93.253), (3, 93.438), (1, 93.623),
+
+            # 피날레 4레인 순환
+            (0, 93.808), (1, 93.993), (2, 94.178), (3, 94.363),
+            (1, 94.548), (2, 94.733), (3, 94.918), (1, 95.103),
+
+            (0, 95.288), (2, 95.473), (3, 95.658), (1, 95.843),
+            (0, 96.028), (1, 96.213), (2, 96.398), (3, 96.583),
+
+            # 엔딩부 마무리 계단
+            (1, 96.768), (2, 96.953), (3, 97.138), (1, 97.323),
+            (0, 97.508), (1, 97.693), (2, 97.878), (3, 98.063),
+
+            (1, 98.248), (0, 98.433), (2, 98.618), (3, 98.803),
+            (1, 98.988), (2, 99.173), (3, 99.358), (1, 99.543),
+
+            # 엔딩 피날레 8노트
+            (0, 99.728), (1, 99.913), (2, 100.098), (3, 100.283),
+        
+
+            ],
+            length_hint=102.5,
+            start_delay=2.5,
+        ),
+        Song(
+            "Small girl (feat. D.O.)",
+            "songs/Small girl.mp3",
+            bpm=85,
+            offset=0.2,
+            difficulty=4.0,
+            chart=[
+                (2, 0.765), (2, 1.912), (3, 2.088),
+                (0, 2.176), (1, 2.529), (2, 3.588), (1, 4.294), (1, 4.559),
+
+                (3, 5.0), (3, 5.618), (2, 5.706), (1, 6.059), (0, 6.324),
+                (0, 6.412), (0, 7.029), (3, 7.471), (1, 8.176), (0, 8.265),
+
+                (0, 8.529), (0, 8.882), (2, 9.235), (3, 9.765), (1, 9.941),
+                (0, 10.294), (0, 10.912), (0, 11.265), (0, 11.353), (2, 11.971),
+
+                (2, 12.588), (0, 12.765), (0, 12.941), (0, 13.118), (0, 13.382),
+                (0, 13.647), (1, 13.735), (2, 14.529), (1, 14.882), (3, 15.147),
+
+                (3, 15.235), (3, 15.412), (3, 15.588), (3, 15.941), (2, 16.647),
+                (0, 16.912), (0, 17.265), (0, 17.353), (0, 17.618), (1, 18.059),
+
+                (1, 18.324), (3, 18.412), (2, 18.676), (2, 19.382), (3, 19.471),
+                (1, 19.824), (1, 20.176), (1, 20.529), (3, 20.794), (2, 22.294),
+
+                (2, 22.559), (1, 22.912), (1, 23.618), (2, 23.706), (0, 24.059),
+                (0, 24.324), (0, 24.412), (0, 24.676), (0, 24.941), (2, 25.471),
+
+                (3, 25.824), (3, 26.176), (3, 26.529), (3, 27.941), (3, 28.294),
+                (1, 29.0), (0, 29.353), (2, 29.706), (2, 29.882), (0, 30.588),
+
+                (0, 30.765), (1, 30.941), (2, 31.118), (1, 31.471), (0, 31.824),
+                (1, 32.0), (1, 32.529), (2, 32.882), (3, 33.235), (3, 33.588),
+
+                (3, 33.941), (3, 35.0), (3, 35.353), (2, 35.618), (3, 36.059),
+                (1, 36.765), (1, 37.471), (0, 38.529), (3, 38.882), (2, 39.235),
+
+                (3, 39.588), (2, 39.941), (2, 40.559), (1, 41.441), (2, 41.618),
+                (2, 42.059), (3, 42.324), (0, 42.412), (0, 43.118), (0, 43.471),
+
+                (0, 43.824), (0, 44.088), (0, 44.265), (0, 44.882), (1, 45.147),
+                (1, 45.235), (3, 45.588), (3, 46.118), (2, 46.294), (1, 46.647),
+
+                (2, 47.706), (3, 47.882), (2, 47.971), (0, 48.059), (1, 48.412),
+                (0, 49.029), (2, 49.118), (2, 49.471), (3, 49.824), (0, 50.529),
+
+                (1, 50.882), (1, 51.235), (0, 52.206), (0, 52.294), (3, 52.559),
+                (1, 53.353), (1, 53.618), (2, 53.706), (2, 54.412), (2, 54.765),
+
+                (2, 55.471), (2, 55.824), (2, 56.882), (2, 57.235), (0, 57.5),
+                (0, 57.588), (1, 57.853), (3, 58.206), (3, 58.559), (2, 58.647),
+
+                (3, 59.0), (3, 59.088), (1, 59.353), (2, 59.706), (2, 60.059),
+                (2, 60.324), (0, 60.412), (1, 60.765), (2, 61.118), (2, 61.824),
+
+                (2, 62.529), (0, 62.882), (1, 63.588), (1, 63.941), (3, 64.294),
+                (3, 64.559), (3, 64.647), (2, 65.706), (2, 65.971), (2, 66.059),
+
+                (1, 66.412), (1, 67.471), (3, 67.735), (3, 67.824), (3, 68.353),
+                (3, 68.794), (1, 69.235), (2, 69.588), (1, 69.676), (3, 69.941),
+
+                (3, 70.294), (3, 70.382), (3, 70.559), (1, 70.647), (2, 71.0),
+                (3, 71.088), (1, 71.353), (2, 71.882), (2, 72.059), (0, 72.5),
+
+                (1, 73.029), (2, 73.735), (2, 74.088), (0, 74.176), (1, 75.235),
+                (0, 75.412), (2, 75.588), (2, 75.941), (3, 76.118), (3, 76.206),
+
+                (3, 76.735), (2, 76.824), (0, 77.0), (0, 77.353), (0, 77.618),
+                (0, 78.059), (0, 78.412), (2, 78.853), (3, 79.294), (3, 79.735),
+
+                (2, 79.824), (0, 80.088), (0, 80.176), (0, 80.441), (3, 80.882),
+                (3, 81.235), (3, 81.5), (3, 81.588), (1, 81.941), (1, 82.206),
+
+                (2, 82.294), (1, 82.647), (0, 83.353), (2, 83.706), (1, 84.059),
+                (1, 84.412), (3, 84.588), (3, 85.118), (3, 85.382), (1, 85.471),
+
+                (0, 85.824), (1, 86.088), (1, 86.529), (1, 86.794), (3, 87.147),
+                (3, 87.235), (3, 87.5), (3, 87.588), (3, 87.765), (2, 88.118),
+
+                (1, 88.294), (3, 88.647), (2, 89.0), (1, 89.353), (1, 89.971),
+                (0, 90.059), (0, 90.324), (2, 90.412), (2, 91.118), (2, 91.294),
+
+                (2, 92.706), (2, 92.882), (1, 93.147), (0, 93.235), (0, 93.588),
+                (0, 93.941), (1, 94.559), (0, 94.647), (1, 94.912), (2, 95.0),
+
+                (3, 95.265), (1, 95.971), (2, 96.412), (2, 96.765), (3, 97.029),
+                (2, 97.118), (1, 97.382), (1, 97.471), (3, 97.735), (1, 98.882),
+
+                (0, 99.235), (0, 99.5), (1, 99.941), (0, 100.294), (1, 101.0),
+                (1, 101.176), (0, 101.529), (0, 101.618), (0, 101.706), (1, 101.882),
+
+                (0, 102.059), (1, 102.412), (3, 102.588), (2, 102.765), (3, 102.941),
+                (2, 103.118), (1, 103.735), (1, 103.824), (1, 104.529), (1, 105.941),
+
+                (1, 106.647), (3, 106.912), (3, 107.353), (2, 107.706), (1, 108.059),
+                (0, 108.324), (1, 108.765), (0, 109.118), (1, 109.382), (3, 109.471),
+
+                (3, 110.176), (3, 110.529), (2, 110.882), (1, 111.588), (3, 111.853),
+                (3, 112.206), (2, 113.706), (2, 113.971), (0, 114.059), (1, 114.412),
+
+                (2, 115.029), (1, 115.382), (3, 116.882), (2, 117.235), (0, 117.853),
+                (1, 118.206), (2, 118.294), (1, 118.559), (1, 119.0), (0, 119.706),
+
+                (0, 119.971), (0, 120.059), (1, 120.235), (3, 120.676), (3, 120.941),
+                (3, 121.824), (2, 122.529), (2, 122.882), (2, 123.588), (2, 124.206),
+
+                (2, 124.294), (0, 124.912), (0, 125.529), (0, 126.412), (1, 127.118),
+                (2, 128.088), (0, 128.529), (1, 129.412), (0, 129.853), (0, 129.941),
+
+                (1, 130.206), (3, 130.294), (3, 130.559), (1, 131.353), (1, 131.529),
+                (0, 131.794), (2, 132.147), (3, 133.471), (2, 133.824), (0, 134.088),
+
+                (1, 134.176), (0, 134.882), (0, 135.5), (0, 135.853), (2, 136.206),
+                (2, 136.912), (2, 137.0), (2, 137.265), (3, 137.971), (3, 138.765),
+
+                (3, 139.471), (1, 140.882), (3, 141.941), (2, 142.294), (2, 142.647),
+                (3, 142.824), (3, 143.353), (3, 143.706), (2, 144.412), (1, 144.765),
+
+                (1, 145.824), (3, 146.529), (2, 146.882), (2, 147.588), (3, 147.941),
+                (3, 149.0), (3, 149.529), (2, 149.706), (3, 150.059), (0, 150.412),
+
+                (0, 150.765), (0, 151.206), (0, 151.471), (0, 152.265), (0, 154.118),
+                (2, 155.176), (2, 156.147), (1, 156.676), (0, 156.765), (1, 158.529),
+
+                (0, 159.235), (1, 159.676), (0, 160.294), (0, 160.824), (2, 160.912),
+                (2, 161.441), (0, 161.971), (0, 162.235), (0, 162.765), (0, 163.471),
+
+                (0, 163.824), (1, 164.794), (2, 164.882), (0, 165.235), (1, 165.5),
+                (0, 165.588), (1, 165.941), (3, 166.294), (3, 166.471), (3, 166.647),
+
+                (3, 167.0), (2, 167.618), (3, 167.706), (3, 168.059), (2, 170.441),
+                (2, 170.529), (0, 170.882), (3, 171.941), (2, 172.118), (2, 172.294),
+
+                (2, 172.647), (0, 173.0), (0, 173.265), (0, 173.353), (1, 173.706),
+                (1, 174.412), (0, 175.824), (0, 176.176), (1, 177.059), (0, 177.235),
+
+                (0, 177.588), (2, 177.765), (3, 177.941), (2, 178.647), (2, 178.912),
+                (3, 179.0), (2, 179.706), (3, 180.412), (2, 180.765), (3, 181.118),
+
+                (2, 181.824), (1, 182.176), (3, 182.529), (3, 182.706), (3, 182.882),
+                (3, 183.235), (3, 183.941), (3, 184.294)
+            ],
+            length_hint=189.8,
+            start_delay=2.5,
+        ),
+        Song(
+            "A Cruel Angel's Thesis",
+            "songs/tensi.mp3",
+            bpm=128,
+            offset=-0.3,
+            difficulty=8.0,
+            chart=
+            [
+                (0, 16.500), (1, 16.969), (1, 17.438), (0, 17.789), (3, 17.789), (1, 17.789), (1, 17.906), (3, 18.141), (2, 18.375), (1, 18.609),
+                (3, 18.609), (3, 18.609), (2, 18.844), (1, 19.078), (0, 19.312), (3, 19.430), (0, 19.664), (0, 19.781), (1, 20.250), (0, 20.719),
+                (2, 20.719), (3, 21.188), (1, 21.539), (0, 21.539), (3, 21.539), (3, 21.656), (1, 21.891), (1, 22.125), (3, 22.359), (2, 22.359),
+                (1, 22.359), (3, 22.594), (2, 22.594), (1, 22.594), (3, 22.828), (0, 22.828), (1, 22.828), (3, 23.062), (2, 23.062), (0, 23.062),
+                (2, 23.297), (0, 23.297), (0, 23.414), (0, 23.414), (0, 23.883), (1, 24.469), (2, 24.703), (2, 24.820), (2, 24.938), (1, 25.641),
+                (1, 25.875), (3, 26.227), (3, 26.344), (2, 26.578), (2, 26.812), (2, 27.516), (0, 27.750), (1, 28.102), (0, 28.453), (3, 28.688),
+                (1, 29.039), (1, 29.156), (3, 29.391), (0, 29.625), (1, 29.977), (0, 30.328), (0, 30.562), (0, 31.266), (1, 31.383), (1, 31.500),
+                (1, 31.852), (1, 31.969), (1, 32.203), (1, 32.438), (1, 33.141), (3, 33.258), (1, 33.375), (0, 33.727), (0, 33.844), (3, 34.078),
+                (1, 34.312), (0, 35.016), (0, 35.250), (3, 35.602), (3, 35.719), (2, 35.953), (3, 36.188), (0, 36.656), (0, 37.125), (3, 37.125),
+                (1, 37.828), (2, 38.062), (0, 38.062), (1, 38.062), (2, 39.000), (1, 39.469), (2, 39.703), (2, 39.820), (2, 39.996), (1, 40.699),
+                (1, 40.875), (3, 41.227), (3, 41.344), (2, 41.578), (2, 41.812), (2, 42.516), (0, 42.750), (1, 43.102), (0, 43.453), (3, 43.688),
+                (1, 44.039), (1, 44.156), (3, 44.391), (0, 44.625), (1, 44.977), (0, 45.328), (0, 45.562), (0, 46.266), (1, 46.383), (1, 46.500),
+                (1, 46.852), (1, 46.969), (1, 47.203), (1, 47.438), (1, 48.141), (3, 48.258), (1, 48.375), (0, 48.727), (0, 48.844), (3, 49.078),
+                (1, 49.312), (0, 50.016), (0, 50.250), (3, 50.602), (3, 50.719), (2, 50.953), (3, 51.188), (0, 51.539), (0, 51.656), (1, 51.891),
+                (0, 52.125), (2, 52.125), (0, 52.594), (0, 52.594), (3, 53.062), (2, 53.062), (0, 53.531), (3, 53.531), (1, 54.000), (1, 54.000),
+                (0, 54.000), (0, 54.000), (1, 54.352), (1, 54.469), (1, 54.703), (1, 54.938), (1, 55.289), (1, 55.406), (1, 55.641), (3, 55.875),
+                (2, 55.875), (3, 56.227), (3, 56.344), (1, 56.578), (1, 56.812), (1, 56.812), (0, 56.812), (0, 57.164), (0, 57.281), (1, 57.516),
+                (2, 57.750), (1, 57.750), (1, 57.750), (1, 58.102), (1, 58.219), (1, 58.453), (3, 58.688), (0, 58.688), (1, 58.688), (1, 59.039),
+                (1, 59.156), (0, 59.391), (0, 59.625), (0, 59.625), (2, 59.625), (3, 60.094), (1, 60.094), (0, 60.562), (3, 60.562), (1, 61.031),
+                (0, 61.031), (2, 61.500), (0, 61.500), (1, 61.852), (0, 61.852), (1, 61.969), (0, 61.969), (1, 62.203), (2, 62.203), (1, 62.438),
+                (0, 62.438), (1, 62.789), (0, 62.789), (1, 62.906), (0, 62.906), (1, 63.141), (2, 63.141), (1, 63.375), (1, 63.375), (3, 63.727),
+                (1, 63.727), (3, 63.844), (1, 63.844), (3, 64.078), (0, 64.078), (1, 64.312), (2, 64.312), (1, 64.664), (0, 64.664), (1, 64.781),
+                (0, 64.781), (1, 65.016), (1, 65.016), (3, 65.250), (0, 65.250), (1, 65.602), (0, 65.602), (0, 65.602), (1, 65.719), (1, 65.719),
+                (0, 65.719), (1, 65.953), (0, 65.953), (1, 66.188), (0, 66.188), (0, 66.188), (1, 66.539), (3, 66.539), (0, 66.539), (1, 66.656),
+                (0, 66.656), (1, 66.891), (0, 66.891), (1, 67.125), (3, 67.125), (2, 67.125), (0, 68.062), (3, 68.062), (0, 68.062), (3, 68.062),
+                (1, 68.414), (0, 68.414), (0, 68.414), (3, 68.531), (2, 68.531), (1, 68.766), (0, 69.000), (3, 69.000), (0, 69.000), (0, 69.469),
+                (0, 69.938), (1, 69.938), (1, 69.938), (3, 69.938), (1, 70.289), (1, 70.406), (3, 70.641), (0, 70.875), (3, 70.875), (3, 71.109),
+                (2, 71.344), (1, 71.578), (0, 71.812), (3, 71.930), (0, 72.164), (0, 72.281), (1, 72.750), (0, 73.219), (1, 73.219), (0, 73.688),
+                (2, 73.688), (1, 73.688), (1, 74.039), (0, 74.039), (3, 74.039), (3, 74.156), (1, 74.391), (1, 74.625), (1, 74.859), (0, 75.094),
+                (1, 75.328), (3, 75.562), (1, 75.680), (1, 75.914), (1, 76.031), (0, 76.500), (0, 76.969), (0, 77.438), (1, 77.438), (1, 77.438),
+                (3, 77.438), (1, 77.789), (1, 77.906), (3, 78.141), (0, 78.375), (3, 78.375), (3, 78.609), (2, 78.844), (1, 79.078), (0, 79.312),
+                (3, 79.430), (0, 79.664), (0, 79.781), (1, 80.250), (0, 80.719), (1, 80.719), (0, 81.188), (2, 81.188), (1, 81.188), (1, 81.539),
+                (0, 81.539), (3, 81.539), (3, 81.656), (1, 81.891), (1, 82.125), (3, 82.359), (2, 82.359), (1, 82.359), (3, 82.594), (2, 82.594),
+                (1, 82.594), (3, 82.828), (0, 82.828), (1, 82.828), (3, 83.062), (2, 83.062), (1, 83.062), (3, 83.414), (2, 83.414), (1, 83.414),
+                (0, 83.531), (0, 83.531), (0, 84.000), (0, 84.469), (0, 84.938), (1, 84.938), (1, 84.938), (3, 84.938), (1, 85.289), (1, 85.406),
+                (3, 85.641), (0, 85.875), (3, 85.875), (3, 86.109), (2, 86.344), (1, 86.578), (0, 86.812), (3, 86.930), (0, 87.164), (0, 87.281),
+                (1, 87.750), (0, 88.219), (1, 88.219), (0, 88.688), (2, 88.688), (1, 88.688), (1, 89.039), (0, 89.039), (3, 89.039), (3, 89.156),
+                (1, 89.391), (1, 89.625), (3, 89.859), (2, 89.859), (1, 89.859), (3, 90.094), (2, 90.094), (1, 90.094), (3, 90.328), (0, 90.328),
+                (1, 90.328), (3, 90.562), (2, 90.562), (1, 90.562), (3, 90.914), (2, 90.914), (1, 90.914), (0, 91.031), (0, 91.031),
+            ],
+
+
+
+            length_hint=93.5,
+            start_delay=2.5,
+        ),
+        # 수동 차트 없이 오디오에서 차트/BPM 을 자동 생성
+        Song(
+            "Zankoku na Tenshi no These (auto)",
+            "songs/tensi.mp3",
+            bpm=0,
+            difficulty=1.5,
+            length_hint=93.5,
+            start_delay=2.5,
+        ),
+    ]
@@ -0,0 +1,159 @@
+import argparse
+import socket
+import time
+from typing import Dict, List
+
+import pygame
+
+from broadcast import (
+    DEFAULT_BROADCAST,
+    EVENT_GAME_OVER,
+    EVENT_KO,
+    EVENT_MENU,
+    EVENT_START,
+    LABELS,
+    MatchView,
+    TrackState,
+)
+from fonts import load_font
+from models import CompiledChart, compile_chart
+
+COLORS = ((111, 203, 255), (255, 176, 122))
+NOTE_SPEED = 300
+LOOKAHEAD = 2.2  # 화면에 보이는 미래 노트 범위(초)
+
+
+class Spectator:
+    """Lightweight viewer for the match broadcast (run as a separate process)."""
+
+    def __init__(self, port: int) -> None:
+        pygame.init()
+        self.width, self.height = 960, 540
+        self.screen = pygame.display.set_mode((self.width, self.height))
+        pygame.display.set_caption("Battle! Rhythm Hell - Spectator")
+        self.font = load_font("Menlo", 18)
+        self.big_font = load_font("Menlo", 30, bold=True)
+        self.clock = pygame.time.Clock()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("", port))
+        self.sock.setblocking(False)
+        self.view = MatchView()
+        self.received_at = time.perf_counter()
+        self.song_id = ""
+        self.mode = ""
+        self.banner = "Waiting for match..."
+        self.lane_notes: List[List[float]] = [[] for _ in range(4)]
+        self.charts: Dict[str, CompiledChart] = {}
+        self.library = None
+        self.bytes_received = 0
+
+    def _chart_for(self, song_id: str) -> CompiledChart:
+        # 곡 인덱스는 처음 필요할 때 한 번만 읽고, 차트는 방송된 곡 것만 만든다
+        if song_id not in self.charts:
+            from game import song_chart
+            from library import SongLibrary
+
+            if self.library is None:
+                self.library = SongLibrary.open()
+            song = self.library.by_name(song_id)
+            self.charts[song_id] = song_chart(song) if song is not None else compile_chart([])
+        return self.charts[song_id]
+
+    def _receive(self) -> None:
+        while True:
+            try:
+                data = self.sock.recv(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            self.bytes_received += len(data)
+            prev_seq = self.view.seq
+            self.view.apply(data)
+            if self.view.seq != prev_seq:
+                self.received_at = time.perf_counter()
+            for event in self.view.events:
+                self._on_event(event.kind, event)
+            self.view.events.clear()
+
+    def _on_event(self, kind: int, event) -> None:
+        if kind == EVENT_START:
+            self.song_id = event.song_id
+            self.mode = event.mode
+            self.banner = ""
+            chart = self._chart_for(event.song_id)
+            self.lane_notes = [[chart.times[i] for i in idx] for idx in chart.lane_index]
+        elif kind == EVENT_KO:
+            self.banner = "KO! " + ("Draw" if event.winner is None else f"Player {event.winner + 1} Wins!")
+        elif kind == EVENT_GAME_OVER:
+            self.banner = "Song complete! " + ("Draw" if event.winner is None else f"Winner: Player {event.winner + 1}")
+        elif kind == EVENT_MENU:
+            self.banner = "Waiting for match..."
+            self.song_id = ""
+
+    def _draw_track(self, idx: int, state: TrackState, now: float) -> None:
+        half = self.width // 2
+        x0 = idx * half
+        color = COLORS[idx]
+        lane_w = half // 4
+        hit_y = self.height - 90
+        for lane in range(4):
+            x = x0 + lane * lane_w
+            pygame.draw.rect(self.screen, (color[0] // 4, color[1] // 4, color[2] // 4), (x + 3, 0, lane_w - 6, self.height))
+            notes = self.lane_notes[lane]
+            start = state.lane_cursors[lane]
+            for t in notes[start:]:
+                if t > now + LOOKAHEAD:
+                    break
+                y = hit_y - (t - now) * NOTE_SPEED
+                if y > self.height:
+                    continue
+                pygame.draw.rect(self.screen, color, (x + 6, y, lane_w - 12, 16), border_radius=4)
+        pygame.draw.rect(self.screen, color, (x0, hit_y, half, 5))
+
+        hp_pct = max(0.0, min(1.0, state.health / 100.0))
+        pygame.draw.rect(self.screen, (30, 30, 40), (x0 + 16, 16, half - 32, 10))
+        pygame.draw.rect(self.screen, color, (x0 + 16, 16, int((half - 32) * hp_pct), 10))
+        text = f"P{idx + 1}  {state.score}  combo {state.combo}  HP {int(state.health)}"
+        self.screen.blit(self.font.render(text, True, (235, 235, 235)), (x0 + 16, 32))
+        if state.down:
+            label = "DOWN"
+        elif now - state.label_time < 1.0 and state.label_time > 0:
+            label = LABELS[state.label] if state.label < len(LABELS) else ""
+        else:
+            label = ""
+        if label:
+            surf = self.big_font.render(label, True, (240, 240, 240))
+            self.screen.blit(surf, (x0 + half // 2 - surf.get_width() // 2, hit_y - 120))
+
+    def run(self) -> None:
+        running = True
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    running = False
+            self._receive()
+            # 스냅샷 사이 시간은 로컬 시계로 보간 (변화 없는 틱은 보내지 않으므로)
+            now = self.view.now + (time.perf_counter() - self.received_at)
+            self.screen.fill((12, 14, 22))
+            if self.song_id:
+                for idx, state in enumerate(self.view.tracks):
+                    self._draw_track(idx, state, now)
+                pygame.draw.line(self.screen, (80, 80, 90), (self.width // 2, 0), (self.width // 2, self.height), 2)
+                title = f"{self.song_id} [{self.mode}]  {now:05.2f}s"
+                surf = self.font.render(title, True, (210, 210, 210))
+                self.screen.blit(surf, (self.width // 2 - surf.get_width() // 2, self.height - 30))
+            if self.banner:
+                surf = self.big_font.render(self.banner, True, (240, 240, 240))
+                self.screen.blit(surf, surf.get_rect(center=(self.width // 2, self.height // 2)))
+            if not self.view.synced and self.song_id:
+                surf = self.font.render("resyncing...", True, (255, 150, 150))
+                self.screen.blit(surf, (10, self.height - 30))
+            pygame.display.flip()
+            self.clock.tick(60)
+        pygame.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch a Battle! Rhythm Hell match broadcast")
+    parser.add_argument("--port", type=int, default=DEFAULT_BROADCAST[1])
+    Spectator(parser.parse_args().port).run()
@@ -0,0 +1,213 @@
+"""Synthetic songs for scale tests: click-track audio with known onsets and generated charts.
+
+    python3 synthetic.py chart OUT.json [--length 600] [--density 8] [--seed 0]
+    python3 synthetic.py audio OUT.wav [--length 600] [--density 8] [--seed 0]
+    python3 synthetic.py library DIR [--count 1000] [--length 5]
+    python3 synthetic.py eval [--length 60] [--density 2 4 8 12] [--tolerance 0.05]
+
+Each click is a short decaying tone whose pitch sits in the detector band of its lane
+(low → lane 0 … high → lane 3), so a click track is also a ground truth for band tagging.
+"""
+import argparse
+import json
+import os
+import sys
+import wave
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 44100
+LANE_TONES = (90.0, 420.0, 1700.0, 6500.0)  # Hz, one per OnsetDetector band
+CLICK_LENGTH = 0.04  # 초
+CLICK_DECAY = 0.008  # 감쇠 시간 상수 (초)
+MIN_GAP = 0.05  # 검출기가 구분할 수 있는 최소 간격 (홉 512 ≈ 11.6ms 의 4배 정도)
+
+
+def synthetic_chart(
+    length: float,
+    density: float,
+    seed: int = 0,
+    chord_rate: float = 0.1,
+    start: float = 1.0,
+    min_gap: float = MIN_GAP,
+) -> List[Tuple[int, float]]:
+    """Random (lane, time) chart with about ``density`` onsets per second (chords add notes).
+
+    Gaps vary ±50% around 1/density but never drop below ``min_gap``.
+    """
+    rng = np.random.default_rng(seed)
+    count = int((length - start) * density * 1.2) + 1
+    gaps = np.maximum(min_gap, rng.uniform(0.5, 1.5, count) / density)
+    times = start + np.concatenate(([0.0], np.cumsum(gaps[:-1])))
+    times = np.round(times[times < length], 4)
+    lanes = rng.integers(0, 4, len(times))
+    chords = rng.random(len(times)) < chord_rate
+    others = (lanes + rng.integers(1, 4, len(times))) % 4  # 같은 레인 중복 없이 두 번째 노트
+    chart = [(int(lane), float(t)) for lane, t in zip(lanes.tolist(), times.tolist())]
+    chart.extend((int(lane), float(t)) for lane, t in zip(others[chords].tolist(), times[chords].tolist()))
+    chart.sort(key=lambda x: (x[1], x[0]))
+    return chart
+
+
+def click_track(chart: Sequence[Tuple[int, float]], length: float, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Mono float32 signal in [-1, 1] with one click per chart note."""
+    signal = np.zeros(int(length * sample_rate) + 1, dtype=np.float32)
+    n = int(CLICK_LENGTH * sample_rate)
+    t = np.arange(n) / sample_rate
+    envelope = np.exp(-t / CLICK_DECAY)
+    clicks = [(np.sin(2 * np.pi * tone * t) * envelope).astype(np.float32) for tone in LANE_TONES]
+    for lane, time in chart:
+        start = int(round(time * sample_rate))
+        end = min(len(signal), start + n)
+        if start < end:
+            signal[start:end] += clicks[lane][: end - start]
+    peak = float(np.max(np.abs(signal))) if len(signal) else 0.0
+    if peak > 0:
+        signal *= 0.8 / peak
+    return signal
+
+
+def write_wav(path: str, signal: np.ndarray, sample_rate: int = SAMPLE_RATE) -> None:
+    """16-bit stereo WAV (what pygame's mixer loads without extra codecs)."""
+    pcm = (np.clip(signal, -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(path, "wb") as fh:
+        fh.setnchannels(2)
+        fh.setsampwidth(2)
+        fh.setframerate(sample_rate)
+        fh.writeframes(np.repeat(pcm, 2).tobytes())
+
+
+def write_song(path: str, length: float, density: float, seed: int = 0) -> List[Tuple[int, float]]:
+    """Write a click track to ``path`` and return the chart it was rendered from."""
+    chart = synthetic_chart(length, density, seed)
+    write_wav(path, click_track(chart, length))
+    return chart
+
+
+def onset_truth(chart: Sequence[Tuple[int, float]]) -> np.ndarray:
+    """Distinct onset times of a chart (chord notes share one onset)."""
+    return np.unique(np.asarray([t for _, t in chart], dtype=np.float64))
+
+
+@dataclass
+class OnsetScore:
+    precision: float
+    recall: float
+    f1: float
+    matched: int
+    detected: int
+    expected: int
+    mean_error: float  # 매칭된 검출의 평균 |오차| (초)
+    band_accuracy: float = 0.0  # 단일 노트 onset 중 가장 센 밴드가 레인과 같은 비율
+
+
+def evaluate_onsets(detected: Sequence[float], truth: Sequence[float], tolerance: float = 0.05) -> OnsetScore:
+    """Precision/recall of detected onsets; each true onset matches at most one detection within ``tolerance``."""
+    det = np.sort(np.asarray(detected, dtype=np.float64))
+    ref = np.sort(np.asarray(truth, dtype=np.float64))
+    i = j = matched = 0
+    error = 0.0
+    while i < len(det) and j < len(ref):
+        diff = det[i] - ref[j]
+        if abs(diff) <= tolerance:
+            matched += 1
+            error += abs(diff)
+            i += 1
+            j += 1
+        elif diff < 0:
+            i += 1
+        else:
+            j += 1
+    precision = matched / len(det) if len(det) else 0.0
+    recall = matched / len(ref) if len(ref) else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return OnsetScore(precision, recall, f1, matched, len(det), len(ref), error / matched if matched else 0.0)
+
+
+def band_accuracy(
+    onsets: Sequence[float], leads: Sequence[int], chart: Sequence[Tuple[int, float]], tolerance: float = 0.05
+) -> float:
+    """Share of single-note onsets whose nearest detection has the chart lane as its lead band."""
+    lanes_at: Dict[float, List[int]] = {}
+    for lane, t in chart:
+        lanes_at.setdefault(t, []).append(lane)
+    singles = sorted((t, lanes[0]) for t, lanes in lanes_at.items() if len(lanes) == 1)
+    det = np.asarray(onsets, dtype=np.float64)
+    if not singles or not len(det):
+        return 0.0
+    times = np.asarray([t for t, _ in singles])
+    right = np.clip(np.searchsorted(det, times), 0, len(det) - 1)
+    left = np.maximum(right - 1, 0)
+    nearest = np.where(np.abs(det[left] - times) <= np.abs(det[right] - times), left, right)
+    close = np.abs(det[nearest] - times) <= tolerance
+    correct = np.asarray(leads)[nearest] == np.asarray([lane for _, lane in singles])
+    return float((close & correct).sum()) / len(singles)
+
+
+def evaluate_detector(length: float, density: float, seed: int, tolerance: float, path: str) -> OnsetScore:
+    from chart import OnsetDetector
+
+    chart = write_song(path, length, density, seed)
+    analysis = OnsetDetector().analyze(path)
+    score = evaluate_onsets(analysis.onsets, onset_truth(chart), tolerance)
+    if len(analysis.onset_bands):
+        score.band_accuracy = band_accuracy(analysis.onsets, analysis.onset_bands[:, 0], chart, tolerance)
+    return score
+
+
+# ---- CLI ----
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_chart = sub.add_parser("chart", help="write a chart as a JSON list of [lane, time]")
+    p_audio = sub.add_parser("audio", help="write a click-track WAV (and its chart next to it)")
+    p_lib = sub.add_parser("library", help="fill a directory with short click-track songs")
+    p_eval = sub.add_parser("eval", help="OnsetDetector precision/recall on click tracks")
+    for p in (p_chart, p_audio):
+        p.add_argument("out")
+        p.add_argument("--length", type=float, default=600.0)
+        p.add_argument("--density", type=float, default=8.0)
+        p.add_argument("--seed", type=int, default=0)
+    p_lib.add_argument("dir")
+    p_lib.add_argument("--count", type=int, default=1000)
+    p_lib.add_argument("--length", type=float, default=5.0)
+    p_lib.add_argument("--density", type=float, default=4.0)
+    p_eval.add_argument("--length", type=float, default=60.0)
+    p_eval.add_argument("--density", type=float, nargs="+", default=[2.0, 4.0, 8.0, 12.0])
+    p_eval.add_argument("--seed", type=int, default=0)
+    p_eval.add_argument("--tolerance", type=float, default=0.05)
+    p_eval.add_argument("--workdir", default="synthetic_eval")
+    args = parser.parse_args(argv)
+
+    if args.command == "chart":
+        chart = synthetic_chart(args.length, args.density, args.seed)
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(chart, fh)
+        print(f"{len(chart)} notes -> {args.out}")
+    elif args.command == "audio":
+        chart = write_song(args.out, args.length, args.density, args.seed)
+        with open(os.path.splitext(args.out)[0] + ".json", "w", encoding="utf-8") as fh:
+            json.dump(chart, fh)
+        print(f"{len(chart)} notes, {args.length:.0f}s -> {args.out}")
+    elif args.command == "library":
+        os.makedirs(args.dir, exist_ok=True)
+        for i in range(args.count):
+            write_song(os.path.join(args.dir, f"synthetic_{i:05d}.wav"), args.length, args.density, seed=i)
+        print(f"{args.count} songs -> {args.dir}")
+    else:
+        os.makedirs(args.workdir, exist_ok=True)
+        print(f"{'density':>8} {'expected':>9} {'detected':>9} {'precision':>10} {'recall':>8} {'f1':>6} {'error':>8} {'bands':>6}")
+        for density in args.density:
+            path = os.path.join(args.workdir, f"click_{density:g}.wav")
+            score = evaluate_detector(args.length, density, args.seed, args.tolerance, path)
+            print(
+                f"{density:>8g} {score.expected:>9} {score.detected:>9} {score.precision:>10.3f} "
+                f"{score.recall:>8.3f} {score.f1:>6.3f} {score.mean_error * 1000:>6.1f}ms {score.band_accuracy:>6.3f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
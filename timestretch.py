@@ -0,0 +1,133 @@
+"""Time-stretched song audio for slowed-down practice (WSOLA, vectorised with numpy).
+
+A stretch runs once per (file, rate) on a worker thread; the result stays cached so
+switching back to a rate already used is instant.
+"""
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+import pygame
+
+from audio_player import ensure_mixer
+
+MIN_RATE = 0.5
+MAX_RATE = 1.0
+MAX_CACHED = 4  # 늘린 PCM 은 곡당 수십 MB 라 최근 것만 둔다
+FRAME = 1024  # 분석/합성 창 (44.1kHz 에서 약 23ms)
+TOLERANCE = 256  # 창 위치를 파형이 가장 잘 이어지는 곳으로 옮길 수 있는 범위 (샘플)
+CHUNK_FRAMES = 256  # 한 번에 처리하는 창 수 (메모리 상한)
+
+
+def clamp_rate(rate: float) -> float:
+    return round(min(MAX_RATE, max(MIN_RATE, rate)), 2)
+
+
+def wsola(pcm: np.ndarray, rate: float, frame: int = FRAME, tolerance: int = TOLERANCE) -> np.ndarray:
+    """Stretch ``pcm`` (samples × channels) to ``1 / rate`` of its speed, keeping the pitch.
+
+    Windows are taken every ``frame/2 * rate`` input samples and overlap-added every
+    ``frame/2`` output samples; each window may shift by ±``tolerance`` to where it best
+    continues the previously chosen one. Candidate spectra are computed a chunk at a time
+    in one batched FFT; only the short shift search walks the windows in order.
+    """
+    if rate == 1.0 or len(pcm) < frame:
+        return pcm.copy()
+    channels = pcm.shape[1]
+    hop = frame // 2
+    out_len = int(len(pcm) / rate)
+    count = out_len // hop + 1
+    pos = np.round(np.arange(count) * hop * rate).astype(np.int64)
+
+    pad = tolerance + frame
+    data = np.zeros((len(pcm) + 2 * pad, channels), dtype=np.float32)
+    data[pad : pad + len(pcm)] = pcm
+    mono = data.mean(axis=1)
+    search = np.lib.stride_tricks.sliding_window_view(mono, frame + 2 * tolerance)
+    windows = np.lib.stride_tricks.sliding_window_view(mono, frame)
+    size = 1 << int(np.ceil(np.log2(2 * frame + 2 * tolerance)))
+    window = np.hanning(frame + 1)[:-1].astype(np.float32)  # 주기형 Hann: 50% 겹치면 합이 1
+
+    rfft, irfft = np.fft.rfft, np.fft.irfft
+    lags = 2 * tolerance + 1
+    out = np.zeros(((count + 1) * hop + frame, channels), dtype=np.float32)
+    prev = int(pos[0]) + pad - hop  # 첫 창은 제자리에 맞춰진다
+    for lo in range(0, count, CHUNK_FRAMES):
+        hi = min(count, lo + CHUNK_FRAMES)
+        p = pos[lo:hi]
+        spectra = rfft(search[p + pad - tolerance], size)
+        start = np.empty(hi - lo, dtype=np.int64)
+        for i in range(hi - lo):
+            # 앞 창을 홉만큼 그대로 이어 읽은 파형과 가장 닮은 위치를 고른다
+            ref = rfft(windows[prev + hop], size)
+            shift = int(np.argmax(irfft(spectra[i] * np.conj(ref), size)[:lags]))
+            prev = int(p[i]) + shift - tolerance + pad
+            start[i] = prev
+        idx = start[:, None] + np.arange(frame)
+        segments = data[idx] * window[None, :, None]
+        # 홉이 창의 절반이라 짝수/홀수 창끼리는 겹치지 않는다: 각각 이어 붙여 한 번에 더한다
+        for parity in (0, 1):
+            first = lo + ((parity - lo) % 2)
+            part = segments[first - lo :: 2]
+            if len(part):
+                at = first * hop
+                out[at : at + len(part) * frame] += part.reshape(-1, channels)
+    return out[:out_len]
+
+
+class StretchJob:
+    """Stretched PCM of one file at one rate, computed on a worker thread."""
+
+    def __init__(self, path: str, rate: float) -> None:
+        self.path = path
+        self.rate = rate
+        self.pcm: Optional[np.ndarray] = None  # int16, 샘플 × 채널 (믹서 형식)
+        self.error: Optional[str] = None
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def run(self) -> None:
+        try:
+            ensure_mixer()
+            pcm = pygame.sndarray.array(pygame.mixer.Sound(self.path)).astype(np.float32)
+            if pcm.ndim == 1:
+                pcm = pcm[:, None]
+            stretched = wsola(pcm, self.rate)
+            self.pcm = np.clip(stretched, -32768, 32767).astype(np.int16)
+        except Exception as exc:
+            self.error = str(exc)
+            print(f"[warn] time stretch failed for {self.path} at {self.rate}x: {exc}")
+        finally:
+            self._done.set()
+
+
+_jobs: "OrderedDict[Tuple[str, float], StretchJob]" = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def stretch_job(path: str, rate: float) -> StretchJob:
+    """Cached stretch of ``path`` at ``rate``; the first request starts it on a worker thread."""
+    key = (path, clamp_rate(rate))
+    with _jobs_lock:
+        job = _jobs.get(key)
+        if job is None:
+            job = StretchJob(path, key[1])
+            _jobs[key] = job
+            while len(_jobs) > MAX_CACHED:
+                _jobs.popitem(last=False)
+            threading.Thread(target=job.run, name="time-stretch", daemon=True).start()
+        else:
+            _jobs.move_to_end(key)
+        return job
+
+
+def stretched_ready(path: str, rate: float) -> bool:
+    job = _jobs.get((path, clamp_rate(rate)))
+    return job is not None and job.done and job.pcm is not None
@@ -0,0 +1,416 @@
+"""Bulk re-scoring of recorded inputs under candidate judgement/health configs.
+
+Input logs are plain text, one press per line::
+
+    # rhythm-input-log v1
+    # song: Beethoven Virus
+    # mode: sudden
+    12.345678 0 2        <- time(s) player lane
+
+Misses are modelled the way the game sweeps them: a note is dropped at the first
+``1 / SIM_HZ`` simulation step more than ``drop_after`` after it, and a press only meets
+notes not swept by then. Results don't depend on the recording frame rate and match
+``replay.rescore`` for inputs recorded without an input-latency offset.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from models import LANES, CompiledChart, compile_chart
+from rules import DEFAULT_RULES, SIM_HZ, JudgeRules
+
+LOG_HEADER = "# rhythm-input-log v1"
+
+
+def matching_key(rules: JudgeRules) -> Tuple[float, float, float]:
+    # 노트 매칭은 가장 바깥 판정창/early-bad/drop 시간에만 의존한다
+    return (rules.windows[-1], rules.early_bad, rules.drop_after)
+
+
+@dataclass(frozen=True)
+class LabelTable:
+    """Per-label arrays for vectorized scoring: window labels, then early Bad, then Miss."""
+
+    points: np.ndarray
+    keep: np.ndarray
+    health: Tuple[float, ...]
+    early_bad: int
+    miss: int
+
+    @classmethod
+    def build(cls, rules: JudgeRules) -> "LabelTable":
+        labels = list(rules.labels) + ["Bad", "Miss"]
+        points = list(rules.points) + [rules.early_bad_points, 0]
+        keep = list(rules.keep_combo) + [False, False]
+        n = len(rules.windows)
+        return cls(
+            points=np.array(points, dtype=np.int64),
+            keep=np.array(keep, dtype=bool),
+            health=tuple(rules.health_delta(label) for label in labels),
+            early_bad=n,
+            miss=n + 1,
+        )
+
+
+@dataclass
+class InputLog:
+    song_id: str
+    mode: str = "sudden"
+    times: List[float] = field(default_factory=list)
+    players: List[int] = field(default_factory=list)
+    lanes: List[int] = field(default_factory=list)
+
+    def add(self, time: float, player: int, lane: int) -> None:
+        self.times.append(time)
+        self.players.append(player)
+        self.lanes.append(lane)
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(f"{LOG_HEADER}\n# song: {self.song_id}\n# mode: {self.mode}\n")
+            for t, p, lane in zip(self.times, self.players, self.lanes):
+                fh.write(f"{t:.6f} {p} {lane}\n")
+
+    @classmethod
+    def load(cls, path: str) -> "InputLog":
+        log = cls("")
+        with open(path, encoding="utf-8") as fh:
+            for raw in fh:
+                line = raw.strip()
+                if not line:
+                    continue
+                if line.startswith("#"):
+                    key, _, value = line[1:].partition(":")
+                    if key.strip() == "song":
+                        log.song_id = value.strip()
+                    elif key.strip() == "mode":
+                        log.mode = value.strip()
+                    continue
+                t, p, lane = line.split()
+                log.add(float(t), int(p), int(lane))
+        if not log.song_id:
+            raise ValueError(f"{path}: missing '# song:' header")
+        return log
+
+    @classmethod
+    def from_replay(cls, replay) -> "InputLog":
+        from replay import EVENT_PRESS
+
+        log = cls(replay.song_id, replay.mode)
+        for kind, player, lane, t in replay.events():
+            if kind == EVENT_PRESS:
+                log.add(t, player, lane)
+        return log
+
+
+@dataclass
+class Timeline:
+    """Config-independent per-player event stream produced by note matching."""
+
+    times: np.ndarray  # event time
+    deltas: np.ndarray  # note.time - press time (nan = press without a note)
+    sweep: np.ndarray  # bool, True = notes dropped by one miss sweep step
+    repeat: np.ndarray  # notes dropped by the sweep (1 for presses)
+    tie: np.ndarray  # order among events at the same time: sweeps first, presses in log order
+
+
+def sweep_steps(note_times: np.ndarray, drop_after: float) -> np.ndarray:
+    """First simulation step ``k`` with ``k / SIM_HZ - note > drop_after`` (``Track.update_misses``)."""
+    steps = np.floor((note_times + drop_after) * SIM_HZ).astype(np.int64) - 1
+    # 게임과 같은 부동소수 식으로 경계를 확인한다
+    for _ in range(3):
+        steps += ~(steps / SIM_HZ - note_times > drop_after)
+    return steps
+
+
+def match_inputs(
+    chart: CompiledChart, times: np.ndarray, lanes: np.ndarray, order: np.ndarray, rules: JudgeRules
+) -> Timeline:
+    """Judge one player's presses (``order`` = their positions in the log) against ``chart``."""
+    outer, early_bad, drop_after = matching_key(rules)
+    no_consume = max(outer, early_bad)
+    ev_times: List[float] = []
+    ev_deltas: List[float] = []
+    ev_order: List[int] = []
+    chart_times = np.asarray(chart.times, dtype=np.float64)
+    chart_steps = sweep_steps(chart_times, drop_after)
+    consumed = np.zeros(len(chart_times), dtype=bool)
+    # 키 입력 전에 그 시각까지의 스텝이 먼저 돈다 (Game._key_down)
+    press_steps = np.trunc(times * SIM_HZ).astype(np.int64)
+    for lane in range(LANES):
+        index = np.asarray(chart.lane_index[lane], dtype=np.int64)
+        steps = chart_steps[index]
+        cursor = 0
+        for i in np.flatnonzero(lanes == lane):
+            tp = times[i]
+            # 누르기 전 스텝에서 스윕된 노트는 이미 놓친 것
+            while cursor < len(index) and steps[cursor] <= press_steps[i]:
+                cursor += 1
+            if cursor >= len(index):
+                delta = np.nan
+            else:
+                delta = chart_times[index[cursor]] - tp
+                if delta > no_consume:
+                    continue  # 너무 이른 입력은 무시된다
+                consumed[index[cursor]] = True
+                cursor += 1
+            ev_times.append(tp)
+            ev_deltas.append(delta)
+            ev_order.append(order[i])
+    # 한 스텝에서 스윕된 노트는 Miss 하나로 묶여 HP 에 한 번에 반영된다 (repeat)
+    swept_steps, counts = np.unique(chart_steps[~consumed], return_counts=True)
+    n = len(ev_times)
+    all_times = np.concatenate((np.asarray(ev_times, dtype=np.float64), swept_steps / SIM_HZ))
+    all_deltas = np.concatenate((np.asarray(ev_deltas, dtype=np.float64), np.full(len(counts), np.nan)))
+    is_sweep = np.concatenate((np.zeros(n, dtype=bool), np.ones(len(counts), dtype=bool)))
+    repeat = np.concatenate((np.ones(n, dtype=np.int64), counts))
+    tie = np.concatenate((np.asarray(ev_order, dtype=np.int64), np.full(len(counts), -1, dtype=np.int64)))
+    idx = np.lexsort((tie, all_times))
+    return Timeline(all_times[idx], all_deltas[idx], is_sweep[idx], repeat[idx], tie[idx])
+
+
+def classify(timeline: Timeline, rules: JudgeRules, table: LabelTable) -> np.ndarray:
+    """Vectorized label indices (into ``LabelTable``) for every event in the timeline."""
+    labels = np.full(len(timeline.times), table.miss, dtype=np.int64)
+    has_note = ~np.isnan(timeline.deltas) & ~timeline.sweep
+    deltas = timeline.deltas[has_note]
+    idx = np.searchsorted(np.asarray(rules.windows), np.abs(deltas), side="left")
+    outside = idx >= len(rules.windows)
+    idx[outside] = np.where(deltas[outside] > 0, table.early_bad, table.miss)
+    labels[has_note] = idx
+    return labels
+
+
+def score_labels(labels: np.ndarray, rules: JudgeRules, table: LabelTable) -> Tuple[np.ndarray, np.ndarray]:
+    """Cumulative score after each event and a combo-attack flag per event."""
+    n = len(labels)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+    keep = table.keep[labels]
+    idx = np.arange(n)
+    last_reset = np.maximum.accumulate(np.where(keep, -1, idx))
+    combo_after = np.where(keep, idx - last_reset, 0)
+    combo_before = np.concatenate(([0], combo_after[:-1]))
+    bonus = np.minimum(combo_before * rules.combo_bonus_step, rules.combo_bonus_cap)
+    gain = table.points[labels] + np.where(keep, bonus, 0)
+    attack = keep & (combo_after > 0) & (combo_after % rules.combo_every == 0)
+    return np.cumsum(gain), attack
+
+
+@dataclass
+class MatchResult:
+    scores: Tuple[int, int]
+    health: Tuple[float, float]
+    ko: bool
+    winner: Optional[int]
+
+
+def simulate(
+    timelines: Sequence[Timeline], merged: np.ndarray, merged_times: np.ndarray, rules: JudgeRules, mode: str
+) -> MatchResult:
+    table = LabelTable.build(rules)
+    labels = [classify(tl, rules, table) for tl in timelines]
+    scored = [score_labels(lab, rules, table) for lab in labels]
+    heal = table.health
+    max_health = rules.max_health
+    health = [max_health, max_health]
+    down = [False, False]
+    last_event = [-1, -1]
+    ko_time: Optional[float] = None
+    pos = [0, 0]
+    count = len(merged)
+    # HP는 클램프/다운 때문에 순차적으로만 계산 가능: 두 플레이어 이벤트를 시간순으로 합쳐 진행
+    for n in range(count):
+        player = merged[n]
+        i = pos[player]
+        pos[player] += 1
+        if not down[player]:
+            last_event[player] = i
+            # JudgeRules.apply_health 와 같은 순서/클램프 (repeat 번은 한 번에 곱해서)
+            amount = heal[labels[player][i]] * timelines[player].repeat[i]
+            if amount > 0:
+                health[player] = min(max_health, health[player] + amount)
+            elif amount < 0 and health[player] > 0:
+                health[player] = max(0.0, health[player] + amount)
+                down[player] = health[player] <= 0
+            if scored[player][1][i]:
+                victim = 1 - player
+                if health[victim] > 0:
+                    health[victim] = max(0.0, health[victim] - rules.combo_attack)
+                    down[victim] = health[victim] <= 0
+                if not down[player]:
+                    health[player] = min(max_health, health[player] + rules.combo_heal)
+        # replay.rescore 처럼 같은 시각의 이벤트를 모두 적용한 뒤에 KO를 확인한다
+        if mode == "sudden" and (down[0] or down[1]) and (n + 1 == count or merged_times[n + 1] != merged_times[n]):
+            ko_time = float(merged_times[n])
+            break
+    scores = tuple(int(scored[p][0][last_event[p]]) if last_event[p] >= 0 else 0 for p in (0, 1))
+    if ko_time is not None:
+        winner = None if down[0] and down[1] else (1 if down[0] else 0)
+    elif health[0] == health[1]:
+        winner = None if scores[0] == scores[1] else (0 if scores[0] > scores[1] else 1)
+    else:
+        winner = 0 if health[0] > health[1] else 1
+    return MatchResult(scores, (float(health[0]), float(health[1])), ko_time is not None, winner)
+
+
+def rescore_log(
+    log: InputLog, chart: Union[CompiledChart, Sequence[Tuple[int, float]]], configs: Sequence[JudgeRules]
+) -> List[MatchResult]:
+    if not isinstance(chart, CompiledChart):
+        chart = compile_chart(chart)  # Track.load_chart 와 같은 검증/중복 병합
+    times = np.asarray(log.times, dtype=np.float64)
+    players = np.asarray(log.players, dtype=np.int64)
+    lanes = np.asarray(log.lanes, dtype=np.int64)
+    prepared: Dict[Tuple[float, float, float], Tuple[List[Timeline], np.ndarray, np.ndarray]] = {}
+    results: List[MatchResult] = []
+    for rules in configs:
+        key = matching_key(rules)
+        if key not in prepared:
+            timelines = []
+            for p in (0, 1):
+                mine = players == p
+                timelines.append(match_inputs(chart, times[mine], lanes[mine], np.flatnonzero(mine), rules))
+            all_times = np.concatenate([tl.times for tl in timelines])
+            owner = np.concatenate([np.full(len(tl.times), p) for p, tl in enumerate(timelines)])
+            # 같은 시각: 스윕이 먼저(P1, P2 순), 입력은 기록된 순서대로
+            tie = np.concatenate([np.where(tl.sweep, owner_p - 2, tl.tie) for owner_p, tl in enumerate(timelines)])
+            order = np.lexsort((tie, all_times))
+            prepared[key] = (timelines, owner[order], all_times[order])
+        timelines, merged, merged_times = prepared[key]
+        results.append(simulate(timelines, merged, merged_times, rules, log.mode))
+    return results
+
+
+def _rescore_worker(args: Tuple[str, CompiledChart, List[JudgeRules]]) -> List[MatchResult]:
+    path, chart, configs = args
+    return rescore_log(InputLog.load(path), chart, configs)
+
+
+@dataclass
+class ConfigReport:
+    name: str
+    matches: int = 0
+    mean_score: Tuple[float, float] = (0.0, 0.0)
+    score_std: float = 0.0
+    ko_rate: float = 0.0
+    p1_win_rate: float = 0.0
+    draw_rate: float = 0.0
+    mean_hp_gap: float = 0.0
+
+
+def summarize(name: str, results: Sequence[MatchResult]) -> ConfigReport:
+    if not results:
+        return ConfigReport(name)
+    scores = np.array([r.scores for r in results], dtype=np.float64)
+    hp = np.array([r.health for r in results], dtype=np.float64)
+    return ConfigReport(
+        name=name,
+        matches=len(results),
+        mean_score=(float(scores[:, 0].mean()), float(scores[:, 1].mean())),
+        score_std=float(scores.std()),
+        ko_rate=float(np.mean([r.ko for r in results])),
+        p1_win_rate=float(np.mean([r.winner == 0 for r in results])),
+        draw_rate=float(np.mean([r.winner is None for r in results])),
+        mean_hp_gap=float(np.abs(hp[:, 0] - hp[:, 1]).mean()),
+    )
+
+
+def run_batch(
+    paths: Iterable[str], charts: Dict[str, CompiledChart], configs: Sequence[JudgeRules], workers: int = 0
+) -> List[ConfigReport]:
+    jobs = []
+    for path in paths:
+        log_song = InputLog.load(path).song_id
+        if log_song not in charts:
+            print(f"[warn] {path}: unknown song '{log_song}', skipped")
+            continue
+        jobs.append((path, charts[log_song], list(configs)))
+    per_config: List[List[MatchResult]] = [[] for _ in configs]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = pool.map(_rescore_worker, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+            for results in outputs:
+                for i, res in enumerate(results):
+                    per_config[i].append(res)
+    else:
+        for job in jobs:
+            for i, res in enumerate(_rescore_worker(job)):
+                per_config[i].append(res)
+    return [summarize(rules.name, res) for rules, res in zip(configs, per_config)]
+
+
+def default_grid(base: JudgeRules = DEFAULT_RULES) -> List[JudgeRules]:
+    grid = []
+    for scale in (0.8, 1.0, 1.2):
+        for miss in (4.0, 5.0, 6.0):
+            rules = replace(
+                base,
+                name=f"win x{scale:.1f} / miss {miss:g}",
+                windows=tuple(round(w * scale, 4) for w in base.windows),
+            )
+            grid.append(rules.with_health(Miss=-miss))
+    return grid
+
+
+def load_configs(path: str) -> List[JudgeRules]:
+    """JSON list of ``JudgeRules`` overrides (same keys as rules.json entries)."""
+    with open(path, encoding="utf-8") as fh:
+        raw = json.load(fh)
+    return [JudgeRules.from_dict({"name": f"config {i}", **item}) for i, item in enumerate(raw)]
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Re-score input logs under candidate judgement/health configs.")
+    parser.add_argument("logs", nargs="+", help="input log files (.log) or replay files (.rhr)")
+    parser.add_argument("--configs", help="JSON list of rule overrides (default: built-in grid)")
+    parser.add_argument("--workers", type=int, default=0, help="process count (default: all cores)")
+    parser.add_argument("--json", help="write the report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    from game import song_chart
+    from library import SongLibrary
+
+    library = SongLibrary.open()
+    charts: Dict[str, CompiledChart] = {}
+    paths = []
+    # 리플레이는 임시 폴더에 로그로 바꿔서 넘긴다 (사용자의 리플레이 폴더에는 쓰지 않는다)
+    with tempfile.TemporaryDirectory(prefix="tuning-") as workdir:
+        for i, path in enumerate(args.logs):
+            if path.endswith(".rhr"):
+                from replay import Replay
+
+                converted = os.path.join(workdir, f"{i}_{os.path.splitext(os.path.basename(path))[0]}.log")
+                InputLog.from_replay(Replay.load(path)).save(converted)
+                path = converted
+            paths.append(path)
+            # 로그에 쓰인 곡의 차트만 만든다
+            song_id = InputLog.load(path).song_id
+            song = library.by_name(song_id)
+            if song_id not in charts and song is not None:
+                charts[song_id] = song_chart(song)
+        configs = load_configs(args.configs) if args.configs else default_grid()
+        reports = run_batch(paths, charts, configs, workers=args.workers)
+
+    print(f"{'config':<24} {'n':>5} {'P1 score':>10} {'P2 score':>10} {'KO%':>6} {'P1 win%':>8} {'draw%':>6} {'HP gap':>7}")
+    for rep in reports:
+        print(
+            f"{rep.name:<24} {rep.matches:>5} {rep.mean_score[0]:>10.0f} {rep.mean_score[1]:>10.0f}"
+            f" {rep.ko_rate * 100:>6.1f} {rep.p1_win_rate * 100:>8.1f} {rep.draw_rate * 100:>6.1f} {rep.mean_hp_gap:>7.1f}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump([asdict(rep) for rep in reports], fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))